@@ -0,0 +1,351 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: Command-line model of a lab router used by the SSH emulator.
+Each EmulatedDevice is seeded from one of the files in configs/ and
+answers the commands used throughout the course (show version, the VRF
+"show running-config" variants, terminal settings, and VRF configuration
+lines). This module has no network code so it is easy to unit test.
+"""
+
+import re
+import time
+from collections import OrderedDict
+
+# Canned "show version" text per platform, trimmed to the lines the
+# course scripts and parsers look at
+SHOW_VERSION = {
+    "ios": (
+        "Cisco IOS XE Software, Version 16.09.02\n"
+        "Cisco IOS Software [Fuji], Virtual XE Software "
+        "(X86_64_LINUX_IOSD-UNIVERSALK9-M), Version 16.9.2, "
+        "RELEASE SOFTWARE (fc4)\n"
+        "{hostname} uptime is 1 hour, 5 minutes\n"
+        "cisco CSR1000V (VXE) processor (revision VXE) with "
+        "2392579K/3075K bytes of memory.\n"
+        "Processor board ID 9TH4AXITD7I\n"
+    ),
+    "iosxr": (
+        "Cisco IOS XR Software, Version 6.3.1\n"
+        "Copyright (c) 2013-2017 by Cisco Systems, Inc.\n"
+        "{hostname} uptime is 1 hour, 5 minutes\n"
+        "cisco IOS-XRv 9000 () processor\n"
+    ),
+}
+
+INVALID_INPUT = "% Invalid input detected at '^' marker."
+
+
+class EmulatedDevice:  # pylint: disable=too-many-instance-attributes
+    """
+    Stateful CLI for one emulated router. Call handle_line() with each
+    line the client types; it returns the text to print before the next
+    prompt(). VRFs are held as structured data so configuration changes
+    show up in later "show" commands.
+    """
+
+    def __init__(self, hostname, platform, config_text, latency=None):
+        self.hostname = hostname
+        self.platform = platform
+        self.latency = latency or {}
+        self.vrfs = OrderedDict()
+        self.head = []
+        self.tail = []
+        self.mode = "exec"
+        self.context = []
+        self.commit_id = 1000000001
+        self.config_version = 1
+        self.last_change = time.time()
+        self._load(config_text)
+
+    def prompt(self):
+        """
+        Returns the prompt for the current mode and context.
+        """
+        base = self.hostname
+        if self.platform == "iosxr":
+            base = f"RP/0/RP0/CPU0:{self.hostname}"
+        if self.mode == "exec":
+            return f"{base}#"
+        modes = {0: "config", 2: "config-vrf", 3: "config-vrf-af"}
+        suffix = modes.get(len(self.context), "config-vrf-af-rt")
+        return f"{base}({suffix})#"
+
+    def latency_for(self, line):
+        """
+        Returns the artificial delay in seconds for a command. The latency
+        dict maps command prefixes to seconds; the longest matching prefix
+        wins and "default" applies to everything else.
+        """
+        matches = [p for p in self.latency if line.strip().startswith(p)]
+        if matches:
+            return self.latency[max(matches, key=len)]
+        return self.latency.get("default", 0.0)
+
+    def handle_line(self, line):
+        """
+        Processes one line of input and returns its output text.
+        """
+        if self.mode == "exec":
+            return self._handle_exec(line.strip())
+        return self._handle_config(line.strip())
+
+    def running_config(self):
+        """
+        Returns the full running configuration text.
+        """
+        lines = list(self.head) + self._render_vrfs() + list(self.tail)
+        if self.platform == "ios":
+            stamp = time.strftime(
+                "%H:%M:%S UTC %a %b %d %Y", time.gmtime(self.last_change)
+            )
+            lines = ["!", f"! Last configuration change at {stamp}"] + lines
+        return "\n".join(lines) + "\n"
+
+    def _handle_exec(self, line):
+        """
+        Internal-only function to process an exec mode command.
+        """
+        if not line or line.startswith("terminal"):
+            return ""
+        if line in ("configure terminal", "configure"):
+            self.mode = "config"
+            if self.platform == "ios":
+                return (
+                    "Enter configuration commands, one per line.  "
+                    "End with CNTL/Z.\n"
+                )
+            return ""
+        if line in ("write memory", "copy running-config startup-config"):
+            return "Building configuration...\n[OK]\n"
+
+        # Split off any "| include" or "| section" filter
+        command, _, pipe = line.partition("|")
+        command = command.strip()
+        if command == "show version":
+            text = SHOW_VERSION[self.platform].format(hostname=self.hostname)
+        elif command == "show running-config":
+            text = self.running_config()
+        elif command == "show running-config vrf":
+            text = "\n".join(self._render_vrfs()) + "\n"
+        elif command.startswith("show configuration commit list"):
+            text = self._commit_list()
+        elif command == "show configuration id" and self.platform == "ios":
+            text = self._config_id()
+        else:
+            return INVALID_INPUT + "\n"
+        return _apply_filter(text, pipe.strip())
+
+    def _handle_config(self, line):
+        """
+        Internal-only function to process a configuration mode line.
+        Only VRF configuration is modeled; other lines are accepted and
+        ignored so real templates can be replayed unchanged.
+        """
+        # pylint: disable=too-many-return-statements
+        if line == "end":
+            self.mode, self.context = "exec", []
+            return ""
+        if line.startswith("do "):
+            return self._handle_exec(line[3:])
+        if not line or line == "!":
+            return ""
+        if line in ("exit", "exit-address-family"):
+            # Climb one level: RT list -> address-family -> VRF -> global
+            if not self.context:
+                self.mode = "exec"
+            depth = {4: 3, 3: 2}.get(len(self.context), 0)
+            self.context = self.context[:depth]
+            return ""
+        if line == "commit":
+            self.commit_id += 1
+            return ""
+
+        # Creating or deleting a VRF works from any context
+        vrf_prefix = "vrf definition " if self.platform == "ios" else "vrf "
+        if line.startswith(vrf_prefix):
+            name = line[len(vrf_prefix) :].strip()
+            self.vrfs.setdefault(name, _new_vrf())
+            self.context = ["vrf", name]
+            return ""
+        if line.startswith("no " + vrf_prefix):
+            self.vrfs.pop(line[len("no " + vrf_prefix) :].strip(), None)
+            self.context = []
+            self._changed()
+            return ""
+
+        if self.context[:1] == ["vrf"]:
+            return self._handle_vrf_line(self.vrfs[self.context[1]], line)
+        return ""
+
+    def _handle_vrf_line(self, vrf, line):
+        """
+        Internal-only function to apply a line inside a VRF context.
+        """
+        words = line.split()
+        negate = words[0] == "no"
+        if negate:
+            words = words[1:]
+        if not words:
+            return INVALID_INPUT + "\n"
+
+        if words[0] in ("rd", "description"):
+            vrf[words[0]] = None if negate else " ".join(words[1:])
+        elif words[0] == "route-target" and len(words) == 3:
+            if words[1] not in ("import", "export"):
+                return INVALID_INPUT + "\n"
+            _update_rt(vrf[f"route_{words[1]}"], words[2], negate)
+        elif words[0] == "address-family":
+            self.context = self.context[:2] + ["af"]
+        elif words[0] in ("import", "export") and words[1:] == ["route-target"]:
+            self.context = self.context[:2] + ["af", words[0]]
+        elif len(self.context) == 4 and len(words) == 1:
+            _update_rt(vrf[f"route_{self.context[3]}"], words[0], negate)
+        else:
+            return ""
+        self._changed()
+        return ""
+
+    def _changed(self):
+        """
+        Internal-only function to record that the configuration changed.
+        """
+        self.last_change = time.time()
+        self.config_version += 1
+
+    def _config_id(self):
+        """
+        Internal-only function to render the IOS configuration change
+        tracking ID, which is cheap because no config is built.
+        """
+        stamp = time.strftime(
+            "%H:%M:%S UTC %a %b %d %Y", time.gmtime(self.last_change)
+        )
+        return (
+            f"Configuration version : {self.config_version}\n"
+            f"Last change time      : {stamp}\n"
+        )
+
+    def _commit_list(self):
+        """
+        Internal-only function to render the IOS-XR commit history table.
+        """
+        stamp = time.strftime("%a %b %d %H:%M:%S %Y")
+        return (
+            "SNo. Label/ID              User      Line     Client  Time Stamp\n"
+            "~~~~ ~~~~~~~~              ~~~~      ~~~~     ~~~~~~  ~~~~~~~~~~\n"
+            f"1    {self.commit_id}            pyuser    vty0     CLI     "
+            f"{stamp}\n"
+        )
+
+    def _render_vrfs(self):
+        """
+        Internal-only function to render the VRF section in the style of
+        the platform's running configuration.
+        """
+        lines = []
+        for name, vrf in self.vrfs.items():
+            if self.platform == "ios":
+                lines.append(f"vrf definition {name}")
+                for key in ("rd", "description"):
+                    if vrf[key]:
+                        lines.append(f" {key} {vrf[key]}")
+                for key in ("export", "import"):
+                    for rte in vrf[f"route_{key}"]:
+                        lines.append(f" route-target {key} {rte}")
+                lines.extend(vrf["other"])
+            else:
+                lines.append(f"vrf {name}")
+                if vrf["description"]:
+                    lines.append(f" description {vrf['description']}")
+                lines.append(" address-family ipv4 unicast")
+                for key in ("import", "export"):
+                    if vrf[f"route_{key}"]:
+                        lines.append(f"  {key} route-target")
+                        lines.extend(f"   {rt}" for rt in vrf[f"route_{key}"])
+                        lines.append("  !")
+                lines.extend([" !", "!"])
+        return lines
+
+    def _load(self, config_text):
+        """
+        Internal-only function to split a seed configuration into the
+        lines before the VRFs, the VRFs themselves, and the lines after.
+        """
+        vrf_prefix = "vrf definition " if self.platform == "ios" else "vrf "
+        vrf = rt_key = None
+        for line in config_text.rstrip().splitlines():
+            if line.startswith(vrf_prefix):
+                vrf = self.vrfs.setdefault(
+                    line[len(vrf_prefix) :].strip(), _new_vrf()
+                )
+                continue
+
+            # Lines indented under a VRF (and XR's closing "!") belong to it
+            if vrf is not None and (line.startswith(" ") or line == "!"):
+                words = line.split()
+                if words[:1] in (["rd"], ["description"]):
+                    vrf[words[0]] = " ".join(words[1:])
+                elif words[:1] == ["route-target"]:
+                    vrf[f"route_{words[1]}"].append(words[2])
+                elif words[1:] == ["route-target"]:
+                    rt_key = f"route_{words[0]}"
+                elif words == ["!"]:
+                    rt_key = None
+                elif rt_key:
+                    vrf[rt_key].append(words[0])
+                elif self.platform == "ios":
+                    vrf["other"].append(line)
+                continue
+
+            vrf = None
+            (self.tail if self.vrfs else self.head).append(line)
+
+
+def _new_vrf():
+    """
+    Internal-only function to create an empty VRF record.
+    """
+    return {
+        "rd": None,
+        "description": None,
+        "route_import": [],
+        "route_export": [],
+        "other": [],
+    }
+
+
+def _update_rt(rt_list, rte, negate):
+    """
+    Internal-only function to add or remove a route-target in place.
+    """
+    if negate and rte in rt_list:
+        rt_list.remove(rte)
+    elif not negate and rte not in rt_list:
+        rt_list.append(rte)
+
+
+def _apply_filter(text, pipe):
+    """
+    Internal-only function to apply an IOS "| include" or "| section"
+    output filter. As on IOS, "_" in the pattern matches a delimiter
+    (start or end of line, space, comma, or brace).
+    """
+    if not pipe:
+        return text
+    keyword, _, pattern = pipe.partition(" ")
+    regex = re.compile(pattern.strip().replace("_", r"(?:^|$|[ ,{}()])"))
+    lines = text.splitlines()
+    if keyword == "include":
+        kept = [line for line in lines if regex.search(line)]
+    elif keyword == "section":
+        kept, in_section = [], False
+        for line in lines:
+            if not line.startswith(" "):
+                in_section = bool(regex.search(line))
+            if in_section:
+                kept.append(line)
+    else:
+        return INVALID_INPUT + "\n"
+    return "\n".join(kept) + "\n" if kept else ""
@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: Local SSH device farm for exercising the course scripts without
+the real lab. Each simulated host listens on its own TCP port and runs
+an EmulatedDevice seeded from configs/R1.txt (IOS) or configs/R2.txt
+(IOS-XR). Both interactive shells (paramiko, netmiko) and exec requests
+are supported, with optional per-command latency to mimic slow devices.
+"""
+
+import argparse
+import json
+import os
+import socket
+import threading
+import time
+import paramiko
+from device_lab import EmulatedDevice
+
+# Seed configurations cycled across the simulated hosts
+SEEDS = [("R1.txt", "ios"), ("R2.txt", "iosxr")]
+
+
+class LabServer(paramiko.ServerInterface):
+    """
+    Accepts the course credentials and allows shell and exec sessions.
+    Requests are recorded per channel ID since one transport may carry
+    many channels at once.
+    """
+
+    def __init__(self):
+        self.requests = {}
+        self.cond = threading.Condition()
+
+    def wait_request(self, chanid, timeout=10.0):
+        """
+        Blocks until the client asks for a shell or an exec on the channel
+        and returns the exec command, or None for a shell.
+        """
+        with self.cond:
+            self.cond.wait_for(lambda: chanid in self.requests, timeout)
+            return self.requests.pop(chanid, None)
+
+    def _record(self, chanid, command):
+        """
+        Internal-only function to store a channel request and wake waiters.
+        """
+        with self.cond:
+            self.requests[chanid] = command
+            self.cond.notify_all()
+
+    def check_auth_password(self, username, password):
+        """
+        Accepts only the course credentials.
+        """
+        if (username, password) == ("pyuser", "pypass"):
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def get_allowed_auths(self, _username):
+        """
+        Offers password authentication to every user.
+        """
+        return "password"
+
+    def check_channel_request(self, kind, _chanid):
+        """
+        Allows session channels, which carry both shells and execs.
+        """
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_pty_request(self, *_args):
+        """
+        Grants any terminal request; the shell ignores its dimensions.
+        """
+        return True
+
+    def check_channel_shell_request(self, channel):
+        """
+        Records a shell request so the channel runs an interactive shell.
+        """
+        self._record(channel.get_id(), None)
+        return True
+
+    def check_channel_exec_request(self, channel, command):
+        """
+        Records the command so the channel runs it once and closes.
+        """
+        self._record(channel.get_id(), command.decode("utf-8"))
+        return True
+
+
+def run_shell(chan, device):
+    """
+    Interactive shell loop: echo typed characters, run each complete line
+    after its configured latency, then print the output and a new prompt.
+    A "\\r\\n" pair counts as a single line terminator.
+    """
+    chan.sendall(f"\r\n{device.prompt()}".encode("utf-8"))
+    buffer = ""
+    last_char = ""
+    while True:
+        data = chan.recv(4096)
+        if not data:
+            break
+        for char in data.decode("utf-8", errors="replace"):
+            if char == "\n" and last_char == "\r":
+                last_char = char
+                continue
+            last_char = char
+            if char not in "\r\n":
+                buffer += char
+                continue
+
+            # Complete line received; echo it, then process it
+            line, buffer = buffer, ""
+            chan.sendall(f"{line}\r\n".encode("utf-8"))
+            if line.strip() in ("exit", "logout") and device.mode == "exec":
+                return
+            time.sleep(device.latency_for(line))
+            output = device.handle_line(line).replace("\n", "\r\n")
+            chan.sendall(f"{output}{device.prompt()}".encode("utf-8"))
+
+
+def run_exec(chan, device, command):
+    """
+    Exec request: run one command, send its output, and close.
+    """
+    time.sleep(device.latency_for(command))
+    chan.sendall(device.handle_line(command).encode("utf-8"))
+    chan.send_exit_status(0)
+
+
+def handle_client(client, host_key, device):
+    """
+    Serve one SSH connection. Every channel on the transport shares the
+    same device, like multiple sessions to a real router.
+    """
+    transport = paramiko.Transport(client)
+    transport.add_server_key(host_key)
+    server = LabServer()
+    try:
+        transport.start_server(server=server)
+    except paramiko.SSHException:
+        return
+
+    # Keep accepting channels until the client disconnects
+    while transport.is_active():
+        chan = transport.accept(timeout=1)
+        if chan is None:
+            continue
+        threading.Thread(
+            target=_serve_channel, args=(chan, server, device), daemon=True
+        ).start()
+
+
+def _serve_channel(chan, server, device):
+    """
+    Internal-only function to run a shell or exec session on a channel.
+    """
+    try:
+        command = server.wait_request(chan.get_id())
+        if command is not None:
+            run_exec(chan, device, command)
+        else:
+            run_shell(chan, device)
+    except (OSError, EOFError, paramiko.SSHException):
+        pass
+    finally:
+        chan.close()
+
+
+def listen(port, host_key, device):
+    """
+    Accept SSH connections for one simulated host forever.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", port))
+    sock.listen(100)
+    while True:
+        client, _ = sock.accept()
+        threading.Thread(
+            target=handle_client, args=(client, host_key, device), daemon=True
+        ).start()
+
+
+def main(args):
+    """
+    Execution starts here.
+    """
+
+    # Per-command latency, for example '{"default": 0.05, "show run": 0.5}'
+    latency = json.loads(args.latency) if args.latency else {}
+
+    # One host key is plenty for a lab; generate it in memory each run
+    host_key = paramiko.RSAKey.generate(2048)
+    config_dir = os.path.join(os.path.dirname(__file__), "configs")
+
+    # Build the farm, cycling through the seed configurations
+    inventory = {}
+    for i in range(args.hosts):
+        filename, platform = SEEDS[i % len(SEEDS)]
+        with open(os.path.join(config_dir, filename), "r") as handle:
+            config_text = handle.read()
+        hostname = f"{platform.upper()}{i + 1:04d}"
+        device = EmulatedDevice(hostname, platform, config_text, latency)
+        port = args.base_port + i
+        threading.Thread(
+            target=listen, args=(port, host_key, device), daemon=True
+        ).start()
+        inventory[hostname] = {
+            "platform": platform,
+            "address": "127.0.0.1",
+            "port": port,
+            "seed": os.path.splitext(filename)[0],
+        }
+
+    # Write the inventory so the course scripts can find each host with
+    # "--inventory"; the seed names the vars/ file that fits its config
+    with open(args.inventory, "w") as handle:
+        json.dump(inventory, handle, indent=2)
+    print(f"Serving {args.hosts} hosts on 127.0.0.1:{args.base_port}+")
+    print(f"Inventory written to {args.inventory}")
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print("Shutting down emulator")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hosts", type=int, default=3)
+    parser.add_argument("--base-port", type=int, default=10022)
+    parser.add_argument("--latency", help="JSON of command prefix: seconds")
+    parser.add_argument("--inventory", default="emulator_hosts.json")
+    main(parser.parse_args())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: The pytest functions for ensuring the emulated lab routers
+answer show commands and apply VRF configuration like the real lab.
+Run with "-s" to see outputs.
+"""
+
+import os
+from device_lab import EmulatedDevice, INVALID_INPUT
+
+CONFIG_DIR = os.path.join(os.path.dirname(__file__), "configs")
+
+
+def _seed(filename, platform, latency=None):
+    """
+    Build an emulated device from one of the lab configuration files.
+    """
+    with open(os.path.join(CONFIG_DIR, filename), "r") as handle:
+        return EmulatedDevice(filename[:2], platform, handle.read(), latency)
+
+
+def test_ios_show():
+    """
+    IOS prompts, show version, and the VRF section filter used by the
+    course scripts all look like the real router.
+    """
+    dev = _seed("R1.txt", "ios")
+    assert dev.prompt() == "R1#"
+    assert "Version 16.9.2" in dev.handle_line("show version")
+
+    vrfs = dev.handle_line("show running-config | section vrf_definition")
+    print(vrfs)
+    assert vrfs.startswith("vrf definition ")
+    assert all(
+        line.startswith(("vrf definition", " "))
+        for line in vrfs.splitlines()
+    )
+    assert vrfs.strip() in dev.handle_line("show running-config")
+    assert dev.handle_line("show bogus") == INVALID_INPUT + "\n"
+
+
+def test_ios_config():
+    """
+    VRF lines change later show output, including "no" forms, and
+    unmodeled lines are accepted silently.
+    """
+    dev = _seed("R1.txt", "ios")
+    assert "version : 1\n" in dev.handle_line("show configuration id")
+    dev.handle_line("configure terminal")
+    assert dev.prompt() == "R1(config)#"
+    for line in [
+        "vrf definition LAB",
+        " rd 65000:99",
+        " route-target import 65000:1",
+        " route-target import 65000:2",
+        " route-target export 65000:3",
+        " no route-target import 65000:1",
+        " address-family ipv4",
+        "interface Loopback0",
+        "end",
+    ]:
+        assert dev.handle_line(line) == ""
+    assert dev.prompt() == "R1#"
+
+    vrfs = dev.handle_line("show running-config | section vrf_definition_LAB")
+    print(vrfs)
+    assert vrfs == (
+        "vrf definition LAB\n"
+        " rd 65000:99\n"
+        " route-target export 65000:3\n"
+        " route-target import 65000:2\n"
+    )
+    assert "version : 1\n" not in dev.handle_line("show configuration id")
+
+
+def test_iosxr_show_and_config():
+    """
+    IOS-XR nests route-targets under the address-family and keeps the
+    commit ID moving forward.
+    """
+    dev = _seed("R2.txt", "iosxr")
+    assert dev.prompt() == "RP/0/RP0/CPU0:R2#"
+    before = dev.handle_line("show running-config vrf")
+    assert before.startswith("vrf ")
+
+    for line in [
+        "configure terminal",
+        "vrf LAB",
+        " address-family ipv4 unicast",
+        "  import route-target",
+        "   65000:1",
+        "   65000:2",
+        "  exit",
+        "commit",
+        "end",
+    ]:
+        dev.handle_line(line)
+
+    after = dev.handle_line("show running-config vrf")
+    print(after)
+    assert after.startswith(before.rstrip())
+    assert "vrf LAB\n address-family ipv4 unicast\n" in after
+    assert "  import route-target\n   65000:1\n   65000:2\n  !\n" in after
+    assert "1000000002" in dev.handle_line("show configuration commit list")
+
+
+def test_latency():
+    """
+    The longest matching command prefix sets the delay.
+    """
+    latency = {"default": 0.01, "show": 0.1, "show running-config": 0.5}
+    dev = _seed("R1.txt", "ios", latency)
+    assert dev.latency_for("show running-config vrf") == 0.5
+    assert dev.latency_for("show version") == 0.1
+    assert dev.latency_for("terminal length 0") == 0.01
@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: Keep authenticated SSH sessions warm across script runs. A
+local broker process owns a pool of sessions (one per host) and serves
+requests over a Unix socket using one JSON object per line. Scripts that
+go through the broker skip the TCP, key exchange, and AAA login steps
+whenever a warm session for the host already exists.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+
+
+class _PoolEntry:  # pylint: disable=too-few-public-methods
+    """
+    Internal-only record for one host in the session pool. The lock
+    serializes commands on the session; "users" counts in-flight requests
+    so busy sessions are never evicted.
+    """
+
+    def __init__(self):
+        self.session = None
+        self.lock = threading.Lock()
+        self.users = 0
+        self.last_used = time.monotonic()
+
+
+class SessionPool:
+    """
+    Pool of per-host sessions created on demand by factory(host). Each
+    session must provide run(command, timeout), is_alive(), and close().
+    Sessions idle longer than idle_timeout seconds are closed by
+    evict_idle(), and the least recently used idle session is closed
+    when a new host would exceed max_sessions.
+    """
+
+    def __init__(self, factory, max_sessions=50, idle_timeout=300.0):
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def run(self, host, commands, timeout=10.0):
+        """
+        Runs the list of commands in order on the warm session for host,
+        creating one if needed, and returns the list of outputs. A reused
+        session that fails is replaced and the commands retried once,
+        since devices often drop sessions that sat idle for a while. A
+        session whose command times out is closed and dropped instead, so
+        late output can never leak into another request's results.
+        """
+        entry = self._acquire(host)
+        try:
+            with entry.lock:
+                reused = entry.session is not None
+                try:
+                    return self._run_on(entry, host, commands, timeout)
+                except TimeoutError:
+                    raise
+                except Exception:  # pylint: disable=broad-except
+                    self._close_session(entry)
+                    if not reused:
+                        raise
+                return self._run_on(entry, host, commands, timeout)
+        except Exception:
+            self._discard(host, entry)
+            raise
+        finally:
+            with self._lock:
+                entry.users -= 1
+                entry.last_used = time.monotonic()
+
+    def hosts(self):
+        """
+        Returns the hosts that currently have a session, least recently
+        used first.
+        """
+        with self._lock:
+            return [h for h, e in self._entries.items() if e.session]
+
+    def evict_idle(self):
+        """
+        Closes every session that has not been used for idle_timeout
+        seconds. Returns the list of evicted hosts.
+        """
+        cutoff = time.monotonic() - self.idle_timeout
+        with self._lock:
+            evicted = [
+                (host, entry)
+                for host, entry in self._entries.items()
+                if entry.users == 0 and entry.last_used < cutoff
+            ]
+            for host, _ in evicted:
+                del self._entries[host]
+
+        # Closing can block on the network, so do it outside the lock
+        for _, entry in evicted:
+            self._close_session(entry)
+        return [host for host, _ in evicted]
+
+    def close_all(self):
+        """
+        Closes every session in the pool.
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            self._close_session(entry)
+
+    def _run_on(self, entry, host, commands, timeout):
+        """
+        Internal-only function to (re)connect if needed, then run commands.
+        """
+        if entry.session is None or not entry.session.is_alive():
+            self._close_session(entry)
+            entry.session = self.factory(host)
+        return [entry.session.run(command, timeout) for command in commands]
+
+    def _acquire(self, host):
+        """
+        Internal-only function to find or create the entry for host and
+        mark it in use, evicting the least recently used idle entry if the
+        pool is full. Raises RuntimeError if every session is busy.
+        """
+        evicted = None
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is None:
+                if len(self._entries) >= self.max_sessions:
+                    evicted = self._pop_lru_idle()
+                entry = _PoolEntry()
+                self._entries[host] = entry
+            self._entries.move_to_end(host)
+            entry.users += 1
+
+        if evicted:
+            self._close_session(evicted)
+        return entry
+
+    def _pop_lru_idle(self):
+        """
+        Internal-only function to remove and return the least recently used
+        idle entry. Must be called with the pool lock held.
+        """
+        for host, entry in self._entries.items():
+            if entry.users == 0:
+                del self._entries[host]
+                return entry
+        raise RuntimeError(f"all {self.max_sessions} sessions are busy")
+
+    def _discard(self, host, entry):
+        """
+        Internal-only function to drop a failed entry from the pool.
+        """
+        with self._lock:
+            if self._entries.get(host) is entry:
+                del self._entries[host]
+        self._close_session(entry)
+
+    @staticmethod
+    def _close_session(entry):
+        """
+        Internal-only function to close an entry's session, ignoring errors
+        from sessions that are already dead.
+        """
+        if entry.session is not None:
+            try:
+                entry.session.close()
+            except Exception:  # pylint: disable=broad-except
+                pass
+            entry.session = None
+
+
+class _BrokerHandler(socketserver.StreamRequestHandler):
+    """
+    Handles one client connection. Each request line is a JSON object
+    with "host", "commands", and optional "timeout" keys, or {"op":
+    "status"}. Each response line has "ok" plus "outputs", "hosts", or
+    "error".
+    """
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                if request.get("op") == "status":
+                    response = {"ok": True, "hosts": self.server.pool.hosts()}
+                else:
+                    outputs = self.server.pool.run(
+                        request["host"],
+                        request["commands"],
+                        request.get("timeout", 10.0),
+                    )
+                    response = {"ok": True, "outputs": outputs}
+            except Exception as exc:  # pylint: disable=broad-except
+                response = {"ok": False, "error": repr(exc)}
+            self.wfile.write((json.dumps(response) + "\n").encode())
+
+
+class BrokerServer(socketserver.ThreadingUnixStreamServer):
+    """
+    Threaded Unix socket server that answers requests from the pool. The
+    socket is created with owner-only permissions because it hands out
+    authenticated device sessions to whoever can connect.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, pool):
+        self.pool = pool
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, _BrokerHandler)
+        finally:
+            os.umask(old_umask)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.close_all()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+def start_janitor(pool, interval=30.0):
+    """
+    Starts a daemon thread that evicts idle sessions from the pool every
+    "interval" seconds. Returns an Event; set it to stop the thread.
+    """
+    stop = threading.Event()
+
+    def _sweep():
+        while not stop.wait(interval):
+            for host in pool.evict_idle():
+                print(f"Evicted idle session for {host}")
+
+    threading.Thread(target=_sweep, daemon=True).start()
+    return stop
+
+
+def broker_run(socket_path, host, commands, timeout=10.0):
+    """
+    Client side: asks the broker listening on socket_path to run the
+    commands on host and returns the list of outputs. Raises
+    ConnectionError if the broker is not running and RuntimeError if the
+    broker reports a failure.
+    """
+    request = {"host": host, "commands": commands, "timeout": timeout}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except (FileNotFoundError, ConnectionRefusedError) as exc:
+            raise ConnectionError(f"no broker at {socket_path}") from exc
+        sock.sendall((json.dumps(request) + "\n").encode())
+        with sock.makefile("rb") as reader:
+            response = json.loads(reader.readline())
+
+    if not response["ok"]:
+        raise RuntimeError(f"{host}: {response['error']}")
+    return response["outputs"]
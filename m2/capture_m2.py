@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: Open capture files for streaming command output to disk, with
+optional gzip or zstd compression. Output is written to a temporary
+".part" file and only renamed into place once the capture succeeds, so
+a failed collection never leaves a truncated facts file behind.
+"""
+
+import gzip
+import os
+from contextlib import contextmanager
+
+# zstd is optional; gzip from the standard library is always available
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# File name suffix added for each compression type
+COMPRESSION_SUFFIX = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+
+def capture_filename(hostname, compression=None):
+    """
+    Returns the facts file name for a host, including the suffix for the
+    selected compression type.
+    """
+    return f"{hostname}_facts.txt{COMPRESSION_SUFFIX[compression]}"
+
+
+def open_capture(filename, compression=None):
+    """
+    Opens "filename" for writing text, compressing it on the fly if
+    requested. Raises ValueError for unknown compression types and
+    ImportError if zstd is requested but "zstandard" is not installed.
+    """
+    if compression is None:
+        return open(filename, "w", encoding="utf-8")
+    if compression == "gzip":
+        return gzip.open(filename, "wt", encoding="utf-8")
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError("zstd compression requires 'zstandard' package")
+        return zstandard.open(filename, "wt", encoding="utf-8")
+    raise ValueError(f"unknown compression type: {compression}")
+
+
+@contextmanager
+def atomic_capture(filename, compression=None):
+    """
+    Context manager that yields a writable text handle for "filename".
+    Data goes to a temporary file which replaces "filename" on success
+    and is removed if the body raises an exception.
+    """
+    part_filename = f"{filename}.part"
+    handle = open_capture(part_filename, compression)
+    try:
+        yield handle
+    except BaseException:
+        handle.close()
+        os.remove(part_filename)
+        raise
+    handle.close()
+    os.replace(part_filename, filename)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: Run several commands at the same time over one SSH connection.
+Each command gets its own "exec" channel multiplexed on the existing
+paramiko Transport, so there is no prompt to wait for, no pagination to
+disable, and no need to split one interleaved stream of output.
+"""
+
+import codecs
+import select
+import time
+
+
+def exec_commands(transport, commands, timeout=30.0, sinks=None):
+    """
+    Given an authenticated paramiko Transport and a list of commands,
+    open one exec channel per command, start them all, and then read
+    every channel until the device closes it. Returns a dict mapping
+    each command to its decoded output. Raises TimeoutError if any
+    channel is still open after "timeout" seconds, and ValueError if a
+    command is repeated, since its outputs would share one result key.
+
+    The optional "sinks" dict maps commands to writable text handles.
+    Output for those commands is written to the handle as it arrives
+    instead of being held in memory, and its returned output is empty.
+    """
+    _check_unique(commands)
+    deadline = time.monotonic() + timeout
+    sinks = sinks or {}
+    output_dict = {command: [] for command in commands}
+    decoders = {
+        command: codecs.getincrementaldecoder("utf-8")(errors="replace")
+        for command in commands
+    }
+
+    pending = {}
+    try:
+        # Start every command before reading anything so they run in
+        # parallel. Each channel is registered for cleanup before its
+        # command starts, so a failed start still closes earlier channels
+        for command in commands:
+            chan = transport.open_session(timeout=timeout)
+            pending[chan] = command
+            chan.exec_command(command)
+
+        # Channels expose a file descriptor, so select() can wait on all
+        # of them at once and wake up as soon as any has data
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                waiting = ", ".join(pending.values())
+                raise TimeoutError(f"commands did not finish: {waiting}")
+            readable, _, _ = select.select(list(pending), [], [], remaining)
+            for chan in readable:
+                command = pending[chan]
+                data = chan.recv(65535)
+
+                # Empty bytes means the command finished; done reading
+                if not data:
+                    chan.close()
+                    del pending[chan]
+                text = decoders[command].decode(data, final=not data)
+
+                # Stream to the sink if there is one, else keep in memory
+                if command in sinks:
+                    sinks[command].write(text)
+                else:
+                    output_dict[command].append(text)
+
+    # Never leave channels open on the transport, even after a timeout
+    # or a failed start
+    finally:
+        for chan in pending:
+            chan.close()
+
+    return {command: "".join(chunks) for command, chunks in output_dict.items()}
+
+
+def _check_unique(commands):
+    """
+    Internal-only function to raise ValueError if any command is repeated.
+    """
+    duplicates = sorted({cmd for cmd in commands if commands.count(cmd) > 1})
+    if duplicates:
+        raise ValueError(f"duplicate commands: {', '.join(duplicates)}")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: Expect-style helpers for paramiko interactive shells. Rather than
+sleeping a fixed amount of time after each command and hoping the output
+is ready, read the channel in chunks until the device prompt comes back
+or a per-command deadline expires.
+"""
+
+import codecs
+import re
+import socket
+import time
+
+# Prompts are matched against the final (incomplete) line of output only.
+# The optional parenthesized part covers config modes like "R1(config)#"
+PROMPT_REGEX = {
+    "ios": re.compile(r"[\w.-]+(?:\([\w-]+\))?[#>]"),
+    "iosxr": re.compile(r"RP/\d+/\w+/CPU\d+:[\w.-]+(?:\([\w-]+\))?[#>]"),
+}
+
+# When the platform is not known, accept either style of prompt
+ANY_PROMPT_REGEX = re.compile(
+    r"(?:RP/\d+/\w+/CPU\d+:)?[\w.-]+(?:\([\w-]+\))?[#>]"
+)
+
+
+def get_prompt_regex(platform=None):
+    """
+    Selects the prompt regex for a given platform, falling back to the
+    generic regex that matches both IOS and IOS-XR prompts.
+    """
+    if platform is None:
+        return ANY_PROMPT_REGEX
+    return PROMPT_REGEX.get(platform.lower(), ANY_PROMPT_REGEX)
+
+
+def send_cmd(conn, command):
+    """
+    Given an open connection and a command, issue the command. There is
+    no sleep here; use get_output() to wait for the command to finish.
+    """
+    conn.send(command + "\n")
+
+
+def iter_output(conn, prompt_regex=ANY_PROMPT_REGEX, timeout=10.0):
+    """
+    Given an open connection, yield decoded chunks of text as they arrive
+    until the prompt appears at the end of the output. Raises TimeoutError
+    if "timeout" seconds elapse first, or EOFError if the channel closes
+    first, so callers never mistake partial output for a complete one.
+    Only the final partial line is kept in memory, so arbitrarily large
+    outputs can be consumed in constant space.
+    """
+    deadline = time.monotonic() + timeout
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    last_line = ""
+    while True:
+        # Block for no longer than the time left before the deadline
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"prompt not seen within {timeout}s")
+        conn.settimeout(remaining)
+        try:
+            data = conn.recv(65535)
+        except socket.timeout as exc:
+            raise TimeoutError(f"prompt not seen within {timeout}s") from exc
+
+        # Empty bytes means the remote side closed the channel
+        if not data:
+            raise EOFError("channel closed before the prompt appeared")
+        text = decoder.decode(data)
+        yield text
+
+        # Only the trailing partial line can contain the prompt
+        last_line = (last_line + text).rsplit("\n", 1)[-1]
+        if prompt_regex.fullmatch(last_line.strip()):
+            break
+
+    # Flush any incomplete multi-byte sequence left in the decoder
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def get_output(conn, prompt_regex=ANY_PROMPT_REGEX, timeout=10.0):
+    """
+    Given an open connection, read data in chunks until the prompt appears
+    at the end of the output. Returns all of the text collected, decoded
+    as UTF-8. Raises TimeoutError if "timeout" seconds elapse first.
+    """
+    return "".join(iter_output(conn, prompt_regex, timeout))
+
+
+def stream_output(conn, handle, prompt_regex=ANY_PROMPT_REGEX, timeout=10.0):
+    """
+    Same as get_output(), except each chunk is written to the open text
+    "handle" as soon as it arrives rather than being returned. Returns the
+    number of characters written.
+    """
+    count = 0
+    for text in iter_output(conn, prompt_regex, timeout):
+        handle.write(text)
+        count += len(text)
+    return count
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: Run a per-host function across an inventory concurrently using
+a bounded thread pool. SSH collection spends most of its time waiting on
+the network, so threads overlap that waiting nicely. Failures are
+captured per host so one bad device never stops the rest of the run.
+"""
+
+import statistics
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# Outcome of running the task against a single host
+HostResult = namedtuple("HostResult", "name ok elapsed result error")
+
+
+def run_hosts(task, host_dict, workers=10, **kwargs):
+    """
+    Calls task(name, value, **kwargs) for each key/value pair in the
+    host_dict using at most "workers" threads. Returns a list of
+    HostResult tuples in the same order as the inventory.
+    """
+
+    def _timed_task(name, value):
+        start = time.monotonic()
+        try:
+            result = task(name, value, **kwargs)
+        # Isolate failures; the exception is reported in the summary
+        except Exception as exc:  # pylint: disable=broad-except
+            return HostResult(name, False, time.monotonic() - start, None, exc)
+        return HostResult(name, True, time.monotonic() - start, result, None)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [
+            executor.submit(_timed_task, name, value)
+            for name, value in host_dict.items()
+        ]
+        return [future.result() for future in futures]
+
+
+def print_summary(results, elapsed):
+    """
+    Prints per-host latency and outcome, followed by aggregate throughput
+    and latency statistics for the whole run.
+    """
+    print(f"{'HOST':<20} {'STATUS':<7} {'SECONDS':>8}  DETAILS")
+    for result in results:
+        status = "OK" if result.ok else "FAILED"
+        details = "" if result.ok else repr(result.error)
+        print(
+            f"{result.name:<20} {status:<7} {result.elapsed:>8.2f}  {details}"
+        )
+
+    # Aggregate statistics are computed over all hosts, even failed ones,
+    # since a failed host still consumed a worker for that long
+    ok_count = sum(1 for result in results if result.ok)
+    print(f"\n{ok_count}/{len(results)} hosts succeeded in {elapsed:.2f}s")
+    if results and elapsed > 0:
+        latencies = sorted(result.elapsed for result in results)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"Throughput: {len(results) / elapsed:.2f} hosts/s")
+        print(
+            f"Latency: min {latencies[0]:.2f}s, "
+            f"median {statistics.median(latencies):.2f}s, "
+            f"p95 {p95:.2f}s, max {latencies[-1]:.2f}s"
+        )
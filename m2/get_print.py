@@ -3,31 +3,21 @@
 """
 Author: Nick Russo
 Purpose: Demonstrate using SSH via paramiko to get information from
-the network and print it to the screen.
+the network and print it to the screen. Use "--exec" to run the show
+commands in parallel on separate exec channels of one SSH connection.
+Use "--broker" to run them on warm sessions held by ssh_broker.py.
+Use "--inventory" to target the hosts of lab/emulator.py instead.
 """
 
-import time
+import argparse
 import paramiko
+from expect_m2 import send_cmd, get_output
+from exec_m2 import exec_commands
+from broker_m2 import broker_run
+from inventory_m2 import address_of, load_inventory
 
 
-def send_cmd(conn, command):
-    """
-    Given an open connection and a command, issue the command and wait
-    1 second for the command to be processed.
-    """
-    conn.send(command + "\n")
-    time.sleep(1.0)
-
-
-def get_output(conn):
-    """
-    Given an open connection, read all the data from the buffer and
-    decode the byte string as UTF-8.
-    """
-    return conn.recv(65535).decode("utf-8")
-
-
-def main():
+def main(args):
     """
     Execution starts here.
     """
@@ -40,25 +30,54 @@ def main():
         "R2": "show running-config vrf",
     }
 
+    # Optionally target the emulated lab, where each host has its own port
+    addresses = {}
+    if args.inventory:
+        hosts = load_inventory(args.inventory)
+        host_dict = {host["name"]: host["vrf_cmd"] for host in hosts}
+        addresses = {
+            host["name"]: (host["address"], host["port"]) for host in hosts
+        }
+
     # For each host in the inventory dict, extract key and value
     for hostname, vrf_cmd in host_dict.items():
+        # Broker mode: the local broker already holds a logged-in session
+        # (with paging disabled), so just send it the commands to run
+        if args.broker:
+            commands = ["show version | include Software,", vrf_cmd]
+            for output in broker_run(args.broker, hostname, commands):
+                print(output)
+            continue
+
         # Paramiko can be SSH client or server; use client here
         conn_params = paramiko.SSHClient()
 
         # We don't need paramiko to refuse connections due to missing SSH keys
         conn_params.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        address, port = address_of(hostname, addresses)
         conn_params.connect(
-            hostname=hostname,
-            port=22,
+            hostname=address,
+            port=port,
             username="pyuser",
             password="pypass",
             look_for_keys=False,
             allow_agent=False,
         )
 
-        # Get an interactive shell and wait a bit for the prompt to appear
+        # Exec channel mode: run the show commands at the same time, each
+        # on its own channel of the same transport. Pagination only applies
+        # to interactive terminals, so "terminal length 0" is not needed
+        if args.exec:
+            commands = ["show version | include Software,", vrf_cmd]
+            transport = conn_params.get_transport()
+            output_dict = exec_commands(transport, commands)
+            for command, output in output_dict.items():
+                print(f"{hostname}: {command}\n{output}")
+            conn_params.close()
+            continue
+
+        # Get an interactive shell and wait for the prompt to appear
         conn = conn_params.invoke_shell()
-        time.sleep(1.0)
         print(f"Logged into {get_output(conn).strip()} successfully")
 
         # Iterate over the list of commands, sending each one in series
@@ -79,4 +98,12 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--exec", action="store_true", help="use parallel exec channels"
+    )
+    parser.add_argument("--broker", help="path to ssh_broker.py socket")
+    parser.add_argument(
+        "--inventory", help="emulator_hosts.json written by lab/emulator.py"
+    )
+    main(parser.parse_args())
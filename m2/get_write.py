@@ -3,31 +3,154 @@
 """
 Author: Nick Russo
 Purpose: Demonstrate using SSH via paramiko to get information from
-the network and write it to a file for future reference.
+the network and write it to a file for future reference. Hosts are
+collected concurrently; use "--workers 1" for the original serial loop.
+Use "--exec" to run the show commands on parallel exec channels. Output
+is streamed to disk as it arrives, optionally compressed with "--compress".
+Use "--broker" to run the show commands on warm sessions held by
+ssh_broker.py. Use "--inventory" to target the hosts of lab/emulator.py
+instead of the real routers.
 """
 
+import argparse
+import contextlib
+import shutil
+import tempfile
 import time
 import paramiko
+from expect_m2 import send_cmd, get_output, stream_output
+from exec_m2 import exec_commands
+from fleet_m2 import run_hosts, print_summary
+from capture_m2 import COMPRESSION_SUFFIX, capture_filename, atomic_capture
+from broker_m2 import broker_run
+from inventory_m2 import address_of, load_inventory
 
 
-def send_cmd(conn, command):
+def collect_facts(hostname, vrf_cmd, args, addresses=None):
     """
-    Given an open connection and a command, issue the command and wait
-    1 second for the command to be processed.
+    Connects to a single host, runs the fact-gathering commands, and
+    streams the output to a per-host text file. The whole exchange must
+    finish within "args.timeout" seconds or TimeoutError is raised. With
+    "args.exec", the show commands run concurrently on separate exec
+    channels instead of through one interactive shell. When "args.broker"
+    is a socket path, the commands run on the broker's warm session.
+    "addresses" maps hostnames to (address, port) for the emulated lab.
     """
-    conn.send(command + "\n")
-    time.sleep(1.0)
+    timeout, compression = args.timeout, args.compress
+    deadline = time.monotonic() + timeout
+    filename = capture_filename(hostname, compression)
+
+    # Broker mode: the broker already holds a logged-in session (with
+    # paging disabled), so no connection is made here
+    if args.broker:
+        commands = ["show version | include Software,", vrf_cmd]
+        outputs = broker_run(args.broker, hostname, commands, timeout=timeout)
+        with atomic_capture(filename, compression) as handle:
+            for output in outputs:
+                handle.write(output)
+        print(f"Wrote {hostname} facts to {filename}")
+        return
+
+    # Paramiko can be SSH client or server; use client here
+    conn_params = paramiko.SSHClient()
+
+    # We don't need paramiko to refuse connections due to missing SSH keys
+    conn_params.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    address, port = address_of(hostname, addresses or {})
+    conn_params.connect(
+        hostname=address,
+        port=port,
+        username="pyuser",
+        password="pypass",
+        look_for_keys=False,
+        allow_agent=False,
+        timeout=timeout,
+        banner_timeout=timeout,
+        auth_timeout=timeout,
+    )
+
+    # Output is written while it is collected, so memory use stays flat
+    # regardless of how large the configuration is
+    try:
+        with atomic_capture(filename, compression) as handle:
+            if args.exec:
+                _collect_exec(conn_params, hostname, vrf_cmd, deadline, handle)
+            else:
+                _collect_shell(conn_params, hostname, vrf_cmd, deadline, handle)
+
+    # Close session when we are done, even if something failed
+    finally:
+        conn_params.close()
+
+    print(f"Wrote {hostname} facts to {filename}")
+
+
+def _collect_exec(conn_params, hostname, vrf_cmd, deadline, handle):
+    """
+    Internal-only function to run the show commands in parallel on
+    separate exec channels. Each channel streams into its own spool file
+    (in memory until it grows large, then on disk), and the spools are
+    copied to "handle" in command order once every command finishes.
+    """
+    commands = ["show version | include Software,", vrf_cmd]
+    with contextlib.ExitStack() as stack:
+        spools = {
+            command: stack.enter_context(
+                tempfile.SpooledTemporaryFile(
+                    max_size=1048576, mode="w+", encoding="utf-8"
+                )
+            )
+            for command in commands
+        }
+        exec_commands(
+            conn_params.get_transport(),
+            commands,
+            timeout=_remaining(deadline, hostname),
+            sinks=spools,
+        )
+        for command in commands:
+            spools[command].seek(0)
+            shutil.copyfileobj(spools[command], handle)
+
 
+def _collect_shell(conn_params, hostname, vrf_cmd, deadline, handle):
+    """
+    Internal-only function to run the fact-gathering commands in series
+    through an interactive shell, streaming their output to "handle".
+    A command whose prompt never returns raises TimeoutError, so the
+    partial capture is discarded rather than renamed into place.
+    """
 
-def get_output(conn):
+    # Get an interactive shell and wait for the prompt to appear
+    conn = conn_params.invoke_shell()
+    login_output = get_output(conn, timeout=_remaining(deadline, hostname))
+    print(f"Logged into {login_output.strip()} successfully")
+
+    # Iterate over the list of commands, sending each one in series
+    # The final command in the list is the OS-specific VRF "show" command
+    commands = [
+        "terminal length 0",
+        "show version | include Software,",
+        vrf_cmd,
+    ]
+    for command in commands:
+        # Send command and write output to the file as it arrives
+        send_cmd(conn, command)
+        stream_output(conn, handle, timeout=_remaining(deadline, hostname))
+
+
+def _remaining(deadline, hostname):
     """
-    Given an open connection, read all the data from the buffer and
-    decode the byte string as UTF-8.
+    Internal-only function to compute the time left before the per-host
+    deadline, raising TimeoutError once it has passed.
     """
-    return conn.recv(65535).decode("utf-8")
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError(f"{hostname} exceeded its collection deadline")
+    return remaining
 
 
-def main():
+def main(args):
     """
     Execution starts here.
     """
@@ -40,48 +163,46 @@ def main():
         "R2": "show running-config vrf",
     }
 
-    # For each host in the inventory dict, extract key and value
-    for hostname, vrf_cmd in host_dict.items():
-        # Paramiko can be SSH client or server; use client here
-        conn_params = paramiko.SSHClient()
-
-        # We don't need paramiko to refuse connections due to missing SSH keys
-        conn_params.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        conn_params.connect(
-            hostname=hostname,
-            port=22,
-            username="pyuser",
-            password="pypass",
-            look_for_keys=False,
-            allow_agent=False,
-        )
-
-        # Get an interactive shell and wait a bit for the prompt to appear
-        conn = conn_params.invoke_shell()
-        time.sleep(1.0)
-        print(f"Logged into {get_output(conn).strip()} successfully")
-
-        # Iterate over the list of commands, sending each one in series
-        # The final command in the list is the OS-specific VRF "show" command
-        commands = [
-            "terminal length 0",
-            "show version | include Software,",
-            vrf_cmd,
-        ]
-        concat_output = ""
-        for command in commands:
-            # Send command, get output, and append to output string
-            send_cmd(conn, command)
-            concat_output += get_output(conn)
-
-        # Close session when we are done
-        conn.close()
-
-        # Open a new text file per host and write the output
-        print(f"Writing {hostname} facts to file")
-        with open(f"{hostname}_facts.txt", "w") as handle:
-            handle.write(concat_output)
+    # Optionally target the emulated lab, where each host has its own port
+    addresses = {}
+    if args.inventory:
+        hosts = load_inventory(args.inventory)
+        host_dict = {host["name"]: host["vrf_cmd"] for host in hosts}
+        addresses = {
+            host["name"]: (host["address"], host["port"]) for host in hosts
+        }
+
+    # Collect from all hosts using a bounded pool of worker threads. Each
+    # host succeeds or fails on its own, then print a timing summary
+    start = time.monotonic()
+    results = run_hosts(
+        collect_facts,
+        host_dict,
+        workers=args.workers,
+        args=args,
+        addresses=addresses,
+    )
+    print_summary(results, time.monotonic() - start)
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--workers", type=int, default=10, help="concurrent hosts"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=60.0, help="per-host seconds"
+    )
+    parser.add_argument(
+        "--exec", action="store_true", help="use parallel exec channels"
+    )
+    parser.add_argument(
+        "--compress",
+        choices=[key for key in COMPRESSION_SUFFIX if key],
+        help="compress facts files as they are written",
+    )
+    parser.add_argument("--broker", help="path to ssh_broker.py socket")
+    parser.add_argument(
+        "--inventory", help="emulator_hosts.json written by lab/emulator.py"
+    )
+    main(parser.parse_args())
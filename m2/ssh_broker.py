@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: Run a local SSH session broker. It logs into devices on first
+use, keeps the sessions warm with SSH keepalives, and evicts them after
+sitting idle. Point get_print.py, get_write.py, or m3/put_paramiko.py at
+it with "--broker". A session whose command times out is closed rather
+than reused. Use "--inventory" to reach the hosts of lab/emulator.py on
+their own ports.
+"""
+
+import argparse
+import paramiko
+from expect_m2 import send_cmd, get_output
+from broker_m2 import SessionPool, BrokerServer, start_janitor
+from inventory_m2 import address_of, load_inventory
+
+
+class ShellSession:
+    """
+    One interactive paramiko shell to a device, ready for commands.
+    """
+
+    def __init__(self, hostname, port=22, keepalive=30):
+        # Same connection parameters as the standalone scripts
+        self.client = paramiko.SSHClient()
+        self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        self.client.connect(
+            hostname=hostname,
+            port=port,
+            username="pyuser",
+            password="pypass",
+            look_for_keys=False,
+            allow_agent=False,
+        )
+
+        # Keepalives stop firewalls and NAT devices from silently
+        # dropping the idle TCP connection between requests
+        self.client.get_transport().set_keepalive(keepalive)
+
+        # Open the shell, consume the login banner, and disable paging once
+        self.conn = self.client.invoke_shell()
+        get_output(self.conn)
+        self.run("terminal length 0")
+
+    def run(self, command, timeout=10.0):
+        """
+        Issues a command and returns its output once the prompt returns.
+        If the prompt does not return, the rest of the output would show
+        up in the next command's result, so the session is closed.
+        """
+        send_cmd(self.conn, command)
+        try:
+            return get_output(self.conn, timeout=timeout)
+        except (TimeoutError, EOFError):
+            self.close()
+            raise
+
+    def is_alive(self):
+        """
+        Returns True if the underlying SSH transport is still connected.
+        """
+        transport = self.client.get_transport()
+        return transport is not None and transport.is_active()
+
+    def close(self):
+        """
+        Closes the shell and the SSH connection.
+        """
+        self.client.close()
+
+
+def main(args):
+    """
+    Execution starts here.
+    """
+
+    # Emulated lab hosts are reached on their own ports; others by name
+    addresses = {}
+    if args.inventory:
+        addresses = {
+            host["name"]: (host["address"], host["port"])
+            for host in load_inventory(args.inventory)
+        }
+
+    # Create the pool, start the idle session sweeper, and serve forever
+    pool = SessionPool(
+        lambda host: ShellSession(
+            *address_of(host, addresses), keepalive=args.keepalive
+        ),
+        max_sessions=args.max_sessions,
+        idle_timeout=args.idle_timeout,
+    )
+    stop_janitor = start_janitor(pool)
+    server = BrokerServer(args.socket, pool)
+    print(f"Broker listening on {args.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Shutting down broker")
+    finally:
+        stop_janitor.set()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--socket", default="/tmp/pspynet_broker.sock")
+    parser.add_argument("--max-sessions", type=int, default=50)
+    parser.add_argument("--idle-timeout", type=float, default=300.0)
+    parser.add_argument("--keepalive", type=int, default=30)
+    parser.add_argument(
+        "--inventory", help="emulator_hosts.json written by lab/emulator.py"
+    )
+    main(parser.parse_args())
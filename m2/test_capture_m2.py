@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: The pytest functions for ensuring streamed capture files are
+written completely or not at all. Run with "-s" to see outputs.
+"""
+
+import gzip
+import pytest
+from capture_m2 import capture_filename, open_capture, atomic_capture
+
+
+def test_capture_filename():
+    """
+    The compression type determines the file suffix.
+    """
+    assert capture_filename("R1") == "R1_facts.txt"
+    assert capture_filename("R1", "gzip") == "R1_facts.txt.gz"
+    assert capture_filename("R2", "zstd") == "R2_facts.txt.zst"
+
+
+def test_atomic_capture_gzip(tmp_path):
+    """
+    Chunks written to a gzip capture decompress back to the same text,
+    and no temporary file is left behind.
+    """
+    filename = str(tmp_path / capture_filename("R1", "gzip"))
+    with atomic_capture(filename, "gzip") as handle:
+        for num in range(10000):
+            handle.write(f"vrf definition VPN{num}\n")
+
+    with gzip.open(filename, "rt") as handle:
+        lines = handle.read().splitlines()
+    assert len(lines) == 10000
+    assert lines[-1] == "vrf definition VPN9999"
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "R1_facts.txt.gz"
+    ]
+
+
+def test_atomic_capture_failure(tmp_path):
+    """
+    A failed capture removes the partial file and keeps the old one.
+    """
+    filename = tmp_path / capture_filename("R1")
+    filename.write_text("previous run\n")
+    with pytest.raises(TimeoutError):
+        with atomic_capture(str(filename)) as handle:
+            handle.write("partial output")
+            raise TimeoutError("R1 exceeded its collection deadline")
+
+    assert filename.read_text() == "previous run\n"
+    assert [path.name for path in tmp_path.iterdir()] == ["R1_facts.txt"]
+
+
+def test_open_capture_bogus(tmp_path):
+    """
+    Unknown compression types are rejected.
+    """
+    with pytest.raises(ValueError):
+        open_capture(str(tmp_path / "R1_facts.txt"), "bogus")
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: The pytest functions for ensuring commands multiplexed over
+exec channels are collected separately. Run with "-s" to see outputs.
+"""
+
+import io
+import socket
+import threading
+import pytest
+from exec_m2 import exec_commands
+
+
+class _FakeTransport:  # pylint: disable=too-few-public-methods
+    """
+    Minimal stand-in for a paramiko Transport. Each exec channel is one
+    end of a socketpair; a background thread plays the device and writes
+    the canned reply for the command to the other end.
+    """
+
+    def __init__(self, replies, hang=(), fail=()):
+        self.replies = replies
+        self.hang = hang
+        self.fail = fail
+        self.peers = []
+        self.channels = []
+
+    def open_session(self, timeout=None):
+        """
+        Return a new channel backed by a real socket.
+        """
+        local, remote = socket.socketpair()
+        local.settimeout(timeout)
+        self.peers.append(remote)
+        chan = _FakeChannel(local, remote, self)
+        self.channels.append(chan)
+        return chan
+
+
+class _FakeChannel:
+    """
+    Minimal stand-in for a paramiko Channel that supports select().
+    """
+
+    def __init__(self, sock, remote, transport):
+        self.sock = sock
+        self.remote = remote
+        self.transport = transport
+
+    def exec_command(self, command):
+        """
+        Start the device thread that answers this command.
+        """
+        if command in self.transport.fail:
+            raise EOFError(f"channel closed before {command} started")
+        if command in self.transport.hang:
+            return
+        reply = self.transport.replies[command]
+        thread = threading.Thread(target=self._answer, args=(reply,))
+        thread.start()
+
+    def _answer(self, reply):
+        """
+        Send the reply in two pieces, then close to signal EOF.
+        """
+        half = len(reply) // 2
+        self.remote.sendall(reply[:half])
+        self.remote.sendall(reply[half:])
+        self.remote.close()
+
+    def fileno(self):
+        """
+        Expose the socket descriptor so select() works.
+        """
+        return self.sock.fileno()
+
+    def recv(self, nbytes):
+        """
+        Read from the socket.
+        """
+        return self.sock.recv(nbytes)
+
+    def close(self):
+        """
+        Close the socket.
+        """
+        self.sock.close()
+
+
+def test_exec_commands():
+    """
+    Every command's output is returned separately and in full.
+    """
+    replies = {
+        "show version | include Software,": b"Cisco IOS XE Software\n",
+        "show running-config vrf": b"vrf A\n" * 50000,
+    }
+    transport = _FakeTransport(replies)
+    output_dict = exec_commands(transport, list(replies))
+    print(output_dict["show version | include Software,"])
+
+    assert list(output_dict) == list(replies)
+    for command, reply in replies.items():
+        assert output_dict[command] == reply.decode()
+
+
+def test_exec_commands_sinks():
+    """
+    Commands with a sink stream their output there instead of memory.
+    """
+    replies = {
+        "show version | include Software,": b"Cisco IOS XE Software\n",
+        "show running-config": b"hostname R1\n" * 50000,
+    }
+    sink = io.StringIO()
+    transport = _FakeTransport(replies)
+    output_dict = exec_commands(
+        transport, list(replies), sinks={"show running-config": sink}
+    )
+
+    assert output_dict["show version | include Software,"]
+    assert output_dict["show running-config"] == ""
+    assert sink.getvalue() == replies["show running-config"].decode()
+
+
+def test_exec_commands_timeout():
+    """
+    A command that never finishes raises TimeoutError.
+    """
+    transport = _FakeTransport({"show clock": b"12:00\n"}, hang=["show hang"])
+    with pytest.raises(TimeoutError, match="show hang"):
+        exec_commands(transport, ["show clock", "show hang"], timeout=0.2)
+
+
+def test_exec_commands_failed_start():
+    """
+    If a later command fails to start, channels opened for earlier
+    commands are closed rather than leaked.
+    """
+    transport = _FakeTransport({}, hang=["show clock"], fail=["show hang"])
+    with pytest.raises(EOFError):
+        exec_commands(transport, ["show clock", "show hang"], timeout=1.0)
+    assert len(transport.channels) == 2
+    assert all(chan.sock.fileno() == -1 for chan in transport.channels)
+
+
+def test_exec_commands_duplicates():
+    """
+    Repeated commands are rejected instead of sharing one result.
+    """
+    transport = _FakeTransport({"show clock": b"12:00\n"})
+    with pytest.raises(ValueError, match="show clock"):
+        exec_commands(transport, ["show clock", "show clock"])
+    assert not transport.channels
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: The pytest functions for ensuring the expect-style paramiko
+helpers stop at the prompt or deadline. Run with "-s" to see outputs.
+"""
+
+import io
+import socket
+import pytest
+from capture_m2 import capture_filename, atomic_capture
+from expect_m2 import send_cmd, get_output, stream_output, get_prompt_regex
+
+
+class _FakeChannel:
+    """
+    Minimal stand-in for a paramiko Channel. Each recv() returns the
+    next queued chunk; an empty queue behaves like a quiet device.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+        self.sent = []
+        self.timeout = None
+
+    def send(self, data):
+        """
+        Record the data sent to the device.
+        """
+        self.sent.append(data)
+
+    def settimeout(self, timeout):
+        """
+        Record the timeout requested by the reader.
+        """
+        self.timeout = timeout
+
+    def recv(self, _nbytes):
+        """
+        Return the next chunk or simulate a timeout.
+        """
+        if not self.chunks:
+            raise socket.timeout()
+        return self.chunks.pop(0)
+
+
+def test_get_prompt_regex():
+    """
+    Ensure each platform prompt regex matches its own prompts.
+    """
+    assert get_prompt_regex("ios").fullmatch("R1#")
+    assert get_prompt_regex("ios").fullmatch("R1(config-vrf)#")
+    assert get_prompt_regex("iosxr").fullmatch("RP/0/RP0/CPU0:R2#")
+    assert not get_prompt_regex("iosxr").fullmatch("R1#")
+    assert get_prompt_regex().fullmatch("RP/0/RP0/CPU0:R2(config)#")
+    assert get_prompt_regex("bogus").fullmatch("R1>")
+
+
+def test_get_output_prompt():
+    """
+    Output split across several chunks is collected until the prompt
+    appears, and anything queued after the prompt is left unread.
+    """
+    conn = _FakeChannel(
+        [
+            b"show version | include Software,\r\n",
+            b"Cisco IOS XE Software, ",
+            b"Version 16.09.02\r\nR1",
+            b"#",
+            b"unread",
+        ]
+    )
+    send_cmd(conn, "show version | include Software,")
+    output = get_output(conn, get_prompt_regex("ios"))
+    print(output)
+    assert conn.sent == ["show version | include Software,\n"]
+    assert output.endswith("Version 16.09.02\r\nR1#")
+    assert conn.chunks == [b"unread"]
+
+
+def test_get_output_deadline():
+    """
+    When the prompt never appears, the reader gives up at the deadline
+    and raises TimeoutError instead of hanging or returning partial
+    output as if it were complete.
+    """
+    conn = _FakeChannel([b"Building configuration...\r\n"])
+    with pytest.raises(TimeoutError):
+        get_output(conn, timeout=0.5)
+    assert 0 < conn.timeout <= 0.5
+
+
+def test_get_output_closed():
+    """
+    A channel that closes before the prompt appears raises EOFError.
+    """
+    conn = _FakeChannel([b"Building configuration...\r\n", b""])
+    with pytest.raises(EOFError):
+        get_output(conn)
+
+
+def test_stream_output_no_prompt(tmp_path):
+    """
+    A capture whose prompt never arrives fails, so the partial file is
+    removed and the previous capture is left alone.
+    """
+    filename = tmp_path / capture_filename("R1")
+    filename.write_text("previous run\n")
+    conn = _FakeChannel([b"vrf definition A\r\n", b" rd 65000:1\r\n"])
+    with pytest.raises(TimeoutError):
+        with atomic_capture(str(filename)) as handle:
+            stream_output(conn, handle, get_prompt_regex("ios"), timeout=0.5)
+
+    assert filename.read_text() == "previous run\n"
+    assert [path.name for path in tmp_path.iterdir()] == ["R1_facts.txt"]
+
+
+def test_get_output_multibyte():
+    """
+    Multi-byte UTF-8 characters split across chunks decode correctly.
+    """
+    conn = _FakeChannel([b"caf\xc3", b"\xa9\r\nR1#"])
+    assert get_output(conn) == "café\r\nR1#"
+
+
+def test_stream_output():
+    """
+    Output far larger than one 64 KB read is written to the handle in
+    full, chunk by chunk, rather than being truncated.
+    """
+    config = b" route-target import 65000:1\r\n" * 10000
+    chunks = [config[i : i + 65535] for i in range(0, len(config), 65535)]
+    conn = _FakeChannel(chunks + [b"RP/0/RP0/CPU0:R2#"])
+    handle = io.StringIO()
+    count = stream_output(conn, handle, get_prompt_regex("iosxr"))
+
+    assert len(chunks) > 1
+    assert count == len(config) + len("RP/0/RP0/CPU0:R2#")
+    assert handle.getvalue() == config.decode() + "RP/0/RP0/CPU0:R2#"
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: The pytest functions for ensuring the concurrent host runner
+isolates failures and overlaps work. Run with "-s" to see outputs.
+"""
+
+import time
+from fleet_m2 import run_hosts, print_summary
+
+
+def _fake_collect(hostname, delay, prefix=""):
+    """
+    Pretend to collect from a host by sleeping; negative delays fail.
+    """
+    if delay < 0:
+        raise ConnectionError(f"{hostname} unreachable")
+    time.sleep(delay)
+    return prefix + hostname
+
+
+def test_run_hosts():
+    """
+    Results come back in inventory order with failures isolated.
+    """
+    host_dict = {"R1": 0.01, "R2": -1, "R3": 0.0}
+    results = run_hosts(_fake_collect, host_dict, workers=2, prefix="x")
+    print_summary(results, 0.05)
+
+    assert [result.name for result in results] == ["R1", "R2", "R3"]
+    assert results[0].ok and results[0].result == "xR1"
+    assert not results[1].ok
+    assert isinstance(results[1].error, ConnectionError)
+    assert results[2].ok and results[2].result == "xR3"
+
+
+def test_run_hosts_concurrency():
+    """
+    Ten hosts that each wait 0.1 seconds should finish far sooner than
+    one second when run ten at a time.
+    """
+    host_dict = {f"R{num}": 0.1 for num in range(10)}
+    start = time.monotonic()
+    results = run_hosts(_fake_collect, host_dict, workers=10)
+    elapsed = time.monotonic() - start
+    print_summary(results, elapsed)
+
+    assert all(result.ok for result in results)
+    assert elapsed < 0.5
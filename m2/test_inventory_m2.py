@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: The pytest functions for ensuring emulator inventory files load
+into host dicts the course scripts can connect to. Run with "-s" to see
+outputs.
+"""
+
+import json
+from inventory_m2 import VRF_COMMANDS, address_of, load_inventory
+
+
+def test_load_inventory(tmp_path):
+    """
+    Test that hosts are sorted by name, carry their address, port, seed,
+    and VRF command, and that older files fall back to sane defaults.
+    """
+    path = tmp_path / "emulator_hosts.json"
+    inventory = {
+        "IOSXR0002": {
+            "platform": "iosxr",
+            "port": 10023,
+            "address": "127.0.0.1",
+            "seed": "R2",
+        },
+        "IOS0001": {"platform": "ios", "port": 10022},
+    }
+    path.write_text(json.dumps(inventory))
+    hosts = load_inventory(str(path))
+    print(hosts)
+    assert [host["name"] for host in hosts] == ["IOS0001", "IOSXR0002"]
+    assert hosts[0] == {
+        "name": "IOS0001",
+        "platform": "ios",
+        "address": "127.0.0.1",
+        "port": 10022,
+        "seed": "R1",
+        "vrf_cmd": VRF_COMMANDS["ios"],
+    }
+    assert hosts[1]["seed"] == "R2"
+
+    # Real routers are not in the inventory and use their name and port 22
+    addresses = {
+        host["name"]: (host["address"], host["port"]) for host in hosts
+    }
+    assert address_of("IOS0001", addresses) == ("127.0.0.1", 10022)
+    assert address_of("R1", addresses) == ("R1", 22)
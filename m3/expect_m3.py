@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: Expect-style helpers for paramiko interactive shells. Rather than
+sleeping a fixed amount of time after each command and hoping the output
+is ready, read the channel in chunks until the device prompt comes back
+or a per-command deadline expires. Bulk configuration is pushed with
+flow control so the device input buffer is never overrun.
+"""
+
+import codecs
+import re
+import socket
+import time
+from collections import namedtuple
+
+# Prompts are matched against the final (incomplete) line of output only.
+# The optional parenthesized part covers config modes like "R1(config)#"
+PROMPT_REGEX = {
+    "ios": re.compile(r"[\w.-]+(?:\([\w-]+\))?[#>]"),
+    "iosxr": re.compile(r"RP/\d+/\w+/CPU\d+:[\w.-]+(?:\([\w-]+\))?[#>]"),
+}
+
+# Outcome of a configuration push. Errors are device output lines that
+# start with "%", such as "% Invalid input detected at '^' marker."
+PushResult = namedtuple("PushResult", "lines elapsed output errors")
+
+# When the platform is not known, accept either style of prompt
+ANY_PROMPT_REGEX = re.compile(
+    r"(?:RP/\d+/\w+/CPU\d+:)?[\w.-]+(?:\([\w-]+\))?[#>]"
+)
+
+
+def get_prompt_regex(platform=None):
+    """
+    Selects the prompt regex for a given platform, falling back to the
+    generic regex that matches both IOS and IOS-XR prompts.
+    """
+    if platform is None:
+        return ANY_PROMPT_REGEX
+    return PROMPT_REGEX.get(platform.lower(), ANY_PROMPT_REGEX)
+
+
+def send_cmd(conn, command):
+    """
+    Given an open connection and a command, issue the command. There is
+    no sleep here; use get_output() to wait for the command to finish.
+    """
+    conn.send(command + "\n")
+
+
+def get_output(conn, prompt_regex=ANY_PROMPT_REGEX, timeout=10.0):
+    """
+    Given an open connection, read data in chunks until the prompt appears
+    at the end of the output or "timeout" seconds elapse, whichever comes
+    first. Returns all of the text collected, decoded as UTF-8.
+    """
+    deadline = time.monotonic() + timeout
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    chunks = []
+    last_line = ""
+    while True:
+        # Block for no longer than the time left before the deadline
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        conn.settimeout(remaining)
+        try:
+            data = conn.recv(65535)
+        except socket.timeout:
+            break
+
+        # Empty bytes means the remote side closed the channel
+        if not data:
+            break
+        text = decoder.decode(data)
+        chunks.append(text)
+
+        # Only the trailing partial line can contain the prompt
+        last_line = (last_line + text).rsplit("\n", 1)[-1]
+        if prompt_regex.fullmatch(last_line.strip()):
+            break
+
+    chunks.append(decoder.decode(b"", final=True))
+    return "".join(chunks)
+
+
+def push_config(
+    conn, config_lines, prompt_regex=ANY_PROMPT_REGEX, window=16, timeout=30.0
+):
+    """
+    Sends configuration lines with flow control. At most "window" lines
+    are in flight at once; a line is confirmed when the device echoes it
+    back, which frees room in the window for the next line. Once every
+    line is confirmed, waits for the final prompt. Raises TimeoutError if
+    the device makes no progress for "timeout" seconds. Returns a
+    PushResult with the line count, elapsed seconds, full device output,
+    and any error lines reported by the device.
+    """
+    config_lines = [line for line in config_lines if line.strip()]
+    start = time.monotonic()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    transcript = []
+    unmatched = ""
+    sent = confirmed = 0
+    deadline = start + timeout
+
+    while confirmed < len(config_lines):
+        # Top up the window; the device pace limits how fast it slides
+        while sent < len(config_lines) and sent - confirmed < window:
+            conn.send(config_lines[sent] + "\n")
+            sent += 1
+
+        text = _recv_text(conn, decoder, deadline, confirmed)
+        transcript.append(text)
+        unmatched += text
+
+        # Match echoes in order. Any progress pushes the deadline out, so
+        # "timeout" bounds a stall rather than the whole push
+        matched, unmatched = _match_echoes(
+            unmatched, config_lines[confirmed:sent]
+        )
+        if matched:
+            confirmed += matched
+            deadline = time.monotonic() + timeout
+
+    # Everything is echoed; the final prompt means the last line finished
+    while not prompt_regex.fullmatch(unmatched.rsplit("\n", 1)[-1].strip()):
+        text = _recv_text(conn, decoder, deadline, confirmed)
+        transcript.append(text)
+        unmatched = (unmatched + text).rsplit("\n", 1)[-1]
+
+    output = "".join(transcript)
+    return PushResult(
+        len(config_lines),
+        time.monotonic() - start,
+        output,
+        _error_lines(output),
+    )
+
+
+def _match_echoes(unmatched, lines):
+    """
+    Internal-only function to find the echoes of lines, in order, in the
+    unmatched device output. Returns the number of lines echoed and the
+    output left after the last echo.
+    """
+    count = 0
+    for line in lines:
+        echo = line.strip()
+        index = unmatched.find(echo)
+        if index < 0:
+            break
+        unmatched = unmatched[index + len(echo) :]
+        count += 1
+    return count, unmatched
+
+
+def _error_lines(output):
+    """
+    Internal-only function to collect the error lines in device output,
+    which start with "%".
+    """
+    return [
+        line.strip()
+        for line in output.splitlines()
+        if line.strip().startswith("%")
+    ]
+
+
+def _recv_text(conn, decoder, deadline, confirmed):
+    """
+    Internal-only function to read one chunk of text before the deadline.
+    Raises TimeoutError if nothing arrives in time or the channel closes.
+    """
+    remaining = deadline - time.monotonic()
+    if remaining > 0:
+        conn.settimeout(remaining)
+        try:
+            data = conn.recv(65535)
+        except socket.timeout:
+            data = None
+        if data:
+            return decoder.decode(data)
+    raise TimeoutError(f"device stalled after {confirmed} config lines")
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: Load the host inventory written by lab/emulator.py so the course
+scripts can target the emulated lab instead of the real routers. Each
+emulated host listens on its own port on one address, and its VRFs come
+from the seed router (R1 or R2) it was built from.
+"""
+
+import json
+
+# VRF "show" command for each platform, as used with the real routers
+VRF_COMMANDS = {
+    "ios": "show running-config | section vrf_definition",
+    "iosxr": "show running-config vrf",
+}
+
+
+def load_inventory(path):
+    """
+    Reads an emulator inventory file and returns a list of host dicts
+    with "name", "platform", "address", "port", "seed", and "vrf_cmd"
+    keys, sorted by name. Older files without an address or seed get
+    the loopback address and the seed router for their platform.
+    """
+    with open(path, "r") as handle:
+        inventory = json.load(handle)
+
+    hosts = []
+    for name, entry in sorted(inventory.items()):
+        platform = entry["platform"]
+        hosts.append(
+            {
+                "name": name,
+                "platform": platform,
+                "address": entry.get("address", "127.0.0.1"),
+                "port": int(entry["port"]),
+                "seed": entry.get("seed", "R1" if platform == "ios" else "R2"),
+                "vrf_cmd": VRF_COMMANDS[platform],
+            }
+        )
+    return hosts
+
+
+def address_of(hostname, addresses):
+    """
+    Returns the (address, port) to connect to for hostname. Hosts missing
+    from "addresses" are the real routers, reached by name on port 22.
+    """
+    return addresses.get(hostname, (hostname, 22))
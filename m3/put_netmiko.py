@@ -7,7 +7,7 @@ Purpose: Demonstrate using SSH via netmiko to configure network devices.
 
 from yaml import safe_load
 from netmiko import Netmiko
-from jinja2 import Environment, FileSystemLoader
+from render_m3 import Renderer
 
 
 def main():
@@ -23,6 +23,10 @@ def main():
     # "cisco_xr" instead of "iosxr", so use a mapping dict to convert
     platform_map = {"ios": "cisco_ios", "iosxr": "cisco_xr"}
 
+    # Setup the jinja2 templating environment once; every template is
+    # compiled up front, reusing bytecode from earlier runs
+    renderer = Renderer()
+
     # Iterate over the list of hosts (list of dictionaries)
     for host in host_root["host_list"]:
 
@@ -33,12 +37,10 @@ def main():
         with open(f"vars/{host['name']}_vrfs.yml", "r") as handle:
             vrfs = safe_load(handle)
 
-        # Setup the jinja2 templating environment and render the template
-        j2_env = Environment(
-            loader=FileSystemLoader("."), trim_blocks=True, autoescape=True
+        # Render the template for this host
+        new_vrf_config = renderer.render(
+            f"templates/netmiko/{platform}_vpn.j2", data=vrfs
         )
-        template = j2_env.get_template(f"templates/netmiko/{platform}_vpn.j2")
-        new_vrf_config = template.render(data=vrfs)
 
         # Create netmiko SSH connection handler to access the device
         conn = Netmiko(
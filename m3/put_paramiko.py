@@ -3,81 +3,123 @@
 """
 Author: Nick Russo
 Purpose: Demonstrate using SSH via paramiko to configure network devices.
+Use "--inventory" to target the hosts of lab/emulator.py instead; each
+emulated host is configured from the vars/ file of its seed router. Use
+"--broker" to push through warm sessions held by m2/ssh_broker.py.
 """
 
+import argparse
 import time
 import paramiko
 from yaml import safe_load
-from jinja2 import Environment, FileSystemLoader
+from expect_m3 import PushResult, get_output, get_prompt_regex, push_config
+from render_m3 import Renderer
+from inventory_m3 import load_inventory
+from broker_m3 import broker_run
 
 
-def send_cmd(conn, command):
+def push_direct(host, config_lines):
     """
-    Given an open connection and a command, issue the command and wait
-    1 second for the command to be processed. Sometimes this has to be
-    increased, can be very tricky!
+    Logs into the host with a new paramiko shell, streams the config lines
+    with flow control, and logs out. Returns a PushResult.
     """
-    output = conn.send(command + "\n")
-    time.sleep(1.0)
-    return output
+
+    # Create paramiko SSH client to connect to the device
+    conn_params = paramiko.SSHClient()
+    conn_params.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    conn_params.connect(
+        hostname=host.get("address", host["name"]),
+        port=host.get("port", 22),
+        username="pyuser",
+        password="pypass",
+        look_for_keys=False,
+        allow_agent=False,
+    )
+
+    # Start an interactive shell and collect the prompt
+    conn = conn_params.invoke_shell()
+    prompt_regex = get_prompt_regex(host["platform"])
+    login_output = get_output(conn, prompt_regex)
+    print(f"Logged into {login_output.strip()} successfully")
+
+    # Stream the configuration with flow control: lines are only sent
+    # as fast as the device echoes them back, then wait for the prompt
+    try:
+        return push_config(conn, config_lines, prompt_regex)
+    finally:
+        conn.close()
 
 
-def get_output(conn):
+def push_brokered(socket_path, host, config_lines):
     """
-    Given an open connection, read all the data from the buffer and
-    decode the byte string as UTF-8.
+    Sends the config lines through the warm session that ssh_broker.py
+    holds for the host, skipping the SSH login. Lines run one at a time,
+    each waiting for the prompt, so there is no windowed flow control.
+    Returns a PushResult.
     """
-    return conn.recv(65535).decode("utf-8")
-
-
-def main():
+    start = time.monotonic()
+    commands = [line for line in config_lines if line.strip()]
+    outputs = broker_run(socket_path, host["name"], commands, timeout=30.0)
+    output = "".join(outputs)
+    errors = [
+        line.strip()
+        for line in output.splitlines()
+        if line.strip().startswith("%")
+    ]
+    return PushResult(len(commands), time.monotonic() - start, output, errors)
+
+
+def main(args):
     """
     Execution starts here.
     """
 
-    # Read the hosts file into structured data, may raise YAMLError
-    with open("hosts.yml", "r") as handle:
-        host_root = safe_load(handle)
+    # Read the hosts file into structured data, may raise YAMLError.
+    # Optionally target the emulated lab, where each host has its own port
+    if args.inventory:
+        host_root = {"host_list": load_inventory(args.inventory)}
+    else:
+        with open("hosts.yml", "r") as handle:
+            host_root = safe_load(handle)
+
+    # Setup the jinja2 templating environment once; every template is
+    # compiled up front, reusing bytecode from earlier runs
+    renderer = Renderer()
 
     # Iterate over the list of hosts (list of dictionaries)
     for host in host_root["host_list"]:
 
         # Load the host-specific VRF declarative state
-        with open(f"vars/{host['name']}_vrfs.yml", "r") as handle:
+        vars_name = host.get("seed", host["name"])
+        with open(f"vars/{vars_name}_vrfs.yml", "r") as handle:
             vrfs = safe_load(handle)
 
-        # Setup the jinja2 templating environment and render the template
-        j2_env = Environment(
-            loader=FileSystemLoader("."), trim_blocks=True, autoescape=True
+        # Render the template for this host
+        new_vrf_config = renderer.render(
+            f"templates/paramiko/{host['platform']}_vpn.j2", data=vrfs
         )
-        template = j2_env.get_template(
-            f"templates/paramiko/{host['platform']}_vpn.j2"
-        )
-        new_vrf_config = template.render(data=vrfs)
-
-        # Create paramiko SSH client to connect to the device
-        conn_params = paramiko.SSHClient()
-        conn_params.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        conn_params.connect(
-            hostname=host["name"],
-            port=22,
-            username="pyuser",
-            password="pypass",
-            look_for_keys=False,
-            allow_agent=False,
-        )
-
-        # Start an interactive shell and collect the prompt
-        conn = conn_params.invoke_shell()
-        time.sleep(1.0)
-        print(f"Logged into {get_output(conn).strip()} successfully")
 
-        # Send the configuration string to the device
+        # Push the configuration on a new login, or on the broker's warm
+        # session when one is given
         print(new_vrf_config)
-        send_cmd(conn, new_vrf_config)
-        print(f"Updated {host['name']} VRF configuration")
-        conn.close()
+        config_lines = new_vrf_config.split("\n")
+        if args.broker:
+            result = push_brokered(args.broker, host, config_lines)
+        else:
+            result = push_direct(host, config_lines)
+        for error in result.errors:
+            print(f"{host['name']} error: {error}")
+        rate = result.lines / result.elapsed if result.elapsed else 0
+        print(
+            f"Updated {host['name']} VRF configuration: {result.lines} lines "
+            f"in {result.elapsed:.2f}s ({rate:.1f} lines/s)"
+        )
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--inventory", help="emulator_hosts.json written by lab/emulator.py"
+    )
+    parser.add_argument("--broker", help="path to m2/ssh_broker.py socket")
+    main(parser.parse_args())
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: The pytest functions for ensuring the session broker reuses,
+caps, and evicts sessions correctly. Run with "-s" to see outputs.
+"""
+
+import threading
+import time
+import pytest
+from broker_m3 import SessionPool, BrokerServer, broker_run
+
+
+class _FakeSession:
+    """
+    Stand-in for a logged-in device session that records its commands.
+    """
+
+    logins = []
+
+    def __init__(self, host):
+        if host == "down":
+            raise ConnectionError("host unreachable")
+        self.host = host
+        self.alive = True
+        self.commands = []
+        _FakeSession.logins.append(host)
+
+    def run(self, command, timeout=10.0):
+        """
+        Return a canned output, or fail if the session was dropped.
+        """
+        if not self.alive:
+            raise EOFError("session dropped")
+        if command == "show hang":
+            raise TimeoutError("prompt not seen")
+        self.commands.append(command)
+        return f"{self.host}: {command} (timeout {timeout})"
+
+    def is_alive(self):
+        """
+        Pretend the transport looks fine, even if the device dropped it.
+        """
+        return True
+
+    def close(self):
+        """
+        Mark the session closed.
+        """
+        self.alive = False
+
+
+@pytest.fixture(autouse=True)
+def _reset_logins():
+    """
+    Clear the login history before each test.
+    """
+    _FakeSession.logins = []
+
+
+def test_pool_reuse():
+    """
+    Repeated requests for a host reuse one session (one login).
+    """
+    pool = SessionPool(_FakeSession)
+    assert pool.run("R1", ["show version"]) == [
+        "R1: show version (timeout 10.0)"
+    ]
+    pool.run("R1", ["show clock", "show users"], timeout=5)
+    assert _FakeSession.logins == ["R1"]
+    assert pool.hosts() == ["R1"]
+
+
+def test_pool_max_sessions():
+    """
+    Adding a host to a full pool evicts the least recently used one.
+    """
+    pool = SessionPool(_FakeSession, max_sessions=2)
+    pool.run("R1", ["show version"])
+    pool.run("R2", ["show version"])
+    pool.run("R1", ["show version"])
+    pool.run("R3", ["show version"])
+    assert pool.hosts() == ["R1", "R3"]
+
+
+def test_pool_evict_idle():
+    """
+    Sessions idle longer than the timeout are evicted and closed.
+    """
+    pool = SessionPool(_FakeSession, idle_timeout=0.05)
+    pool.run("R1", ["show version"])
+    assert pool.evict_idle() == []
+    time.sleep(0.1)
+    assert pool.evict_idle() == ["R1"]
+    assert pool.hosts() == []
+
+
+def test_pool_stale_session():
+    """
+    A reused session that was silently dropped is replaced once, and a
+    host that cannot connect is not left in the pool.
+    """
+    pool = SessionPool(_FakeSession)
+    pool.run("R1", ["show version"])
+    pool.close_all()
+    pool.run("R1", ["show version"])
+
+    # Simulate the device dropping the idle session behind our back
+    # pylint: disable=protected-access
+    pool._entries["R1"].session.alive = False
+    assert pool.run("R1", ["show clock"])[0].startswith("R1: show clock")
+    assert _FakeSession.logins == ["R1", "R1", "R1"]
+
+    with pytest.raises(ConnectionError):
+        pool.run("down", ["show version"])
+    assert pool.hosts() == ["R1"]
+
+
+def test_pool_timeout_drops_session():
+    """
+    A command that times out closes and drops the session without a
+    retry, so the next request gets a fresh login.
+    """
+    pool = SessionPool(_FakeSession)
+    pool.run("R1", ["show version"])
+    # pylint: disable=protected-access
+    session = pool._entries["R1"].session
+    with pytest.raises(TimeoutError):
+        pool.run("R1", ["show hang"])
+    assert not session.alive
+    assert not pool.hosts()
+    assert _FakeSession.logins == ["R1"]
+
+    pool.run("R1", ["show clock"])
+    assert _FakeSession.logins == ["R1", "R1"]
+
+
+def test_broker_roundtrip(tmp_path):
+    """
+    A client talks to the broker over its Unix socket, and failures come
+    back as RuntimeError rather than hanging the client.
+    """
+    socket_path = str(tmp_path / "broker.sock")
+    server = BrokerServer(socket_path, SessionPool(_FakeSession))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        outputs = broker_run(socket_path, "R2", ["show version"], timeout=3)
+        assert outputs == ["R2: show version (timeout 3)"]
+        broker_run(socket_path, "R2", ["show clock"])
+        assert _FakeSession.logins == ["R2"]
+
+        with pytest.raises(RuntimeError, match="unreachable"):
+            broker_run(socket_path, "down", ["show version"])
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    with pytest.raises(ConnectionError):
+        broker_run(socket_path, "R2", ["show version"])
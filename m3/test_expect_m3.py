@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: The pytest functions for ensuring flow-controlled configuration
+pushes never overrun the device. Run with "-s" to see outputs.
+"""
+
+import socket
+import pytest
+from expect_m3 import get_prompt_regex, push_config
+
+
+class _FakeDevice:
+    """
+    Stand-in for a paramiko Channel attached to an IOS device. Sent lines
+    queue up in the device input buffer; each recv() processes one line
+    and returns its echo, any error, and the next prompt.
+    """
+
+    def __init__(self, stall_after=None):
+        self.inbox = []
+        self.max_inbox = 0
+        self.processed = 0
+        self.stall_after = stall_after
+
+    def send(self, data):
+        """
+        Queue a line in the device input buffer.
+        """
+        self.inbox.append(data.rstrip("\n"))
+        self.max_inbox = max(self.max_inbox, len(self.inbox))
+
+    def settimeout(self, _timeout):
+        """
+        Timeouts are simulated by raising immediately in recv().
+        """
+
+    def recv(self, _nbytes):
+        """
+        Process one queued line, or time out if the device is idle.
+        """
+        if not self.inbox or self.processed == self.stall_after:
+            raise socket.timeout()
+        line = self.inbox.pop(0)
+        self.processed += 1
+        reply = f"{line}\r\n"
+        if line.startswith("bogus"):
+            reply += "% Invalid input detected at '^' marker.\r\n"
+        prompt = "R1#" if line == "end" else "R1(config)#"
+        return (reply + prompt).encode()
+
+
+def test_push_config():
+    """
+    A large config is fully confirmed without exceeding the window, and
+    device errors are reported.
+    """
+    config_lines = ["configure terminal"]
+    for num in range(500):
+        config_lines.append(f"vrf definition VPN{num}")
+        config_lines.append(f" rd 65000:{num}")
+    config_lines.extend(["bogus command", "", "end"])
+
+    conn = _FakeDevice()
+    result = push_config(conn, config_lines, get_prompt_regex("ios"), window=8)
+    print(result.errors)
+
+    assert result.lines == 1003
+    assert conn.processed == 1003
+    assert conn.max_inbox <= 8
+    assert result.output.endswith("end\r\nR1#")
+    assert result.errors == ["% Invalid input detected at '^' marker."]
+
+
+def test_push_config_stall():
+    """
+    A device that stops echoing raises TimeoutError.
+    """
+    conn = _FakeDevice(stall_after=3)
+    lines = ["configure terminal", "vrf definition A", " rd 1:1", "end"]
+    with pytest.raises(TimeoutError, match="after 3 config lines"):
+        push_config(conn, lines, window=2, timeout=0.1)
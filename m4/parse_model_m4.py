@@ -4,9 +4,47 @@
 Author: Nick Russo
 Purpose: Develop product model ID parsers for IOS-XE and IOS-XR.
 These are focused on just the model ID and not general information.
+The parse_facts() extractor pulls several fields in a single pass.
 """
 
 import re
+from collections import namedtuple
+
+# Typed record of device facts; fields not found in the output are None.
+# Memory is the main memory size in kilobytes.
+Facts = namedtuple("Facts", "hostname model version serial uptime memory")
+
+# Model regexes are compiled once at import time, not on every call
+IOS_MODEL_REGEX = re.compile(
+    r"cisco\s+(?P<model>\S+)\s+\(\S+\)\s+processor\s+"
+)
+IOSXR_MODEL_REGEX = re.compile(r"\s+PID\s+:[ \t]+(?P<model>\S+)")
+
+# Each platform combines all of its facts patterns into one alternation,
+# so a single scan of the text finds every field. Group names identify
+# which field each match supplies.
+FACTS_REGEX = {
+    "ios": re.compile(
+        r"""
+        ^\s*Cisco\ IOS(?:\ XE)?\ Software.*?,\s+Version\s+(?P<version>[^,\s]+)
+        | ^\s*(?P<hostname>\S+)\s+uptime\s+is\s+(?P<uptime>.+?)\s*$
+        | ^\s*cisco\s+(?P<model>\S+)\s+\(\S+\)\s+processor\s
+          (?:.*?with\s+(?P<memory>\d+)K/\d+K)?
+        | ^\s*Processor\s+board\s+ID\s+(?P<serial>\S+)
+        """,
+        re.MULTILINE | re.VERBOSE,
+    ),
+    "iosxr": re.compile(
+        r"""
+        ^\s*Cisco\ IOS\ XR\ Software,\s+Version\s+(?P<version>[^\s\[]+)
+        | ^\s*(?P<hostname>\S+)\s+uptime\s+is\s+(?P<uptime>.+?)\s*$
+        | ^.*processor\s+with\s+(?P<memory>\d+)K\s+bytes\s+of\s+memory
+        | ^\s*PID\s+:[ \t]+(?P<model>\S+)
+        | ^\s*Serial\s+Number\s+:[ \t]+(?P<serial>\S+)
+        """,
+        re.MULTILINE | re.VERBOSE,
+    ),
+}
 
 
 def parse_model_ios(text):
@@ -15,10 +53,9 @@ def parse_model_ios(text):
     If not match is found, None is returned. Sample:
     cisco CSR1000V (VXE) processor (revision VXE) with 31K/32K memory.
     """
-    model_regex = re.compile(r"cisco\s+(?P<model>\S+)\s+\(\S+\)\s+processor\s+")
 
     # Attempt to match the regex against the specific input.
-    model_match = model_regex.search(text)
+    model_match = IOS_MODEL_REGEX.search(text)
     if model_match:
         return model_match.group("model")
 
@@ -32,12 +69,30 @@ def parse_model_iosxr(text):
     If not match is found, None is returned. Sample:
     PID                  : R-IOSXRV9000-RP-C
     """
-    model_regex = re.compile(r"\s+PID\s+:[ \t]+(?P<model>\S+)")
 
     # Attempt to match the regex against the specific input.
-    model_match = model_regex.search(text)
+    model_match = IOSXR_MODEL_REGEX.search(text)
     if model_match:
         return model_match.group("model")
 
     # No match was found
     return None
+
+
+def parse_facts(text, platform):
+    """
+    Parses hostname, model, version, serial, uptime, and memory from the
+    "show version" output (plus "show diag" for IOS-XR, concatenated) in
+    one scan and returns a Facts record. The first value found for each
+    field wins.
+    """
+    facts = dict.fromkeys(Facts._fields)
+    for match in FACTS_REGEX[platform.lower()].finditer(text):
+        for field, value in match.groupdict().items():
+            if value is not None and facts[field] is None:
+                facts[field] = value
+
+    # Convert numeric fields to their proper types
+    if facts["memory"] is not None:
+        facts["memory"] = int(facts["memory"])
+    return Facts(**facts)
@@ -8,6 +8,15 @@ These are focused on route-targets and not general-purpose VRF fields.
 
 import re
 
+# Patterns are compiled once at import time and matched against a single
+# stripped line, so parsing is one pass over the text regardless of size
+IOS_VRF_REGEX = re.compile(r"vrf\s+definition\s+(?P<name>\S+)$")
+IOS_RT_REGEX = re.compile(
+    r"route-target\s+(?P<direction>import|export)\s+(?P<rt>\S+)"
+)
+IOSXR_VRF_REGEX = re.compile(r"vrf\s+(?P<name>\S+)$")
+IOSXR_RT_REGEX = re.compile(r"(?P<direction>import|export)\s+route-target$")
+
 
 def parse_rt_ios(text):
     """
@@ -15,30 +24,7 @@ def parse_rt_ios(text):
     typically feeds into the rt_diff function to be tested against the
     intended config.
     """
-    vrf_list = ["vrf" + s for s in text.strip().split("vrf") if s]
-    return_dict = {}
-    for vrf in vrf_list:
-        # Parse the VRF name from the definition line
-        name_regex = re.compile(r"vrf\s+definition\s+(?P<name>\S+)")
-        name_match = name_regex.search(vrf)
-        sub_dict = {}
-        vrf_dict = {name_match.group("name"): sub_dict}
-
-        # Parse the RT imports into a list of strings
-        rti_regex = re.compile(r"route-target\s+import\s+(?P<rti>\d+:\d+)")
-        rti_matches = rti_regex.findall(vrf)
-        sub_dict.update({"route_import": rti_matches})
-
-        # Parse the RT exports into a list of strings
-        rte_regex = re.compile(r"route-target\s+export\s+(?P<rte>\d+:\d+)")
-        rte_matches = rte_regex.findall(vrf)
-        sub_dict.update({"route_export": rte_matches})
-
-        # Append dictionary to return list
-        return_dict.update(vrf_dict)
-
-    # Return the VRF-name indexable dict for reference later
-    return return_dict
+    return dict(_iter_rt(text.splitlines(), "ios"))
 
 
 def parse_rt_iosxr(text):
@@ -47,42 +33,75 @@ def parse_rt_iosxr(text):
     typically feeds into the rt_diff function to be tested against the
     intended config.
     """
-    vrf_list = ["vrf" + s for s in text.strip().split("vrf") if s]
-    return_dict = {}
-    for vrf in vrf_list:
-        # Parse the VRF name from the definition line
-        name_regex = re.compile(r"^vrf\s+(?P<name>\S+)")
-        name_match = name_regex.search(vrf)
-        sub_dict = {}
-        vrf_dict = {name_match.group("name"): sub_dict}
-
-        # Capture all text in between the start of "import route-target"
-        # and the first exclamation mark to grab all import RTs
-        rti_list = _get_iosxr_rt(r"import\s+route-target(.+?)!", vrf)
-        sub_dict.update({"route_import": rti_list})
+    return dict(_iter_rt(text.splitlines(), "iosxr"))
 
-        # Repeat the same process for export RTs
-        rte_list = _get_iosxr_rt(r"export\s+route-target(.+?)!", vrf)
-        sub_dict.update({"route_export": rte_list})
 
-        # Append dictionary to return list
-        return_dict.update(vrf_dict)
-
-    return return_dict
-
-
-def _get_iosxr_rt(regex_str, vrf_str):
+def _iter_rt(lines, platform):
     """
-    Internal-only function to parse IOS XR route targets from
-    a VRF text output. This is a better design pattern than
-    copy/paste, which was done for the IOS parser.
+    Internal-only function implementing the parser as a line-oriented
+    state machine shared by both platforms. A VRF starts at a definition
+    line and ends at the next line indented no deeper than it, so names or
+    descriptions containing "vrf" cannot split a block. IOS lists each RT
+    on its own "route-target" line while IOS XR nests bare RTs beneath an
+    "import/export route-target" line. Yields (name, rt_dict) tuples as
+    each VRF closes.
     """
-    regex = re.compile(regex_str, re.DOTALL)
-    rt_matches = regex.findall(vrf_str, re.DOTALL)
-    if rt_matches:
-        rt_list = [s.strip() for s in rt_matches[0].strip().split("\n")]
-    else:
-        rt_list = []
-
-    # Return the list of parsed route-targets
-    return rt_list
+    vrf_regex = IOS_VRF_REGEX if platform == "ios" else IOSXR_VRF_REGEX
+
+    # VRF definitions all sit at the indent of the first one found, which
+    # ignores nested lines like "vrf X" under "router bgp" on IOS XR
+    vrf_indent = name = None
+    block = {}
+    for line in lines:
+        text = line.strip()
+        if not text:
+            continue
+        indent = len(line) - len(line.lstrip())
+
+        # A line at or above the definition indent closes the current VRF
+        if name is not None and indent <= vrf_indent:
+            yield name, block["data"]
+            name = None
+
+        # Check for the start of a new VRF block
+        if vrf_indent is None or indent == vrf_indent:
+            vrf_match = vrf_regex.match(text)
+            if vrf_match:
+                vrf_indent = indent
+                name = vrf_match.group("name")
+                block = {
+                    "data": {"route_import": [], "route_export": []},
+                    "rt_list": None,
+                }
+                continue
+        if name is not None:
+            _parse_rt_line(block, text, indent, platform)
+
+    # Emit the final VRF, which may not have a closing line
+    if name is not None:
+        yield name, block["data"]
+
+
+def _parse_rt_line(block, text, indent, platform):
+    """
+    Internal-only function to apply one line inside a VRF block. "block"
+    holds the rt_dict being built as "data" and, on IOS XR, the RT list
+    currently being collected.
+    """
+
+    # IOS XR: collect bare RTs indented beneath the list header
+    if block["rt_list"] is not None:
+        if indent > block["rt_indent"]:
+            block["rt_list"].append(text)
+            return
+        block["rt_list"] = None
+
+    # IOS: one RT per line. IOS XR: start collecting a nested list
+    rt_regex = IOS_RT_REGEX if platform == "ios" else IOSXR_RT_REGEX
+    rt_match = rt_regex.match(text)
+    if rt_match:
+        key = f"route_{rt_match.group('direction')}"
+        if platform == "ios":
+            block["data"][key].append(rt_match.group("rt"))
+        else:
+            block["rt_list"], block["rt_indent"] = block["data"][key], indent
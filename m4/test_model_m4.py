@@ -6,7 +6,7 @@ Purpose: The pytest functions for ensuring platform model ID parsers
 for IOS-XE and IOS-XR are functional. Run with "-s" to see outputs.
 """
 
-from parse_model_m4 import parse_model_ios, parse_model_iosxr
+from parse_model_m4 import parse_model_ios, parse_model_iosxr, parse_facts
 
 
 def test_parse_model_ios():
@@ -75,3 +75,66 @@ def test_parse_model_iosxr():
         model_data = parse_model_iosxr(model_output)
         print(model_data)
         assert model_data == model_answer
+
+
+def test_parse_facts_ios():
+    """
+    Defines unit tests for the single-pass Cisco IOS XE facts extractor.
+    """
+
+    # Create and display some test data
+    version_output = """
+        Cisco IOS XE Software, Version 16.09.02
+        Cisco IOS Software [Fuji], Virtual XE Software (X86_64_LINUX_IOSD-
+        UNIVERSALK9-M), Version 16.9.2, RELEASE SOFTWARE (fc4)
+        R1 uptime is 1 hour, 5 minutes
+        cisco CSR1000V (VXE) processor (revision VXE) with 2392579K/3075K bytes
+        Processor board ID 9TH4AXITD7I
+    """
+    print(version_output)
+
+    # Perform parsing, print structured data, and validate
+    facts = parse_facts(version_output, "ios")
+    print(facts)
+    assert facts.hostname == "R1"
+    assert facts.model == "CSR1000V"
+    assert facts.version == "16.09.02"
+    assert facts.serial == "9TH4AXITD7I"
+    assert facts.uptime == "1 hour, 5 minutes"
+    assert facts.memory == 2392579
+
+    # Missing fields are None rather than raising errors
+    facts = parse_facts("R1 uptime is 2 weeks", "ios")
+    assert facts.uptime == "2 weeks"
+    assert facts.model is None and facts.memory is None
+
+
+def test_parse_facts_iosxr():
+    """
+    Defines unit tests for the single-pass Cisco IOS XR facts extractor,
+    given "show version" and "show diag" output together.
+    """
+
+    # Create and display some test data
+    version_output = """
+        Cisco IOS XR Software, Version 6.3.1
+        Copyright (c) 2013-2017 by Cisco Systems, Inc.
+        R2 uptime is 3 days, 2 hours
+        cisco IOS-XRv 9000 () processor with 3145215K bytes of memory.
+        0/RP0-Fake-IDPROM - Cisco XRv9K Centralized ...
+         Info:
+            PID                      : R-IOSXRV9000-RP-C
+            Version Identifier       : V01
+            Serial Number            : 4A3C7B1E2D
+    """
+    print(version_output)
+
+    # Perform parsing, print structured data, and validate
+    facts = parse_facts(version_output, "iosxr")
+    print(facts)
+    assert facts.hostname == "R2"
+    assert facts.model == "R-IOSXRV9000-RP-C"
+    assert facts.version == "6.3.1"
+    assert facts.serial == "4A3C7B1E2D"
+    assert facts.uptime == "3 days, 2 hours"
+    assert facts.memory == 3145215
@@ -3,19 +3,55 @@
 """
 Author: Nick Russo
 Purpose: Demonstrate using NAPALM via SSH to interact with multiple
-platforms to collect structured data.
+platforms to collect structured data. Use "--fast" to skip hosts whose
+vars file and template are unchanged and whose configuration-change
+marker still matches the last confirmed run; the check needs only a
+short SSH login and one show command, not a NAPALM session. Use "--full"
+to check every host anyway. Facts are served from a local cache while
+fresh; use "--refresh-facts" to always ask the devices.
 """
 
+import argparse
 from napalm import get_network_driver
-from jinja2 import Environment, FileSystemLoader
 from yaml import safe_load
+from fastpath_m5 import (
+    FastPath,
+    fetch_marker,
+    intended_fingerprint,
+    marker_from_cli,
+)
+from facts_m5 import FactsStore
+from render_m5 import Renderer
 
 
-def main():
+def fast_path_key(host):
+    """
+    Returns (intended, marker) for a host: the fingerprint of its vars
+    file and template, and its current configuration-change marker.
+    """
+    intended = intended_fingerprint(
+        [
+            f"vars/{host['name']}_vrfs.yml",
+            f"templates/basic/{host['platform']}_vpn.j2",
+        ]
+    )
+    return intended, fetch_marker(host["name"], host["platform"])
+
+
+def main(args):
     """
     Execution starts here.
     """
 
+    # Intended fingerprints and markers of hosts confirmed in sync
+    fastpath = FastPath() if args.fast else None
+
+    # Facts rarely change, so reuse them while they are fresh
+    facts_store = FactsStore()
+
+    # Compile every template once, reusing bytecode from earlier runs
+    renderer = Renderer()
+
     # Read the hosts file into structured data, may raise YAMLError
     with open("hosts.yml", "r") as handle:
         host_root = safe_load(handle)
@@ -23,6 +59,15 @@ def main():
     # Iterate over the list of hosts from YAML file
     for host in host_root["host_list"]:
 
+        # Skip hosts whose intended state and device marker are unchanged
+        if fastpath is not None:
+            intended, marker = fast_path_key(host)
+            if not args.full and fastpath.can_skip(
+                host["name"], intended, marker
+            ):
+                print(f"{host['name']}: unchanged since last run; skipped\n")
+                continue
+
         # Determine and create the network driver object based on platform
         print(f"Getting {host['platform']} driver")
         driver = get_network_driver(host["platform"])
@@ -30,10 +75,16 @@ def main():
             hostname=host["name"], username="pyuser", password="pypass"
         )
 
-        # Open the connection and get the model ID
+        # Open the connection and get the model ID. Only ask for facts
+        # that stay fresh for days so the cache can answer the next run
         print("Opening connection and fathering facts")
         conn.open()
-        facts = conn.get_facts()
+        facts = facts_store.get_or_fetch(
+            host["name"],
+            conn.get_facts,
+            fields=("model", "os_version"),
+            refresh=args.refresh_facts,
+        )
         print(facts)
         print(f"{host['name']} model type: {facts['model']}")
 
@@ -42,13 +93,9 @@ def main():
             vrfs = safe_load(handle)
 
         # Template the configuration changes based on the RT updates
-        j2_env = Environment(
-            loader=FileSystemLoader("."), trim_blocks=True, autoescape=True
+        new_vrf_config = renderer.render(
+            f"templates/basic/{host['platform']}_vpn.j2", data=vrfs["vrfs"]
         )
-        template = j2_env.get_template(
-            f"templates/basic/{host['platform']}_vpn.j2"
-        )
-        new_vrf_config = template.render(data=vrfs["vrfs"])
 
         # Use NAPALM built-in merging to compare and merge RT updates
         # Note that dynamically removing configuration is still a challenge
@@ -59,13 +106,40 @@ def main():
             print(diff)
             print("Committing configuration changes")
             conn.commit_config()
+
+            # Read the new marker on this session right away to keep the
+            # window for unseen changes small
+            if fastpath is not None:
+                marker = marker_from_cli(conn.cli, host["platform"])
         else:
             print("no diff; config up to date")
 
         # All done; close the connection
         conn.close()
+        if fastpath is not None:
+            fastpath.record(host["name"], intended, marker)
         print("OK!\n")
 
+    if fastpath is not None:
+        fastpath.save()
+    facts_store.close()
+
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--refresh-facts",
+        action="store_true",
+        help="ignore cached facts and run get_facts on every device",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="check every host even if the fast path could skip it",
+    )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="skip hosts whose intended state and change marker are unchanged",
+    )
+    main(parser.parse_args())
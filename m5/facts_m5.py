@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: SQLite-backed cache of NAPALM "get_facts" results with a TTL per
+field. Facts like model and serial number rarely change, so they live
+for weeks, while uptime expires within a minute. Callers ask for the
+fields they need and get_facts() only runs when one of them is missing
+or stale (or a refresh is forced). Run this file directly to print a
+staleness report for every cached fact.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+# Seconds each NAPALM fact stays fresh; other fields use the default TTL
+DAY = 24 * 60 * 60
+FACT_TTLS = {
+    "vendor": 90 * DAY,
+    "model": 30 * DAY,
+    "serial_number": 30 * DAY,
+    "hostname": DAY,
+    "fqdn": DAY,
+    "os_version": DAY,
+    "interface_list": 60 * 60,
+    "uptime": 60,
+}
+DEFAULT_TTL = 60 * 60
+
+# One row of the staleness report; age and ttl are in seconds
+FactAge = namedtuple("FactAge", "host field age ttl stale")
+
+
+class FactsStore:
+    """
+    Facts cache in a single SQLite file, one row per (host, field). Safe
+    to share across threads.
+    """
+
+    def __init__(
+        self,
+        path=os.path.join(".cache", "facts.sqlite3"),
+        ttls=None,
+        default_ttl=DEFAULT_TTL,
+    ):
+        self.path = path
+        self.ttls = dict(FACT_TTLS, **(ttls or {}))
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS facts ("
+                "host TEXT, field TEXT, value TEXT, stored REAL, "
+                "PRIMARY KEY (host, field))"
+            )
+
+    def ttl(self, field):
+        """
+        Returns the number of seconds the field stays fresh.
+        """
+        return self.ttls.get(field, self.default_ttl)
+
+    def get(self, host, fields=None):
+        """
+        Returns a dict of the requested fields if every one of them is
+        cached and fresh, or None otherwise. With fields=None, all cached
+        fields for the host must be fresh.
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT field, value, stored FROM facts WHERE host = ?",
+                (host,),
+            ).fetchall()
+        cached = {field: (value, stored) for field, value, stored in rows}
+        wanted = list(cached) if fields is None else list(fields)
+        if not wanted:
+            return None
+
+        facts = {}
+        for field in wanted:
+            if field not in cached:
+                return None
+            value, stored = cached[field]
+            if now - stored > self.ttl(field):
+                return None
+            facts[field] = json.loads(value)
+        return facts
+
+    def put(self, host, facts):
+        """
+        Stores every field of the facts dict for the host, stamped with
+        the current time.
+        """
+        now = time.time()
+        rows = [
+            (host, field, json.dumps(value), now)
+            for field, value in facts.items()
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO facts VALUES (?, ?, ?, ?)", rows
+            )
+
+    def get_or_fetch(self, host, fetch, fields=("model",), refresh=False):
+        """
+        Returns the requested fields (all fields with fields=None) from the
+        cache, calling fetch() for a full facts dict only when one of them
+        is missing or stale, or when refresh is True.
+        """
+        if not refresh:
+            facts = self.get(host, fields)
+            if facts is not None:
+                return facts
+        facts = fetch()
+        self.put(host, facts)
+        if fields is None:
+            return facts
+        return {field: facts.get(field) for field in fields}
+
+    def invalidate(self, host=None):
+        """
+        Forgets the cached facts for one host, or for every host when
+        host is None, forcing a fetch on next use.
+        """
+        with self._lock, self._conn:
+            if host is None:
+                self._conn.execute("DELETE FROM facts")
+            else:
+                self._conn.execute("DELETE FROM facts WHERE host = ?", (host,))
+
+    def staleness(self):
+        """
+        Returns a FactAge for every cached fact, sorted by host and field.
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT host, field, stored FROM facts ORDER BY host, field"
+            ).fetchall()
+        report = []
+        for host, field, stored in rows:
+            age = now - stored
+            ttl = self.ttl(field)
+            report.append(FactAge(host, field, age, ttl, age > ttl))
+        return report
+
+    def close(self):
+        """
+        Closes the underlying database connection.
+        """
+        with self._lock:
+            self._conn.close()
+
+
+def print_staleness(report):
+    """
+    Prints one row per cached fact with its age and TTL, then the number
+    of stale facts.
+    """
+    print(f"{'HOST':<16} {'FIELD':<16} {'AGE':>10} {'TTL':>10}  STATE")
+    for row in report:
+        state = "STALE" if row.stale else "fresh"
+        print(
+            f"{row.host:<16} {row.field:<16} "
+            f"{row.age:>10.0f} {row.ttl:>10.0f}  {state}"
+        )
+    stale_count = sum(1 for row in report if row.stale)
+    print(f"\n{stale_count}/{len(report)} cached facts are stale")
+
+
+def main(args):
+    """
+    Execution starts here.
+    """
+    store = FactsStore(args.path)
+    for host in args.forget:
+        store.invalidate(host)
+    print_staleness(store.staleness())
+    store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--path", default=os.path.join(".cache", "facts.sqlite3")
+    )
+    parser.add_argument(
+        "--forget",
+        nargs="*",
+        default=[],
+        help="hosts whose cached facts are discarded before the report",
+    )
+    main(parser.parse_args())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: Shared Jinja2 rendering service. The environment is built once
+per process, every template under templates/ is compiled up front, and
+the compiled bytecode is kept on disk so later runs skip compilation.
+Scripts create one Renderer before looping over hosts and reuse it.
+"""
+
+import os
+import threading
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+
+class Renderer:
+    """
+    Renders templates relative to "root" with the options used across the
+    course. Safe to share across threads.
+    """
+
+    def __init__(
+        self,
+        root=".",
+        template_dir="templates",
+        cache_dir=os.path.join(".cache", "jinja"),
+    ):
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # Templates do not change during a run, so skip the per-lookup
+        # modification time checks
+        self.env = Environment(
+            loader=FileSystemLoader(root),
+            trim_blocks=True,
+            autoescape=True,
+            auto_reload=False,
+            bytecode_cache=FileSystemBytecodeCache(cache_dir),
+        )
+        self.root = root
+        self._templates = {}
+        self._lock = threading.Lock()
+        self.precompile(template_dir)
+
+    def precompile(self, template_dir):
+        """
+        Loads every .j2 template under template_dir (relative to root) so
+        no host pays for compilation. Returns the number loaded. Only
+        template_dir is walked, not the whole loader root, so large
+        siblings such as .cache/ are never listed.
+        """
+        names = []
+        base = os.path.join(self.root, template_dir)
+        for dirpath, _, filenames in os.walk(base):
+            # Loader names are relative to root and always use "/"
+            rel = os.path.relpath(dirpath, self.root).replace(os.sep, "/")
+            names.extend(
+                f"{rel}/{filename}"
+                for filename in sorted(filenames)
+                if filename.endswith(".j2")
+            )
+        for name in names:
+            self.get_template(name)
+        return len(names)
+
+    def get_template(self, name):
+        """
+        Returns the compiled template, loading it on first use.
+        """
+        with self._lock:
+            template = self._templates.get(name)
+            if template is None:
+                template = self.env.get_template(name)
+                self._templates[name] = template
+        return template
+
+    def render(self, name, **context):
+        """
+        Renders one template with the given variables.
+        """
+        return self.get_template(name).render(**context)
+
+    def render_many(self, name, data_by_host, key="data"):
+        """
+        Renders one template for many hosts. data_by_host maps host names
+        to the value passed to the template as "key". Returns a dict of
+        host name to rendered text.
+        """
+        template = self.get_template(name)
+        return {
+            host: template.render(**{key: data})
+            for host, data in data_by_host.items()
+        }
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: Run a per-host NAPALM workflow across the inventory concurrently.
+Each step of the workflow is a named phase with its own timeout, so a
+hung device fails only its own run, and every host's exceptions stay
+within that host. The end-of-run table shows timings for each phase.
+"""
+
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# Outcome of running the workflow against a single host. Phases is an
+# ordered dict of phase name to elapsed seconds, including a failed phase.
+HostOutcome = namedtuple("HostOutcome", "name ok elapsed phases result error")
+
+
+class PhaseTimeout(TimeoutError):
+    """
+    Raised when a phase does not finish within its timeout. The call is
+    abandoned rather than stopped, so it may still take effect later;
+    after a timed-out commit the device state is unknown.
+    """
+
+    def __init__(self, phase, timeout):
+        super().__init__(
+            f"{phase} exceeded {timeout}s; call abandoned, outcome unknown"
+        )
+        self.phase = phase
+
+
+class Phases:  # pylint: disable=too-few-public-methods
+    """
+    Runs and times the phases of one host's workflow. A phase runs in its
+    own daemon thread so a blocked driver call can be abandoned when its
+    timeout expires; the host then fails without stalling its worker.
+    Abandoned phases are listed in "abandoned", since their calls may
+    still be running against the device.
+    """
+
+    def __init__(self, host_name, timeouts=None, default_timeout=60.0):
+        self.host_name = host_name
+        self.timeouts = timeouts or {}
+        self.default_timeout = default_timeout
+        self.timings = OrderedDict()
+        self.abandoned = []
+
+    def run(self, name, func, *args, **kwargs):
+        """
+        Calls func(*args, **kwargs) as phase "name" and returns its result.
+        Raises PhaseTimeout if it runs too long, or re-raises its exception.
+        """
+        timeout = self.timeouts.get(name, self.default_timeout)
+        outcome = {}
+
+        def _target():
+            try:
+                outcome["result"] = func(*args, **kwargs)
+            # Re-raised in the calling thread below
+            except BaseException as exc:  # pylint: disable=broad-except
+                outcome["error"] = exc
+
+        start = time.monotonic()
+        thread = threading.Thread(
+            target=_target, name=f"{self.host_name}-{name}", daemon=True
+        )
+        thread.start()
+        thread.join(timeout)
+        self.timings[name] = time.monotonic() - start
+
+        if thread.is_alive():
+            self.abandoned.append(name)
+            raise PhaseTimeout(name, timeout)
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome.get("result")
+
+
+def run_fleet(
+    task, hosts, workers=10, timeouts=None, default_timeout=60.0, **kwargs
+):
+    """
+    Calls task(host, phases, **kwargs) for each host dict (which needs a
+    "name" key) using at most "workers" threads. The task wraps each device
+    interaction in phases.run(). Timeouts maps phase names to seconds, and
+    other phases get default_timeout. Returns HostOutcome tuples in
+    inventory order.
+    """
+
+    def _timed_task(host):
+        phases = Phases(host["name"], timeouts, default_timeout)
+        start = time.monotonic()
+        try:
+            result = task(host, phases, **kwargs)
+        # Isolate failures; the exception is reported in the table
+        except Exception as exc:  # pylint: disable=broad-except
+            elapsed = time.monotonic() - start
+            return HostOutcome(
+                host["name"], False, elapsed, phases.timings, None, exc
+            )
+        elapsed = time.monotonic() - start
+        return HostOutcome(
+            host["name"], True, elapsed, phases.timings, result, None
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        return list(executor.map(_timed_task, hosts))
+
+
+def print_outcomes(outcomes, elapsed):
+    """
+    Prints one row per host with its result and per-phase timings, then
+    the success count and total run time.
+    """
+    phase_names = []
+    for outcome in outcomes:
+        for name in outcome.phases:
+            if name not in phase_names:
+                phase_names.append(name)
+
+    header = f"{'HOST':<16} {'RESULT':<12} {'TOTAL':>7}"
+    header += "".join(f" {name[:8]:>8}" for name in phase_names)
+    print(header)
+    for outcome in outcomes:
+        result = str(outcome.result) if outcome.ok else "FAILED"
+        if isinstance(outcome.error, PhaseTimeout):
+            result = "TIMED OUT"
+        row = f"{outcome.name:<16} {result[:12]:<12} {outcome.elapsed:>7.2f}"
+        for name in phase_names:
+            seconds = outcome.phases.get(name)
+            row += f" {'-':>8}" if seconds is None else f" {seconds:>8.2f}"
+        print(row)
+        if not outcome.ok:
+            print(f"  {type(outcome.error).__name__}: {outcome.error}")
+
+    ok_count = sum(1 for outcome in outcomes if outcome.ok)
+    print(f"\n{ok_count}/{len(outcomes)} hosts succeeded in {elapsed:.2f}s")
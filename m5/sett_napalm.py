@@ -3,16 +3,156 @@
 """
 Author: Nick Russo
 Purpose: Demonstrate using NAPALM via SSH to interact with multiple
-platforms to collect structured data.
+platforms to collect structured data. Hosts run concurrently
+("--workers") with per-phase timeouts, so one hung device cannot block
+the rest of the run. Use "--fast" to skip hosts whose vars file and
+template are unchanged and whose configuration-change marker still
+matches the last confirmed run; the check needs only a short SSH login
+and one show command, not a NAPALM session. Use "--full" to check every
+host anyway. The model ID comes from the facts cache unless
+"--refresh-facts" is set.
 """
 
+import argparse
+import time
+from collections import namedtuple
 from napalm import get_network_driver
-from jinja2 import Environment, FileSystemLoader
 from yaml import safe_load
 from parse_rt_m5 import get_rt_parser, rt_diff
+from runner_m5 import run_fleet, print_outcomes
+from fastpath_m5 import (
+    FastPath,
+    fetch_marker,
+    intended_fingerprint,
+    marker_from_cli,
+)
+from facts_m5 import FactsStore
+from render_m5 import Renderer
 
+# Shared services for one run, handed to every per-host task. fastpath is
+# None unless "--fast" is set
+RunContext = namedtuple("RunContext", "args facts_store renderer fastpath")
 
-def main():
+
+def check_fast_path(host, phases, ctx):
+    """
+    Returns (skip, intended, marker) for a host. Without a fastpath, or
+    with "--full", the host is never skipped.
+    """
+    if ctx.fastpath is None:
+        return False, None, None
+    name = host["name"]
+    intended = intended_fingerprint(
+        [f"vars/{name}_vrfs.yml", f"templates/sett/{host['platform']}_vpn.j2"]
+    )
+    marker = phases.run(
+        "marker", fetch_marker, name, host["platform"], ctx.args.timeout
+    )
+    skip = not ctx.args.full and ctx.fastpath.can_skip(name, intended, marker)
+    return skip, intended, marker
+
+
+def update_host(host, conn, phases, ctx):
+    """
+    Collects, diffs, renders, and merges the VRF changes on an open
+    connection. Returns (result, marker), where marker is the new
+    configuration-change marker after a commit with a fastpath, or None.
+    """
+    name = host["name"]
+
+    # Get the model ID, reusing cached facts while they are fresh
+    facts = ctx.facts_store.get_or_fetch(
+        name,
+        lambda: phases.run("facts", conn.get_facts),
+        refresh=ctx.args.refresh_facts,
+    )
+    print(f"{name}: model type {facts['model']}")
+
+    # Determine the parser, run the proper show command, and perform
+    # parsing. NAPALM has open issue to obviate need for parser:
+    # https://github.com/napalm-automation/napalm/issues/502
+    output = phases.run("cli", conn.cli, [host["vrf_cmd"]])
+    parse_rt = get_rt_parser(host["platform"])
+    vrf_data = parse_rt(output[host["vrf_cmd"]])
+
+    # Read the YAML file into structured data, may raise YAMLError
+    with open(f"vars/{name}_vrfs.yml", "r") as handle:
+        vrfs = safe_load(handle)
+
+    # Find the difference in RTs between intended and actual configs
+    rt_updates = rt_diff(vrfs["vrfs"], vrf_data)
+
+    # Template the configuration changes based on the RT updates
+    new_vrf_config = ctx.renderer.render(
+        f"templates/sett/{host['platform']}_vpn.j2", data=rt_updates
+    )
+
+    # Use NAPALM built-in merging to compare and merge RT updates
+    phases.run("load", conn.load_merge_candidate, config=new_vrf_config)
+    diff = phases.run("compare", conn.compare_config)
+    if not diff:
+        print(f"{name}: no diff; config up to date")
+        return "no diff", None
+    print(f"{name}: committing configuration changes\n{diff}")
+    phases.run("commit", conn.commit_config)
+
+    # The commit moved the marker; read it on this session right away to
+    # keep the window for unseen changes small
+    if ctx.fastpath is None:
+        return "committed", None
+    marker = phases.run("marker", marker_from_cli, conn.cli, host["platform"])
+    return "committed", marker
+
+
+def manage_host(host, phases, ctx):
+    """
+    Runs the collect, diff, render, and merge workflow for one host. Each
+    device interaction is a timed phase. Returns a short result string
+    for the end-of-run table. With a fastpath, hosts that cannot have
+    drifted are skipped before any NAPALM session is opened, unless
+    "--full" is set.
+    """
+    name = host["name"]
+    skip, intended, marker = check_fast_path(host, phases, ctx)
+    if skip:
+        print(f"{name}: unchanged since last confirmed run; skipped")
+        return "skipped"
+
+    # Determine and create the network driver object based on platform
+    driver = get_network_driver(host["platform"])
+    conn = driver(
+        hostname=name,
+        username="pyuser",
+        password="pypass",
+        timeout=int(ctx.args.timeout),
+    )
+
+    try:
+        phases.run("open", conn.open)
+        result, new_marker = update_host(host, conn, phases, ctx)
+        if new_marker is not None:
+            marker = new_marker
+
+    # All done; close the connection, without letting a failed close hide
+    # the outcome of the earlier phases. If a timed-out call (such as a
+    # commit) is still running, leave the connection open rather than cut
+    # it off partway through
+    finally:
+        if phases.abandoned:
+            print(f"{name}: {', '.join(phases.abandoned)} still running")
+        else:
+            try:
+                phases.run("close", conn.close)
+            except Exception:  # pylint: disable=broad-except
+                pass
+
+    # The device is now in sync as of this marker
+    if ctx.fastpath is not None:
+        ctx.fastpath.record(name, intended, marker)
+    return result
+
+
+def main(args):
     """
     Execution starts here.
     """
@@ -21,58 +161,57 @@ def main():
     with open("hosts.yml", "r") as handle:
         host_root = safe_load(handle)
 
-    # Iterate over the list of hosts from YAML file
-    for host in host_root["host_list"]:
-        # Determine and create the network driver object based on platform
-        print(f"Getting {host['platform']} driver")
-        driver = get_network_driver(host["platform"])
-        conn = driver(
-            hostname=host["name"], username="pyuser", password="pypass"
-        )
-
-        # Open the connection and get the model ID
-        print("Opening connection and fathering facts")
-        conn.open()
-        facts = conn.get_facts()
-        print(f"{host['name']} model type: {facts['model']}")
-
-        # Determine the parser, run the proper show command, and perform parsing
-        # NAPALM has open issue to obviate need for parser:
-        # https://github.com/napalm-automation/napalm/issues/502
-        output = conn.cli([host["vrf_cmd"]])
-        parse_rt = get_rt_parser(host["platform"])
-        vrf_data = parse_rt(output[host["vrf_cmd"]])
-
-        # Read the YAML file into structured data, may raise YAMLError
-        with open(f"vars/{host['name']}_vrfs.yml", "r") as handle:
-            vrfs = safe_load(handle)
-
-        # Find the difference in RTs between intended and actual configs
-        rt_updates = rt_diff(vrfs["vrfs"], vrf_data)
-
-        # Template the configuration changes based on the RT updates
-        j2_env = Environment(
-            loader=FileSystemLoader("."), trim_blocks=True, autoescape=True
-        )
-        template = j2_env.get_template(
-            f"templates/sett/{host['platform']}_vpn.j2"
-        )
-        new_vrf_config = template.render(data=rt_updates)
-
-        # Use NAPALM built-in merging to compare and merge RT updates
-        conn.load_merge_candidate(config=new_vrf_config)
-        diff = conn.compare_config()
-        if diff:
-            print(diff)
-            print("Committing configuration changes")
-            conn.commit_config()
-        else:
-            print("no diff; config up to date")
+    # Intended fingerprints and markers of hosts confirmed in sync
+    fastpath = FastPath() if args.fast else None
+    facts_store = FactsStore()
+
+    # Compile every template once, reusing bytecode from earlier runs
+    renderer = Renderer()
 
-        # All done; close the connection
-        conn.close()
-        print("OK!\n")
+    # Run every host concurrently; commits get their own, longer timeout
+    start = time.monotonic()
+    outcomes = run_fleet(
+        manage_host,
+        host_root["host_list"],
+        workers=args.workers,
+        timeouts={"commit": args.commit_timeout},
+        default_timeout=args.timeout,
+        ctx=RunContext(args, facts_store, renderer, fastpath),
+    )
+    print_outcomes(outcomes, time.monotonic() - start)
+    if fastpath is not None:
+        fastpath.save()
+    facts_store.close()
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=10)
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=60.0,
+        help="seconds allowed for each device phase, such as open or cli",
+    )
+    parser.add_argument(
+        "--commit-timeout",
+        type=float,
+        default=300.0,
+        help="seconds allowed for the commit phase",
+    )
+    parser.add_argument(
+        "--refresh-facts",
+        action="store_true",
+        help="ignore cached facts and run get_facts on every device",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="check every host even if the fast path could skip it",
+    )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="skip hosts whose intended state and change marker are unchanged",
+    )
+    main(parser.parse_args())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: The pytest functions for ensuring the shared renderer only
+precompiles templates under the template directory, renders with the
+course options, and reuses compiled bytecode across instances. Run with
+"-s" to see outputs.
+"""
+
+import pytest
+
+jinja2 = pytest.importorskip("jinja2")
+
+# pylint: disable=wrong-import-position
+from render_m5 import Renderer
+
+
+def _make_tree(root):
+    """
+    Builds a small templates/ tree plus a stray template under .cache/
+    that precompile must not touch.
+    """
+    nested = root / "templates" / "sett"
+    nested.mkdir(parents=True)
+    (nested / "ios_vpn.j2").write_text(
+        "{% for vrf in data %}\nvrf definition {{ vrf }}\n{% endfor %}\n"
+    )
+    (nested / "notes.txt").write_text("not a template\n")
+    stray = root / ".cache" / "junk"
+    stray.mkdir(parents=True)
+    (stray / "broken.j2").write_text("{% if %}\n")
+
+
+def test_render_precompile(tmp_path):
+    """
+    Test that only .j2 files under templates/ are precompiled, with names
+    relative to the loader root, and that rendering trims blocks.
+    """
+    _make_tree(tmp_path)
+    cache_dir = str(tmp_path / ".cache" / "jinja")
+    renderer = Renderer(root=str(tmp_path), cache_dir=cache_dir)
+    assert renderer.precompile("templates") == 1
+
+    text = renderer.render("templates/sett/ios_vpn.j2", data=["A", "B"])
+    print(text)
+    assert text == "vrf definition A\nvrf definition B\n"
+    assert renderer.render_many(
+        "templates/sett/ios_vpn.j2", {"R1": ["A"], "R2": []}
+    ) == {"R1": "vrf definition A\n", "R2": ""}
+
+
+def test_render_bytecode_reuse(monkeypatch, tmp_path):
+    """
+    Test that compiled bytecode is written to the cache directory and a
+    second renderer loads it without compiling again.
+    """
+    _make_tree(tmp_path)
+    cache_dir = tmp_path / ".cache" / "jinja"
+    Renderer(root=str(tmp_path), cache_dir=str(cache_dir))
+    assert list(cache_dir.iterdir())
+
+    # Count compilations made by a fresh environment
+    calls = []
+    compile_source = jinja2.Environment.compile
+
+    def _compile(self, *args, **kwargs):
+        calls.append(args)
+        return compile_source(self, *args, **kwargs)
+
+    monkeypatch.setattr(jinja2.Environment, "compile", _compile)
+    renderer = Renderer(root=str(tmp_path), cache_dir=str(cache_dir))
+    text = renderer.render("templates/sett/ios_vpn.j2", data=["C"])
+    assert text == "vrf definition C\n"
+    assert not calls
@@ -222,3 +222,50 @@ def _check_vrf_data(vrf_data):
     assert vrf_data["123"]["route_export"] == []
     assert len(vrf_data["123"]["route_import"]) == 1
     assert vrf_data["123"]["route_import"][0] == "65000:303"
+
+
+def test_parse_rt_vrf_substring():
+    """
+    Names and descriptions containing "vrf" must not split VRF blocks,
+    and nested "vrf" lines outside the definitions must be ignored.
+    """
+    ios_output = """
+vrf definition vrfA
+ description vrf for the shared services vrf
+ rd 65000:1
+ route-target export 65000:111
+ address-family ipv4
+  route-target import 65000:101
+ exit-address-family
+!
+interface GigabitEthernet2
+ vrf forwarding vrfA
+!
+"""
+    ios_data = parse_rt_ios(ios_output)
+    print(ios_data)
+    assert ios_data == {
+        "vrfA": {"route_import": ["65000:101"], "route_export": ["65000:111"]}
+    }
+
+    iosxr_output = """
+vrf vrfA
+ description vrf for the shared services vrf
+ address-family ipv4 unicast
+  import route-target
+   65000:101
+  !
+  export route-target
+   65000:111
+  !
+ !
+!
+router bgp 65000
+ vrf vrfA
+  rd auto
+ !
+!
+"""
+    iosxr_data = parse_rt_iosxr(iosxr_output)
+    print(iosxr_data)
+    assert iosxr_data == ios_data
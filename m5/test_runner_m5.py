@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: The pytest functions for ensuring the concurrent runner times
+phases, enforces timeouts, and isolates host failures. Run with "-s" to
+see outputs.
+"""
+
+import threading
+import time
+import pytest
+from runner_m5 import run_fleet, print_outcomes, Phases, PhaseTimeout
+
+
+def _workflow(host, phases, hang):
+    """
+    Fake per-host workflow: a hung host blocks in its "cli" phase until
+    released, and a broken host raises in its "commit" phase.
+    """
+    phases.run("open", time.sleep, 0.01)
+    if host["name"] == "hung":
+        phases.run("cli", hang.wait)
+    if host["name"] == "broken":
+        phases.run("commit", lambda: 1 / 0)
+    return "committed"
+
+
+def test_run_fleet(capsys):
+    """
+    Healthy hosts succeed concurrently while a hung and a broken host
+    fail on their own, with timings recorded per phase.
+    """
+    hang = threading.Event()
+    hosts = [{"name": name} for name in ("R1", "hung", "broken", "R2")]
+    start = time.monotonic()
+    outcomes = run_fleet(
+        _workflow,
+        hosts,
+        workers=4,
+        timeouts={"cli": 0.2},
+        default_timeout=5,
+        hang=hang,
+    )
+    elapsed = time.monotonic() - start
+    hang.set()
+
+    print_outcomes(outcomes, elapsed)
+    table = capsys.readouterr().out
+    assert "2/4 hosts succeeded" in table
+    assert "PhaseTimeout: cli exceeded 0.2s" in table
+    assert "TIMED OUT" in table
+
+    assert [outcome.name for outcome in outcomes] == [
+        host["name"] for host in hosts
+    ]
+    assert [outcome.ok for outcome in outcomes] == [True, False, False, True]
+    assert outcomes[0].result == "committed"
+    assert list(outcomes[0].phases) == ["open"]
+    assert isinstance(outcomes[1].error, PhaseTimeout)
+    assert list(outcomes[1].phases) == ["open", "cli"]
+    assert isinstance(outcomes[2].error, ZeroDivisionError)
+    assert elapsed < 2
+
+
+def test_phase_abandoned():
+    """
+    A timed-out phase is recorded as abandoned, and its exception names
+    the phase so callers can treat a commit as possibly applied.
+    """
+    release = threading.Event()
+    phases = Phases("R1", {"commit": 0.1})
+    assert phases.run("open", lambda: "ok") == "ok"
+    with pytest.raises(PhaseTimeout) as excinfo:
+        phases.run("commit", release.wait)
+    release.set()
+    assert excinfo.value.phase == "commit"
+    assert "outcome unknown" in str(excinfo.value)
+    assert phases.abandoned == ["commit"]
@@ -3,17 +3,20 @@
 """
 Author: Nick Russo
 Purpose: Demonstrate using Nornir to introduce orchestration and
-concurrency, as well as inventory management.
+concurrency, as well as inventory management. The full facts are served
+from a local cache while every field is fresh; use "--refresh-facts" to
+always ask the devices.
 """
 
+import argparse
 import json
 from nornir import InitNornir
-from nornir.plugins.tasks.networking import napalm_get
 from nornir.plugins.tasks.files import write_file
 from nornir.plugins.functions.text import print_result
+from facts_m6 import FactsStore, cached_facts
 
 
-def write_facts(task):
+def write_facts(task, store, refresh=False):
     """
     This is a grouped task that runs once per host. This
     iteration happens inside nornir automatically. Anytime
@@ -23,27 +26,34 @@ def write_facts(task):
     and all subsequent results are stored thereafter.
     """
 
-    # TASK 1: Gather facts using NAPALM to get model ID
-    task1_result = task.run(task=napalm_get, getters=["get_facts"])
+    # TASK 1: Gather all facts using NAPALM, reusing the cached facts only
+    # while every field is fresh, so the file keeps uptime and interfaces
+    task1_result = task.run(
+        task=cached_facts, store=store, fields=None, refresh=refresh
+    )
 
     # TASK 2: Write this data to a JSON file for use later.
     # We don't care about the result in this function, but Nornir stores
     # it for us anyway behind the scenes
     task.run(
         task=write_file,
-        content=json.dumps(task1_result[0].result["get_facts"], indent=2),
+        content=json.dumps(task1_result[0].result, indent=2),
         filename=f"{task.host.name}_facts.json",
     )
 
 
-def main():
+def main(args):
     """
     Execution begins here.
     """
 
     # Initialize nornir and invoke the grouped task.
     nornir = InitNornir()
-    result = nornir.run(task=write_facts)
+    store = FactsStore()
+    result = nornir.run(
+        task=write_facts, store=store, refresh=args.refresh_facts
+    )
+    store.close()
 
     # Use Nornir-supplied function to pretty-print the result
     # to see a recap of all actions taken.
@@ -51,4 +61,10 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--refresh-facts",
+        action="store_true",
+        help="ignore cached facts and run get_facts on every device",
+    )
+    main(parser.parse_args())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: Memoize VRF parsing keyed by (platform, parser version, SHA-256
+of the output). Unchanged configurations cost a hash instead of a parse.
+Results live in an in-process LRU capped by approximate size, with an
+optional on-disk tier so they survive between runs. The disk tier lives
+under the output cache root, and OutputCache.evict() trims it too.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+import parse_rt_m6
+from parse_rt_m6 import get_rt_parser
+
+
+class ParseMemo:  # pylint: disable=too-few-public-methods
+    """
+    Memoizing front end to get_rt_parser(). Safe to share across threads.
+    Returned dicts are shared between callers and must not be modified.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, root=None):
+        self.max_bytes = max_bytes
+        self.root = root
+        self.hits = self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def parse(self, platform, text):
+        """
+        Returns the parsed VRF data for the output, parsing it only if
+        neither the memory nor the disk tier has seen it before.
+        """
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        key = (platform.lower(), parse_rt_m6.PARSER_VERSION, digest)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        # Memory miss; try the disk tier before paying for a parse
+        vrf_data = self._load(key)
+        with self._lock:
+            if vrf_data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if vrf_data is None:
+            vrf_data = get_rt_parser(platform)(text)
+            self._store(key, vrf_data)
+
+        self._remember(key, vrf_data)
+        return vrf_data
+
+    def _remember(self, key, vrf_data):
+        """
+        Internal-only function to add an entry to the memory tier and
+        evict least recently used entries until it fits within max_bytes.
+        """
+        size = _approx_size(vrf_data)
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = (vrf_data, size)
+            self._size += size
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                _, (_, old_size) = self._entries.popitem(last=False)
+                self._size -= old_size
+
+    def _path(self, key):
+        """
+        Internal-only function to map a key to its file in the disk tier.
+        """
+        platform, version, digest = key
+        return os.path.join(
+            self.root, "parsed", f"v{version}", platform, f"{digest}.json"
+        )
+
+    def _load(self, key):
+        """
+        Internal-only function to read a result from the disk tier, if
+        enabled. Returns None on a miss or an unreadable file.
+        """
+        if not self.root:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r") as handle:
+                vrf_data = json.load(handle)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        # Record the access so LRU eviction keeps hot results around
+        os.utime(path)
+        return vrf_data
+
+    def _store(self, key, vrf_data):
+        """
+        Internal-only function to persist a result to the disk tier, if
+        enabled, via rename so readers never see a partial file.
+        """
+        if not self.root:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "w") as handle:
+            json.dump(vrf_data, handle)
+        os.replace(tmp_path, path)
+
+
+def _approx_size(vrf_data):
+    """
+    Internal-only function to estimate the memory held by parsed VRF data
+    from the length of its strings. Only relative sizes matter for LRU.
+    """
+    size = 0
+    for name, rt_dict in vrf_data.items():
+        size += len(name) + 64
+        for value in rt_dict.values():
+            if isinstance(value, list):
+                size += sum(len(rte) + 8 for rte in value)
+            elif value is not None:
+                size += len(value) + 8
+    return size
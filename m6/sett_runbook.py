@@ -3,51 +3,86 @@
 """
 Author: Nick Russo
 Purpose: Demonstrate using Nornir to introduce orchestration and
-concurrency, as well as inventory management.
+concurrency, as well as inventory management. Use "--max-age" to reuse
+VRF output collected within that many seconds instead of asking the device.
+Unchanged output is only parsed once, even across runs, and only VRFs
+changed since the last applied run are diffed; "--full" diffs them all.
+The model ID comes from the facts cache unless "--refresh-facts" is set.
 """
 
+import argparse
 import logging
+import os
+from collections import namedtuple
 from nornir import InitNornir
 from nornir.plugins.tasks.networking import (
     # napalm_cli,
     netmiko_send_command,
-    napalm_get,
     napalm_configure,
 )
 from nornir.plugins.tasks.text import template_file
 from nornir.plugins.functions.text import print_result
-from parse_rt_m6 import get_rt_parser, rt_diff
+from parse_rt_m6 import rt_diff
+from cache_m6 import OutputCache
+from memo_m6 import ParseMemo
+from state_m6 import StateStore
+from facts_m6 import FactsStore, cached_facts
 
+# Shared services for one run, handed to the grouped task on every host
+RunContext = namedtuple("RunContext", "args cache memo state facts")
 
-def manage_rt(task):
+
+def manage_rt(task, ctx):
     """
     Grouped task does 4 things:
-    1. Gather facts with NAPALM
+    1. Gather facts with NAPALM (or the facts cache)
     2. Gather VRF configuration with Netmiko
     3. Locally render VRF config template
     4. Configure VRF updates with NAPALM
+    Step 2 is skipped when the cache holds VRF output younger than
+    "--max-age", and parsing is skipped when the memo has seen the same
+    output before.
+    Steps 3 and 4 are skipped when no VRF changed since the last applied run.
     """
 
-    # TASK 1: Gather facts using NAPALM to get model ID
-    task1_result = task.run(task=napalm_get, getters=["get_facts"])
-    model = task1_result[0].result["get_facts"]["model"]
+    # TASK 1: Gather facts using NAPALM to get model ID, unless the cached
+    # model is still fresh
+    task1_result = task.run(
+        task=cached_facts,
+        store=ctx.facts,
+        fields=["model"],
+        refresh=ctx.args.refresh_facts,
+    )
+    model = task1_result[0].result["model"]
     print(f"{task.host.name}: connected as model type {model}")
 
-    # TASK 2: Collect the VRF running configuration using netmiko
-    task2_result = task.run(
-        task=netmiko_send_command, command_string=task.host["vrf_cmd"]
-    )
-    cmd_output = task2_result[0].result
+    # TASK 2: Collect the VRF running configuration using netmiko, unless
+    # the cache already has output that is young enough
+    cache_key = (task.host.name, task.host.platform, task.host["vrf_cmd"])
+    cmd_output = ctx.cache.get(*cache_key, ctx.args.max_age)
+    if cmd_output is None:
+        task2_result = task.run(
+            task=netmiko_send_command, command_string=task.host["vrf_cmd"]
+        )
+        cmd_output = task2_result[0].result
+        ctx.cache.put(*cache_key, cmd_output)
 
     # ALTERNATIVE IMPLEMENTATION: Can use napalm_cli just as easily,
     # but using netmiko and NAPALM together highlights Nornir's flexibility
     # task2_result = task.run(task=napalm_cli, commands=[task.host["vrf_cmd"]])
     # cmd_output = task2_result[0].result[task.host["vrf_cmd"]]
 
-    # Determine the parser and perform parsing.
-    parse_rt = get_rt_parser(task.host.platform)
-    vrf_data = parse_rt(cmd_output)
-    rt_updates = rt_diff(task.host["vrfs"], vrf_data)
+    # Determine the parser and perform parsing, reusing earlier results
+    vrf_data = ctx.memo.parse(task.host.platform, cmd_output)
+
+    # Only VRFs changed since the last applied run need diffing
+    dirty = ctx.state.dirty_vrfs(
+        task.host.name, task.host["vrfs"], vrf_data, task.host.platform
+    )
+    if not dirty:
+        print(f"{task.host.name}: no changes since last applied run")
+        return
+    rt_updates = rt_diff(dirty, vrf_data)
 
     # TASK 3: Create the template of config to add
     task3_result = task.run(
@@ -62,11 +97,13 @@ def manage_rt(task):
     task4_result = task.run(task=napalm_configure, configuration=new_vrf_config)
     if task4_result[0].diff:
         print(f"{task.host.name}: diff below\n{task4_result[0].diff}")
+        ctx.cache.invalidate(*cache_key)
     else:
         print(f"{task.host.name}: no diff; config up to date")
+    ctx.state.record(task.host.name, dirty, task.host.platform)
 
 
-def main():
+def main(args):
     """
     Execution begins here.
     """
@@ -80,8 +117,21 @@ def main():
     for host in nornir.inventory.hosts.keys():
         print(host)
 
-    # Invoke the grouped task.
-    result = nornir.run(task=manage_rt)
+    # Invoke the grouped task. Collected output is cached on disk between
+    # runs; trim the cache back under its size limit once all hosts finish
+    cache = OutputCache()
+    memo = ParseMemo(root=cache.root)
+    state = StateStore(root=cache.root)
+    facts = FactsStore(os.path.join(cache.root, "facts.sqlite3"))
+    if args.full:
+        for host in nornir.inventory.hosts.keys():
+            state.forget(host)
+    result = nornir.run(
+        task=manage_rt, ctx=RunContext(args, cache, memo, state, facts)
+    )
+    state.save()
+    facts.close()
+    cache.evict()
 
     # Use Nornir-supplied function to pretty-print the result
     # to see a recap of all actions taken. Standard Python logging
@@ -90,4 +140,21 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--max-age",
+        type=float,
+        default=0,
+        help="reuse cached VRF output younger than this many seconds",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="ignore the last applied state and diff every VRF",
+    )
+    parser.add_argument(
+        "--refresh-facts",
+        action="store_true",
+        help="ignore cached facts and run get_facts on every device",
+    )
+    main(parser.parse_args())
@@ -3,15 +3,17 @@
 """
 Author: Nick Russo
 Purpose: Demonstrate using Nornir to introduce orchestration and
-concurrency, as well as inventory management.
+concurrency, as well as inventory management. Facts are served from a
+local cache while fresh; use "--refresh-facts" to always ask the devices.
 """
 
+import argparse
 from nornir import InitNornir
-from nornir.plugins.tasks.networking import napalm_get
 from nornir.plugins.functions.text import print_result
+from facts_m6 import STABLE_FIELDS, FactsStore, cached_facts
 
 
-def main():
+def main(args):
     """
     Execution begins here.
     """
@@ -19,10 +21,18 @@ def main():
     # Initialize nornir and invoke the grouped task.
     nornir = InitNornir()
 
-    # Use NAPALM logic to invoke the "get_facts" getter
-    # Below is the documentation page used in the demo:
+    # Use NAPALM logic to invoke the "get_facts" getter, but only when the
+    # cached facts have expired. Below is the documentation page used in
+    # the demo:
     # https://nornir.readthedocs.io/en/stable/plugins/tasks/networking.html
-    result = nornir.run(task=napalm_get, getters=["get_facts"])
+    store = FactsStore()
+    result = nornir.run(
+        task=cached_facts,
+        store=store,
+        fields=STABLE_FIELDS,
+        refresh=args.refresh_facts,
+    )
+    store.close()
 
     # Use Nornir-supplied function to pretty-print the result
     # to see a recap of all actions taken.
@@ -30,4 +40,10 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--refresh-facts",
+        action="store_true",
+        help="ignore cached facts and run get_facts on every device",
+    )
+    main(parser.parse_args())
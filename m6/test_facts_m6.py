@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: The pytest functions for ensuring the facts store honors each
+field's TTL, forced refreshes, and invalidation. Run with "-s" to see
+outputs.
+"""
+
+import facts_m6
+from facts_m6 import FactsStore
+
+FACTS = {
+    "hostname": "R1",
+    "model": "CSR1000V",
+    "serial_number": "9TH4AXITD7I",
+    "uptime": 3900,
+    "interface_list": ["GigabitEthernet1", "Loopback0"],
+}
+
+
+class _Fetcher:  # pylint: disable=too-few-public-methods
+    """
+    Stands in for device.get_facts() and counts the calls.
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return dict(FACTS)
+
+
+def _freeze_time(monkeypatch, now):
+    """
+    Makes the facts store see a fixed wall clock time.
+    """
+    monkeypatch.setattr(facts_m6.time, "time", lambda: now)
+
+
+def test_facts_ttl(monkeypatch, tmp_path):
+    """
+    Test that long-lived fields stay cached while short-lived ones expire
+    and trigger a new fetch.
+    """
+    store = FactsStore(str(tmp_path / "facts.sqlite3"))
+    fetch = _Fetcher()
+    _freeze_time(monkeypatch, 1000.0)
+    facts = store.get_or_fetch("R1", fetch)
+    assert facts == {"model": "CSR1000V"}
+    assert fetch.calls == 1
+
+    # Two minutes later the model is fresh but the uptime is not
+    _freeze_time(monkeypatch, 1120.0)
+    assert store.get_or_fetch("R1", fetch)["model"] == "CSR1000V"
+    assert fetch.calls == 1
+    assert store.get("R1", ["model", "uptime"]) is None
+    assert store.get("R1", ["model", "unknown"]) is None
+    facts = store.get_or_fetch("R1", fetch, fields=["model", "uptime"])
+    assert facts == {"model": "CSR1000V", "uptime": 3900}
+    assert fetch.calls == 2
+
+    # All fields come back intact, including lists
+    assert store.get("R1", fields=None) == FACTS
+    store.close()
+
+
+def test_facts_refresh_invalidate(monkeypatch, tmp_path):
+    """
+    Test that a forced refresh and invalidation both lead to a new fetch,
+    and that cached facts survive reopening the store.
+    """
+    path = str(tmp_path / "facts.sqlite3")
+    fetch = _Fetcher()
+    _freeze_time(monkeypatch, 1000.0)
+    store = FactsStore(path)
+    store.get_or_fetch("R1", fetch)
+    store.get_or_fetch("R1", fetch, refresh=True)
+    assert fetch.calls == 2
+    store.close()
+
+    store = FactsStore(path)
+    store.get_or_fetch("R1", fetch)
+    assert fetch.calls == 2
+    store.invalidate("R1")
+    assert store.get("R1") is None
+    store.get_or_fetch("R1", fetch)
+    assert fetch.calls == 3
+    store.close()
+
+
+def test_facts_staleness(monkeypatch, tmp_path):
+    """
+    Test that the staleness report flags only expired fields, and that
+    custom TTLs override the defaults.
+    """
+    store = FactsStore(str(tmp_path / "facts.sqlite3"), ttls={"model": 100})
+    _freeze_time(monkeypatch, 1000.0)
+    store.put("R1", FACTS)
+    store.put("R2", {"model": "IOS-XRv 9000"})
+    _freeze_time(monkeypatch, 1500.0)
+
+    report = store.staleness()
+    print(report)
+    assert [(row.host, row.field) for row in report][:2] == [
+        ("R1", "hostname"),
+        ("R1", "interface_list"),
+    ]
+    stale = sorted((row.host, row.field) for row in report if row.stale)
+    assert stale == [("R1", "model"), ("R1", "uptime"), ("R2", "model")]
+    assert all(row.age == 500.0 for row in report)
+    store.close()
+
+
+def test_facts_stable_fields(monkeypatch, tmp_path):
+    """
+    Test that asking for the stable fields is still served from the cache
+    after the short-lived fields expire.
+    """
+    store = FactsStore(str(tmp_path / "facts.sqlite3"))
+    fetch = _Fetcher()
+    _freeze_time(monkeypatch, 1000.0)
+    store.put("R1", {field: "x" for field in facts_m6.STABLE_FIELDS})
+    store.put("R1", FACTS)
+    _freeze_time(monkeypatch, 1000.0 + 2 * 60 * 60)
+    facts = store.get_or_fetch("R1", fetch, fields=facts_m6.STABLE_FIELDS)
+    assert facts["model"] == "CSR1000V"
+    assert "uptime" not in facts
+    assert fetch.calls == 0
+    store.close()
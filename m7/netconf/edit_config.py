@@ -6,10 +6,10 @@ Purpose: Demonstrate NETCONF on IOS-XE and IOS-XR to manage
 route targets using edit-config RPC via ncclient.
 """
 
-from jinja2 import Environment, FileSystemLoader
 from yaml import safe_load
 from ncclient import manager
 from lxml.etree import fromstring
+from render_m7 import Renderer
 
 
 def save_config_ios(conn):
@@ -35,6 +35,10 @@ def main():
     with open("hosts.yml", "r") as handle:
         host_root = safe_load(handle)
 
+    # Setup the jinja2 templating environment once; every template is
+    # compiled up front, reusing bytecode from earlier runs
+    renderer = Renderer()
+
     # Iterate over the list of hosts (dicts) defined above
     for host in host_root["host_list"]:
 
@@ -43,11 +47,9 @@ def main():
             vrfs = safe_load(handle)
 
         # Template the configuration changes based on the RT updates
-        j2_env = Environment(
-            loader=FileSystemLoader("."), trim_blocks=True, autoescape=True
+        new_vrf_config = renderer.render(
+            f"templates/{host['platform']}_vpn.j2", data=vrfs["vrfs"]
         )
-        template = j2_env.get_template(f"templates/{host['platform']}_vpn.j2")
-        new_vrf_config = template.render(data=vrfs["vrfs"])
 
         # Open a new NETCONF connection to each host using kwargs technique
         connect_params = {
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: Scaling benchmarks for the VRF parsers, rt_diff, and the
+templates/sett renders using synthetic configurations. Results are
+written as JSON, and when a baseline file is given, any case that got
+slower than the allowed threshold fails the run with a non-zero exit.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from parse_rt_m8 import parse_rt_ios, parse_rt_iosxr, rt_diff
+from synth_m8 import synth_vrfs, render_config
+
+# Template timings are skipped when Jinja2 is not installed
+try:
+    from jinja2 import Environment, FileSystemLoader
+except ImportError:
+    Environment = None
+
+
+def best_time(func, repeat):
+    """
+    Runs func "repeat" times and returns the fastest wall time in seconds.
+    The minimum is the least noisy estimate of the true cost.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run_benchmarks(sizes, repeat=3):
+    """
+    Times each case at each size and returns a dict of
+    "case/size" names to best time in seconds.
+    """
+    # Templates live beside this file, whatever the working directory is
+    j2_env = None
+    if Environment:
+        here = os.path.dirname(os.path.abspath(__file__))
+        j2_env = Environment(
+            loader=FileSystemLoader(here), trim_blocks=True, autoescape=True
+        )
+
+    results = {}
+    for size in sizes:
+        # Running config drifts from intended so every VRF has updates
+        intended = synth_vrfs(size)
+        running = synth_vrfs(size, drift=1)
+        texts = {
+            "ios": render_config(running, "ios"),
+            "iosxr": render_config(running, "iosxr"),
+        }
+        parsers = {"ios": parse_rt_ios, "iosxr": parse_rt_iosxr}
+        for name, parse_func in parsers.items():
+            results[f"parse_rt_{name}/{size}"] = best_time(
+                lambda p=parse_func, t=texts[name]: p(t), repeat
+            )
+
+        run_vrf_dict = parse_rt_ios(texts["ios"])
+        results[f"rt_diff/{size}"] = best_time(
+            lambda i=intended, r=run_vrf_dict: rt_diff(i, r), repeat
+        )
+
+        # Render each sett template from the same RT updates
+        if j2_env:
+            rt_updates = rt_diff(intended, run_vrf_dict)
+            for name in parsers:
+                template = j2_env.get_template(f"templates/sett/{name}_vpn.j2")
+                results[f"render_{name}/{size}"] = best_time(
+                    lambda t=template, u=rt_updates: t.render(data=u), repeat
+                )
+
+        print(f"Completed size {size}")
+    return results
+
+
+def find_regressions(results, baseline, threshold=0.25, floor=0.001):
+    """
+    Compares results to a baseline and returns a list of
+    (case, baseline_seconds, current_seconds) for every case more than
+    "threshold" (a fraction) slower. Cases faster than "floor" seconds in
+    the baseline are too noisy to judge and are skipped.
+    """
+    regressions = []
+    for case, current in sorted(results.items()):
+        previous = baseline.get(case)
+        if previous is None or previous < floor:
+            continue
+        if current > previous * (1 + threshold):
+            regressions.append((case, previous, current))
+    return regressions
+
+
+def main(args):
+    """
+    Execution starts here.
+    """
+
+    # Run the benchmarks and display the results
+    results = run_benchmarks(args.sizes, args.repeat)
+    for case, seconds in sorted(results.items()):
+        print(f"{case:<24} {seconds * 1000:10.2f} ms")
+    if not Environment:
+        print("jinja2 not installed; template renders skipped")
+
+    # Record the results with enough context to compare runs later
+    with open(args.output, "w") as handle:
+        report = {"python": platform.python_version(), "results": results}
+        json.dump(report, handle, indent=2, sort_keys=True)
+    print(f"Results written to {args.output}")
+
+    # Fail the run if a baseline was given and something got slower
+    if args.baseline:
+        with open(args.baseline, "r") as handle:
+            baseline = json.load(handle)["results"]
+        regressions = find_regressions(results, baseline, args.threshold)
+        for case, previous, current in regressions:
+            print(
+                f"REGRESSION {case}: {previous * 1000:.2f} ms -> "
+                f"{current * 1000:.2f} ms"
+            )
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} of baseline")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10, 100, 1000, 10000, 100000],
+        help="number of VRFs in each synthetic config",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="allowed slowdown as a fraction of the baseline",
+    )
+    main(parser.parse_args())
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: Content-addressed on-disk cache for collected command output.
+Outputs are stored once under their SHA-256 digest, and a small key file
+per (host, platform, command) points at the latest digest along with the
+time it was collected. Callers ask for output "no older than N seconds"
+and only touch the device on a miss. Total size is capped by evicting
+the least recently used outputs whenever evict() is called, typically
+once at the end of a run.
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import tempfile
+import time
+
+
+class OutputCache:
+    """
+    On-disk cache rooted at "root". Layout:
+      objects/ab/abcdef...  raw output, named by content digest
+      keys/0123....json     {host, platform, command, digest, stored}
+    ParseMemo keeps parsed/ under the same root, and evict() trims both.
+    """
+
+    def __init__(self, root=".cache", max_bytes=256 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(root, "keys"), exist_ok=True)
+
+    def get(self, host, platform, command, max_age):
+        """
+        Returns the cached output for the key if it was stored no more
+        than max_age seconds ago, or None on a miss. A max_age of None
+        or 0 always misses.
+        """
+        if not max_age:
+            return None
+        try:
+            with open(self._key_path(host, platform, command), "r") as handle:
+                entry = json.load(handle)
+            if time.time() - entry["stored"] > max_age:
+                return None
+            # Read bytes so CRLF line endings survive and the output still
+            # matches the digest it is stored under
+            object_path = self._object_path(entry["digest"])
+            with open(object_path, "rb") as handle:
+                output = handle.read().decode("utf-8")
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+
+        # Record the access so LRU eviction keeps hot outputs around
+        os.utime(object_path)
+        return output
+
+    def put(self, host, platform, command, output):
+        """
+        Stores the output for the key and returns its digest. Identical
+        outputs (from any host or command) share one object on disk.
+        """
+        data = output.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        object_path = self._object_path(digest)
+        if os.path.exists(object_path):
+            os.utime(object_path)
+        else:
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            self._atomic_write(object_path, data)
+
+        entry = {
+            "host": host,
+            "platform": platform,
+            "command": command,
+            "digest": digest,
+            "stored": time.time(),
+        }
+        key_path = self._key_path(host, platform, command)
+        self._atomic_write(key_path, json.dumps(entry).encode("utf-8"))
+        return digest
+
+    def invalidate(self, host, platform, command):
+        """
+        Forgets the cached output for the key, for example right after a
+        configuration change makes it stale.
+        """
+        try:
+            os.remove(self._key_path(host, platform, command))
+        except FileNotFoundError:
+            pass
+
+    def evict(self):
+        """
+        Removes least recently used objects, and parsed results stored by
+        ParseMemo under the same root, until their total size is within
+        max_bytes. Key files pointing at removed objects simply become
+        misses. Returns the number of bytes freed.
+        """
+        objects = []
+        walk = itertools.chain(
+            os.walk(os.path.join(self.root, "objects")),
+            os.walk(os.path.join(self.root, "parsed")),
+        )
+        for dirpath, _, filenames in walk:
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                objects.append((stat.st_mtime, stat.st_size, path))
+
+        # Oldest access time first, stopping once under the size cap
+        total = sum(size for _, size, _ in objects)
+        freed = 0
+        for _, size, path in sorted(objects):
+            if total - freed <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            freed += size
+        return freed
+
+    def _key_path(self, host, platform, command):
+        """
+        Internal-only function to map a cache key to its key file.
+        """
+        key = json.dumps([host, platform, command])
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.root, "keys", f"{name}.json")
+
+    def _object_path(self, digest):
+        """
+        Internal-only function to map a digest to its object file.
+        """
+        return os.path.join(self.root, "objects", digest[:2], digest)
+
+    @staticmethod
+    def _atomic_write(path, data):
+        """
+        Internal-only function to write a file via rename so concurrent
+        readers never see a partially written file.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp_path, path)
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: Compact in-memory model for parsed VRF state at fleet scale.
+Route-targets are packed into 64-bit integers using the RFC 4360
+extended community encoding and held in sorted arrays, and each VRF is a
+slotted record. Helpers convert to and from the dict shapes used by the
+parsers, rt_diff, and the templates.
+"""
+
+import ipaddress
+import sys
+from array import array
+
+# RFC 4360 route-target type/subtype values, in the top 16 bits
+RT_TYPE_AS2 = 0x0002
+RT_TYPE_IPV4 = 0x0102
+RT_TYPE_AS4 = 0x0202
+
+
+def pack_rt(text):
+    """
+    Packs a route-target string into a 64-bit integer. Supports 2-byte
+    ASN ("65000:101"), 4-byte ASN ("4200000000:1" or "1.10:1") and IPv4
+    ("192.0.2.1:1") forms. Raises ValueError for anything else.
+    """
+    admin, sep, assigned = text.strip().rpartition(":")
+    if not sep or not assigned.isdigit():
+        raise ValueError(f"invalid route-target: {text}")
+    assigned = int(assigned)
+
+    # An IPv4 administrator has three dots; asdot ASNs have one
+    if admin.count(".") == 3:
+        admin = int(ipaddress.IPv4Address(admin))
+        rt_type, bits = RT_TYPE_IPV4, 16
+    elif admin.count(".") == 1 and admin.replace(".", "").isdigit():
+        high, low = (int(part) for part in admin.split("."))
+        if low > 0xFFFF:
+            raise ValueError(f"route-target out of range: {text}")
+        rt_type, admin, bits = RT_TYPE_AS4, (high << 16) | low, 16
+    elif admin.isdigit() and int(admin) <= 0xFFFF:
+        rt_type, admin, bits = RT_TYPE_AS2, int(admin), 32
+    elif admin.isdigit():
+        rt_type, admin, bits = RT_TYPE_AS4, int(admin), 16
+    else:
+        raise ValueError(f"invalid route-target: {text}")
+
+    if admin >> (48 - bits) or assigned >> bits:
+        raise ValueError(f"route-target out of range: {text}")
+    return (rt_type << 48) | (admin << bits) | assigned
+
+
+def unpack_rt(value):
+    """
+    Converts a packed route-target back to its string form. 4-byte ASNs
+    are always rendered in asplain notation.
+    """
+    rt_type = value >> 48
+    if rt_type == RT_TYPE_AS2:
+        return f"{(value >> 32) & 0xFFFF}:{value & 0xFFFFFFFF}"
+    admin = (value >> 16) & 0xFFFFFFFF
+    if rt_type == RT_TYPE_IPV4:
+        return f"{ipaddress.IPv4Address(admin)}:{value & 0xFFFF}"
+    if rt_type == RT_TYPE_AS4:
+        return f"{admin}:{value & 0xFFFF}"
+    raise ValueError(f"unknown route-target type: {rt_type:#06x}")
+
+
+def pack_rt_list(rt_list):
+    """
+    Packs a list of route-target strings into a sorted, de-duplicated
+    array of unsigned 64-bit integers (8 bytes per route-target).
+    """
+    return array("Q", sorted({pack_rt(rte) for rte in rt_list}))
+
+
+class VrfRecord:
+    """
+    Slotted VRF with packed route-targets. Names and descriptions repeat
+    across many devices, so they are interned to share one string each.
+    """
+
+    __slots__ = ("name", "rd", "description", "route_import", "route_export")
+
+    def __init__(
+        self, name, rd=None, description=None, route_import=(), route_export=()
+    ):
+        self.name = sys.intern(str(name))
+        self.rd = rd
+        self.description = sys.intern(description) if description else None
+        self.route_import = pack_rt_list(route_import)
+        self.route_export = pack_rt_list(route_export)
+
+    def __repr__(self):
+        return (
+            f"VrfRecord({self.name!r}, import={len(self.route_import)}, "
+            f"export={len(self.route_export)})"
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, VrfRecord):
+            return NotImplemented
+        return all(
+            getattr(self, slot) == getattr(other, slot)
+            for slot in self.__slots__
+        )
+
+    def to_dict(self):
+        """
+        Returns the intended VRF dict shape used in the vars/ files.
+        """
+        return {
+            "name": self.name,
+            "rd": self.rd,
+            "description": self.description,
+            "route_import": [unpack_rt(rti) for rti in self.route_import],
+            "route_export": [unpack_rt(rte) for rte in self.route_export],
+        }
+
+
+def compact_parsed(vrf_data):
+    """
+    Converts parser output ({name: {route_import, route_export}}) into a
+    dict of VrfRecord objects keyed by VRF name.
+    """
+    return {
+        name: VrfRecord(
+            name,
+            route_import=rt_dict["route_import"],
+            route_export=rt_dict["route_export"],
+        )
+        for name, rt_dict in vrf_data.items()
+    }
+
+
+def expand_parsed(records):
+    """
+    Converts a dict of VrfRecord objects back into parser output shape,
+    suitable for rt_diff.
+    """
+    return {
+        name: {
+            "route_import": [unpack_rt(rti) for rti in record.route_import],
+            "route_export": [unpack_rt(rte) for rte in record.route_export],
+        }
+        for name, record in records.items()
+    }
+
+
+def compact_intended(vrf_list):
+    """
+    Converts an intended VRF list from the vars/ files into VrfRecords.
+    """
+    return [
+        VrfRecord(
+            vrf["name"],
+            rd=vrf.get("rd"),
+            description=vrf.get("description"),
+            route_import=vrf.get("route_import", []),
+            route_export=vrf.get("route_export", []),
+        )
+        for vrf in vrf_list
+    ]
+
+
+def expand_intended(records):
+    """
+    Converts VrfRecords back into the intended VRF list shape.
+    """
+    return [record.to_dict() for record in records]
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: Compute locally which lines of a rendered merge candidate would
+change a collected running configuration, instead of loading the
+candidate and asking the device to compare. Both configs are parsed into
+section trees by indentation, so IOS and IOS-XR hierarchies compare level
+by level. The result is the minimal ordered change set: new lines with
+their whole subtree, changed sections with their parent lines as context,
+and "no" lines only when they remove something that is configured.
+"""
+
+from config_tree_m8 import parse_config
+
+
+def diff_config(candidate, running):
+    """
+    Returns the list of candidate lines (indented one space per level)
+    that a merge would still need to apply to the running config, in
+    candidate order. An empty list means the merge changes nothing.
+    """
+    changes = []
+    _diff_node(parse_config(candidate), parse_config(running), 0, changes)
+    return changes
+
+
+def _diff_node(cand_node, run_node, depth, changes):
+    """
+    Internal-only function to append the changes needed beneath one
+    section. run_node is None when the section does not exist yet.
+    """
+    indent = " " * depth
+    for child in cand_node:
+        line = child.line
+
+        # Negation only matters if the negated line is configured now,
+        # matched exactly or by keywords (so "no description" removes any
+        # description). "no" lines inside a new section are no-ops.
+        if line.startswith("no "):
+            target = line[len("no ") :]
+            if (
+                run_node is not None
+                and run_node.exact(line) is None
+                and run_node.child(target) is not None
+            ):
+                changes.append(indent + line)
+            continue
+
+        # A line that is not configured is added along with its subtree
+        existing = None if run_node is None else run_node.exact(line)
+        if existing is None:
+            changes.append(indent + line)
+            _diff_node(child, None, depth + 1, changes)
+            continue
+
+        # An existing section only needs its parent line as context when
+        # something beneath it changes
+        nested = []
+        _diff_node(child, existing, depth + 1, nested)
+        if nested:
+            changes.append(indent + line)
+            changes.extend(nested)
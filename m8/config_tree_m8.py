@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: Parse a full "show running-config" into an indexed section tree.
+One fetch of the whole config can then answer VRF, interface, and routing
+questions without a filtered "show" command for each. Every node indexes
+its children by full line, and by leading-keyword prefix for each prefix
+length that lookups actually use, so a path lookup costs one dict access
+per level regardless of config size.
+"""
+
+
+class ConfigNode:
+    """
+    One configuration line and the lines nested beneath it. The root node
+    has an empty line. Iterating a node yields its children in config order.
+    Repeated sibling lines, such as several "exit-address-family" lines,
+    stay separate children, so the tree mirrors the config faithfully.
+    """
+
+    def __init__(self, line="", parent=None):
+        self.line = line
+        self.parent = parent
+        self.children = []
+        self._by_line = {}
+
+        # Maps a word count to {prefix: [children]}, built on first use
+        self._by_prefix = {}
+
+    def __iter__(self):
+        return iter(self.children)
+
+    def __len__(self):
+        return len(self.children)
+
+    def __repr__(self):
+        return f"ConfigNode({self.line!r}, children={len(self.children)})"
+
+    def add(self, line):
+        """
+        Appends a child line and returns it. A repeated line becomes a new
+        child; exact lookups return the first one.
+        """
+        child = ConfigNode(line, parent=self)
+        self.children.append(child)
+        self._by_line.setdefault(line, child)
+
+        # Keep any prefix indexes that were already built up to date
+        words = line.split()
+        for num, index in self._by_prefix.items():
+            if len(words) >= num:
+                index.setdefault(" ".join(words[:num]), []).append(child)
+        return child
+
+    def exact(self, line):
+        """
+        Returns the first child whose line is exactly "line", or None.
+        """
+        return self._by_line.get(line)
+
+    def child(self, key):
+        """
+        Returns the child whose line is exactly "key", or else the first
+        child whose line starts with the keywords in "key", or None.
+        """
+        child = self._by_line.get(key)
+        if child is None:
+            matches = self._prefix_matches(key)
+            child = matches[0] if matches else None
+        return child
+
+    def find_all(self, prefix):
+        """
+        Returns all children whose lines start with the keywords in
+        "prefix", in config order. For example, find_all("interface").
+        """
+        return list(self._prefix_matches(prefix))
+
+    def lookup(self, *path):
+        """
+        Walks one child per path element, each an exact line or keyword
+        prefix, and returns the final node or None. For example,
+        lookup("interface Loopback1", "vrf forwarding").
+        """
+        node = self
+        for key in path:
+            node = node.child(key)
+            if node is None:
+                return None
+        return node
+
+    def value(self, *path):
+        """
+        Like lookup(), but returns the text following the last path element,
+        such as "65000:1" for value("vrf definition POLICE", "rd").
+        """
+        node = self.lookup(*path)
+        if node is None:
+            return None
+        return node.line[len(path[-1]) :].strip()
+
+    def _prefix_matches(self, prefix):
+        """
+        Internal-only function to return the children whose lines start
+        with the keywords in "prefix". Children are only indexed by
+        prefixes of the word counts that callers have asked about.
+        """
+        words = prefix.split()
+        index = self._by_prefix.get(len(words))
+        if index is None:
+            index = {}
+            for child in self.children:
+                child_words = child.line.split()
+                if len(child_words) >= len(words):
+                    key = " ".join(child_words[: len(words)])
+                    index.setdefault(key, []).append(child)
+            self._by_prefix[len(words)] = index
+        return index.get(" ".join(words), [])
+
+
+def parse_config(text):
+    """
+    Builds a ConfigNode tree from configuration text using indentation.
+    Separator lines ("!") and blank lines are skipped, and the nesting
+    is taken from relative indentation, so any indent width works.
+    """
+    root = ConfigNode()
+    stack = [(-1, root)]
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped == "!":
+            continue
+
+        # Climb back up to the closest ancestor indented less than this line
+        indent = len(line) - len(line.lstrip())
+        while stack[-1][0] >= indent:
+            stack.pop()
+        node = stack[-1][1].add(stripped)
+        stack.append((indent, node))
+    return root
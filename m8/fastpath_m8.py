@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: Skip hosts that cannot have drifted since the last run. A host
+is skipped when the fingerprint of its intended state (vars file plus
+template) is unchanged and its cheap configuration-change marker (the IOS
+configuration change tracking ID or the IOS-XR latest commit ID) still
+matches what was recorded. Neither command builds the running config.
+Fetching the marker is a single SSH exec rather than a full NAPALM
+session, but it still costs an SSH login and AAA, so this is a cheap
+path, not a zero-connect one.
+
+After a commit, the new marker is read on the same session right away
+with marker_from_cli(). A change made by someone else between the commit
+and that read is still recorded as confirmed, so the window is small but
+not closed; "--full" forces a complete check when in doubt.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+
+# Paramiko is only needed to fetch markers from real devices
+try:
+    import paramiko
+except ImportError:
+    paramiko = None
+
+# Commands whose output changes whenever the configuration changes,
+# without building the running config. The IOS version counter restarts
+# on reload, so its marker includes the last change time as well
+MARKER_COMMANDS = {
+    "ios": "show configuration id",
+    "iosxr": "show configuration commit list 1",
+}
+MARKER_REGEX = {
+    "ios": re.compile(
+        r"(?P<marker>Configuration version\s*:\s*\d+\s+"
+        r"Last change time\s*:.*?)\s*$",
+        re.M,
+    ),
+    "iosxr": re.compile(r"^\s*1\s+(?P<marker>\d+)\s", re.M),
+}
+
+
+def parse_marker(platform, output):
+    """
+    Extracts the configuration-change marker from the marker command
+    output, or returns None if it cannot be found.
+    """
+    match = MARKER_REGEX[platform.lower()].search(output)
+    return " ".join(match.group("marker").split()) if match else None
+
+
+def fetch_marker(hostname, platform, timeout=10.0, port=22):
+    """
+    Runs the marker command over a single SSH exec channel and returns
+    the parsed marker (or None).
+    """
+    if paramiko is None:
+        raise ImportError("fetching markers requires paramiko")
+    client = paramiko.SSHClient()
+    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    client.connect(
+        hostname=hostname,
+        port=port,
+        username="pyuser",
+        password="pypass",
+        look_for_keys=False,
+        allow_agent=False,
+        timeout=timeout,
+    )
+    try:
+        command = MARKER_COMMANDS[platform.lower()]
+        _, stdout, _ = client.exec_command(command, timeout=timeout)
+        output = stdout.read().decode("utf-8", errors="replace")
+    finally:
+        client.close()
+    return parse_marker(platform, output)
+
+
+def marker_from_cli(cli, platform):
+    """
+    Reads the marker through the cli() method of an open session, such
+    as a NAPALM device right after commit_config(), so no new login is
+    needed. Returns the parsed marker (or None).
+    """
+    command = MARKER_COMMANDS[platform.lower()]
+    return parse_marker(platform, cli([command])[command])
+
+
+def intended_fingerprint(paths, extra=()):
+    """
+    Returns a digest over the contents of the given files (such as the
+    vars file and the template) plus any extra strings that change the
+    rendered result, like command-line options.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as handle:
+            digest.update(path.encode("utf-8") + b"\0" + handle.read() + b"\0")
+    for item in extra:
+        digest.update(str(item).encode("utf-8") + b"\0")
+    return digest.hexdigest()
+
+
+class FastPath:
+    """
+    Records the intended fingerprint and marker last confirmed for each
+    host in one JSON file. Safe to share across threads.
+    """
+
+    def __init__(self, path=os.path.join(".cache", "fastpath.json")):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r") as handle:
+                self._hosts = json.load(handle)
+        except (FileNotFoundError, ValueError):
+            self._hosts = {}
+
+    def can_skip(self, host, intended, marker):
+        """
+        Returns True if the host was confirmed in sync with this intended
+        fingerprint and the device still reports the same marker.
+        """
+        if marker is None:
+            return False
+        with self._lock:
+            last = self._hosts.get(host)
+        return last == {"intended": intended, "marker": marker}
+
+    def record(self, host, intended, marker):
+        """
+        Records that the host is in sync with the intended fingerprint as
+        of the given marker. A None marker forgets the host instead.
+        """
+        with self._lock:
+            if marker is None:
+                self._hosts.pop(host, None)
+            else:
+                self._hosts[host] = {"intended": intended, "marker": marker}
+
+    def forget(self, host):
+        """
+        Forces a full check of the host on the next run.
+        """
+        self.record(host, None, None)
+
+    def save(self):
+        """
+        Writes all records via rename so an interrupted run never leaves
+        a partially written file.
+        """
+        with self._lock:
+            data = json.dumps(self._hosts, indent=2, sort_keys=True)
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, "w") as handle:
+            handle.write(data)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: Bulk route-target diff for every device in the fleet at once.
+Output matches rt_diff, but every list is sorted so results are
+deterministic, and an optional purge mode also removes VRFs that exist
+on a device but are not in its intended state.
+"""
+
+from compact_m8 import pack_rt
+
+
+def diff_fleet(intended_by_host, running_by_host, purge=False):
+    """
+    Computes RT updates for many hosts. Takes {host: intended VRF list}
+    and {host: parsed VRF dict} and returns {host: update list}, with
+    hosts in sorted order. Hosts without running data are skipped.
+    Intended lists shared between hosts (such as group variables) are
+    only prepared once.
+    """
+    prepared = {}
+    updates = {}
+    for host in sorted(intended_by_host):
+        run_vrf_dict = running_by_host.get(host)
+        if run_vrf_dict is None:
+            continue
+        int_vrf_list = intended_by_host[host]
+        key = id(int_vrf_list)
+        if key not in prepared:
+            prepared[key] = _prepare(int_vrf_list)
+        updates[host] = _diff(prepared[key], run_vrf_dict, purge)
+    return updates
+
+
+def diff_host(int_vrf_list, run_vrf_dict, purge=False, managed=()):
+    """
+    Computes sorted RT updates for one host; a drop-in for rt_diff that
+    adds the purge option. When only some intended VRFs are passed in,
+    list the names of the others in "managed" so purge leaves them alone.
+    """
+    return _diff(_prepare(int_vrf_list), run_vrf_dict, purge, managed)
+
+
+def _prepare(int_vrf_list):
+    """
+    Internal-only function to convert an intended VRF list into a list of
+    (name, vrf, import set, export set) tuples sorted by VRF name.
+    """
+    prepared = [
+        (
+            str(vrf["name"]),
+            vrf,
+            frozenset(vrf["route_import"]),
+            frozenset(vrf["route_export"]),
+        )
+        for vrf in int_vrf_list
+    ]
+    prepared.sort(key=lambda item: item[0])
+    return prepared
+
+
+def _diff(prepared, run_vrf_dict, purge, managed=()):
+    """
+    Internal-only function to diff prepared intended state against one
+    device's parsed VRFs.
+    """
+    empty = frozenset()
+    return_list = []
+    for name, int_vrf, int_rti, int_rte in prepared:
+        run_vrf = run_vrf_dict.get(name)
+        if run_vrf:
+            run_rti = set(run_vrf["route_import"])
+            run_rte = set(run_vrf["route_export"])
+        else:
+            run_rti = run_rte = empty
+        return_list.append(
+            {
+                "name": int_vrf["name"],
+                "rd": int_vrf["rd"],
+                "description": int_vrf["description"],
+                "add_rti": _sorted_rts(int_rti - run_rti),
+                "del_rti": _sorted_rts(run_rti - int_rti),
+                "add_rte": _sorted_rts(int_rte - run_rte),
+                "del_rte": _sorted_rts(run_rte - int_rte),
+                "purge": False,
+            }
+        )
+
+    # Unmanaged VRFs are removed entirely; templates render "no vrf ..."
+    if purge:
+        managed = set(managed) | {name for name, _, _, _ in prepared}
+        for name in sorted(set(run_vrf_dict) - managed):
+            return_list.append(
+                {
+                    "name": name,
+                    "rd": None,
+                    "description": None,
+                    "add_rti": [],
+                    "del_rti": [],
+                    "add_rte": [],
+                    "del_rte": [],
+                    "purge": True,
+                }
+            )
+    return return_list
+
+
+def _sorted_rts(rt_set):
+    """
+    Internal-only function to sort route-targets numerically (by their
+    packed value) so "65000:9" comes before "65000:10". Anything that
+    cannot be packed sorts after, alphabetically.
+    """
+    return sorted(rt_set, key=_rt_key)
+
+
+def _rt_key(rte):
+    """
+    Internal-only function giving the numeric sort key for one RT.
+    """
+    try:
+        return (0, pack_rt(rte), "")
+    except ValueError:
+        return (1, 0, rte)
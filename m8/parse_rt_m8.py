@@ -3,10 +3,30 @@
 """
 Author: Nick Russo
 Purpose: Develop VRF configuration parsers for IOS-XE and IOS-XR.
-These are focused on route-targets and not general-purpose VRF fields.
+These are focused on route-targets and not general-purpose VRF fields,
+though the rd and description each template renders are reported too.
 """
 
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+
+# Patterns are compiled once at import time and matched against a single
+# stripped line, so parsing is one pass over the text regardless of size
+IOS_VRF_REGEX = re.compile(r"vrf\s+definition\s+(?P<name>\S+)$")
+IOS_RT_REGEX = re.compile(
+    r"route-target\s+(?P<direction>import|export)\s+(?P<rt>\S+)"
+)
+IOSXR_VRF_REGEX = re.compile(r"vrf\s+(?P<name>\S+)$")
+IOSXR_RT_REGEX = re.compile(r"(?P<direction>import|export)\s+route-target$")
+FIELD_REGEX = re.compile(r"(?P<field>rd|description)\s+(?P<value>.+)$")
+
+# VRF section fields each platform's template renders, reported by the
+# parsers so drift in them can be detected. IOS XR sets the RD under BGP.
+SECTION_FIELDS = {"ios": ("rd", "description"), "iosxr": ("description",)}
+
+# Bump whenever parser output changes so memoized results are not reused
+PARSER_VERSION = 3
 
 
 def parse_rt_ios(text):
@@ -15,29 +35,7 @@ def parse_rt_ios(text):
     typically feeds into the rt_diff function to be tested against the
     intended config.
     """
-    vrf_list = ["vrf" + s for s in text.strip().split("vrf") if s]
-    return_dict = {}
-    for vrf in vrf_list:
-        # Parse the VRF name from the definition line
-        name_regex = re.compile(r"vrf\s+definition\s+(?P<name>\S+)")
-        name_match = name_regex.search(vrf)
-        sub_dict = {}
-        vrf_dict = {name_match.group("name"): sub_dict}
-
-        # Parse the RT imports into a list of strings
-        rti_regex = re.compile(r"route-target\s+import\s+(?P<rti>\d+:\d+)")
-        rti_matches = rti_regex.findall(vrf)
-        sub_dict.update({"route_import": rti_matches})
-
-        # Parse the RT exports into a list of strings
-        rte_regex = re.compile(r"route-target\s+export\s+(?P<rte>\d+:\d+)")
-        rte_matches = rte_regex.findall(vrf)
-        sub_dict.update({"route_export": rte_matches})
-
-        # Append dictionary to return list
-        return_dict.update(vrf_dict)
-
-    return return_dict
+    return dict(_iter_rt(text.splitlines(), "ios"))
 
 
 def parse_rt_iosxr(text):
@@ -46,45 +44,122 @@ def parse_rt_iosxr(text):
     typically feeds into the rt_diff function to be tested against the
     intended config.
     """
-    vrf_list = ["vrf" + s for s in text.strip().split("vrf") if s]
-    return_dict = {}
-    for vrf in vrf_list:
-        # Parse the VRF name from the definition line
-        name_regex = re.compile(r"^vrf\s+(?P<name>\S+)")
-        name_match = name_regex.search(vrf)
-        sub_dict = {}
-        vrf_dict = {name_match.group("name"): sub_dict}
+    return dict(_iter_rt(text.splitlines(), "iosxr"))
 
-        # Capture all text in between the start of "import route-target"
-        # and the first exclamation mark to grab all import RTs
-        rti_list = _get_iosxr_rt(r"import\s+route-target(.+?)!", vrf)
-        sub_dict.update({"route_import": rti_list})
 
-        # Repeat the same process for export RTs
-        rte_list = _get_iosxr_rt(r"export\s+route-target(.+?)!", vrf)
-        sub_dict.update({"route_export": rte_list})
+def iter_parse_rt(lines, platform):
+    """
+    Streaming form of the parsers for large configurations. Accepts any
+    iterable of lines, str or bytes (file, socket reader, gzip stream),
+    and yields (vrf_name, rt_dict) as soon as each VRF block closes, so
+    only one VRF is held in memory and parsing overlaps collection.
+    """
+    if platform.lower() not in ("ios", "iosxr"):
+        raise ValueError(f"unsupported platform: {platform}")
+    return _iter_rt(_decode_lines(lines), platform.lower())
 
-        # Append dictionary to return list
-        return_dict.update(vrf_dict)
 
-    return return_dict
+def _decode_lines(lines):
+    """
+    Internal-only function to decode byte lines on the fly so binary
+    streams can be parsed without reading them fully first.
+    """
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", errors="replace")
+        yield line
 
 
-def _get_iosxr_rt(regex_str, vrf_str):
+def _iter_rt(lines, platform):
+    """
+    Internal-only function implementing the parser as a line-oriented
+    state machine shared by both platforms. A VRF starts at a definition
+    line and ends at the next line indented no deeper than it, so names or
+    descriptions containing "vrf" cannot split a block. IOS lists each RT
+    on its own "route-target" line while IOS XR nests bare RTs beneath an
+    "import/export route-target" line. Yields (name, rt_dict) tuples as
+    each VRF closes.
     """
-    Internal-only function to parse IOS XR route targets from
-    a VRF text output. This is a better design pattern than
-    copy/paste, which was done for the IOS parser.
+    vrf_regex = IOS_VRF_REGEX if platform == "ios" else IOSXR_VRF_REGEX
+
+    # VRF definitions all sit at the indent of the first one found, which
+    # ignores nested lines like "vrf X" under "router bgp" on IOS XR
+    vrf_indent = name = None
+    block = {}
+    for line in lines:
+        text = line.strip()
+        if not text:
+            continue
+        indent = len(line) - len(line.lstrip())
+
+        # A line at or above the definition indent closes the current VRF
+        if name is not None and indent <= vrf_indent:
+            yield name, block["data"]
+            name = None
+
+        # Check for the start of a new VRF block
+        if vrf_indent is None or indent == vrf_indent:
+            vrf_match = vrf_regex.match(text)
+            if vrf_match:
+                vrf_indent = indent
+                name = vrf_match.group("name")
+                block = _new_block(platform)
+                continue
+        if name is not None:
+            _parse_body_line(block, text, indent, platform)
+
+    # Emit the final VRF, which may not have a closing line
+    if name is not None:
+        yield name, block["data"]
+
+
+def _new_block(platform):
     """
-    regex = re.compile(regex_str, re.DOTALL)
-    rt_matches = regex.findall(vrf_str, re.DOTALL)
-    if rt_matches:
-        rt_list = [s.strip() for s in rt_matches[0].strip().split("\n")]
-    else:
-        rt_list = []
+    Internal-only function to return the parsing state of one VRF block.
+    "data" is the rt_dict yielded for the VRF, with every section field
+    the platform renders present even when not configured.
+    """
+    data = {"route_import": [], "route_export": []}
+    data.update({field: None for field in SECTION_FIELDS[platform]})
+    return {"data": data, "body_indent": None, "rt_list": None}
+
 
-    # Return the list of parsed route-targets
-    return rt_list
+def _parse_body_line(block, text, indent, platform):
+    """
+    Internal-only function to apply one line inside a VRF block. Section
+    fields count only directly beneath the definition, so an "rd" nested
+    in an address family is not mistaken for the VRF's own.
+    """
+    data = block["data"]
+
+    # IOS XR: collect bare RTs indented beneath the list header
+    if block["rt_list"] is not None:
+        if indent > block["rt_indent"]:
+            block["rt_list"].append(text)
+            return
+        block["rt_list"] = None
+
+    # Section fields such as rd and description, kept as configured
+    if block["body_indent"] is None:
+        block["body_indent"] = indent
+    field_match = FIELD_REGEX.match(text)
+    if (
+        field_match
+        and indent == block["body_indent"]
+        and field_match.group("field") in data
+    ):
+        data[field_match.group("field")] = field_match.group("value")
+        return
+
+    # IOS: one RT per line. IOS XR: start collecting a nested list
+    rt_regex = IOS_RT_REGEX if platform == "ios" else IOSXR_RT_REGEX
+    rt_match = rt_regex.match(text)
+    if rt_match:
+        key = f"route_{rt_match.group('direction')}"
+        if platform == "ios":
+            data[key].append(rt_match.group("rt"))
+        else:
+            block["rt_list"], block["rt_indent"] = data[key], indent
 
 
 def get_rt_parser(platform):
@@ -96,6 +171,44 @@ def get_rt_parser(platform):
     return dispatch_dict.get(platform.lower())
 
 
+def parse_many(
+    outputs_by_host, platform_by_host, workers=None, min_bytes=1024 * 1024
+):
+    """
+    Parses VRF output for many hosts and returns a dict of results keyed
+    by host. Parsing is CPU-bound and holds the GIL, so large batches are
+    spread across a process pool in chunks; batches under "min_bytes" of
+    total output are parsed serially since process startup would dominate.
+    """
+    items = [
+        (host, platform_by_host[host], text)
+        for host, text in outputs_by_host.items()
+    ]
+    total_bytes = sum(len(text) for _, _, text in items)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(items) < 2 or total_bytes < min_bytes:
+        return dict(map(_parse_one, items))
+
+    # Several chunks per worker balances uneven config sizes while still
+    # amortizing the cost of shipping each chunk to a process
+    workers = min(workers, len(items))
+    chunksize = max(1, len(items) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return dict(executor.map(_parse_one, items, chunksize=chunksize))
+
+
+def _parse_one(item):
+    """
+    Internal-only function to parse one (host, platform, text) tuple.
+    Defined at module level so it can be sent to worker processes.
+    """
+    host, platform, text = item
+    parse_rt = get_rt_parser(platform)
+    if parse_rt is None:
+        raise ValueError(f"{host}: unsupported platform {platform}")
+    return host, parse_rt(text)
+
+
 def rt_diff(int_vrf_list, run_vrf_dict):
     """
     Uses set theory to determine the import/export route-targets that
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: Fleet-wide route-target inverted index built from parser output.
+Maps each RT to the (device, VRF) pairs that import or export it, so
+"who imports 65000:1" is a dict lookup. Devices are updated one snapshot
+at a time without rebuilding the index, which keeps pre-change audits
+such as leak detection and cross-tenant checks fast.
+"""
+
+from collections import namedtuple
+
+# A route leak finding. Kind is "orphan_import" (nobody exports the RT)
+# or "cross_tenant" (importer and exporter belong to different tenants).
+Leak = namedtuple("Leak", "kind rt importer exporter")
+
+DIRECTIONS = ("import", "export")
+
+
+class RtIndex:
+    """
+    Inverted index of route-targets. Members are (device, vrf) tuples.
+    """
+
+    def __init__(self):
+        self._by_rt = {}
+        self._by_device = {}
+
+    def __len__(self):
+        return len(self._by_rt)
+
+    def update_device(self, device, vrf_data):
+        """
+        Replaces a device's entries with a new parsed snapshot, in the
+        parser's {vrf: {route_import, route_export}} shape. Only that
+        device's RTs are touched. Returns the set of RTs affected.
+        """
+        affected = self.remove_device(device)
+        self._by_device[device] = vrf_data
+        for vrf, rt_dict in vrf_data.items():
+            for direction in DIRECTIONS:
+                for rte in rt_dict[f"route_{direction}"]:
+                    entry = self._by_rt.setdefault(
+                        rte, {"import": set(), "export": set()}
+                    )
+                    entry[direction].add((device, vrf))
+                    affected.add(rte)
+        return affected
+
+    def remove_device(self, device):
+        """
+        Removes all of a device's entries. Returns the set of RTs affected.
+        """
+        affected = set()
+        vrf_data = self._by_device.pop(device, {})
+        for vrf, rt_dict in vrf_data.items():
+            for direction in DIRECTIONS:
+                for rte in rt_dict[f"route_{direction}"]:
+                    entry = self._by_rt.get(rte)
+                    if entry is None:
+                        continue
+                    entry[direction].discard((device, vrf))
+                    if not entry["import"] and not entry["export"]:
+                        del self._by_rt[rte]
+                    affected.add(rte)
+        return affected
+
+    def importers(self, rte):
+        """
+        Returns the set of (device, vrf) pairs importing the RT.
+        """
+        return set(self._by_rt.get(rte, {}).get("import", ()))
+
+    def exporters(self, rte):
+        """
+        Returns the set of (device, vrf) pairs exporting the RT.
+        """
+        return set(self._by_rt.get(rte, {}).get("export", ()))
+
+    def import_graph(self):
+        """
+        Returns {(device, vrf): set of (device, vrf)} mapping each VRF to
+        the VRFs whose routes it imports. Self-imports are omitted.
+        """
+        graph = {}
+        for entry in self._by_rt.values():
+            for importer in entry["import"]:
+                sources = entry["export"] - {importer}
+                if sources:
+                    graph.setdefault(importer, set()).update(sources)
+        return graph
+
+    def find_leaks(self, tenants=None, rts=None):
+        """
+        Returns sorted Leak records. Orphan imports are RTs imported but
+        exported by nobody. If "tenants" maps VRF names to tenant names
+        (unmapped VRFs are their own tenant), imports of routes exported
+        by another tenant are flagged too. Pass "rts", such as the set
+        returned by update_device(), to check only those RTs.
+        """
+        leaks = []
+        for rte in self._by_rt if rts is None else rts:
+            entry = self._by_rt.get(rte)
+            if entry is None or not entry["import"]:
+                continue
+            if not entry["export"]:
+                for importer in entry["import"]:
+                    leaks.append(Leak("orphan_import", rte, importer, None))
+                continue
+            if tenants is not None:
+                leaks.extend(_cross_tenant(rte, entry, tenants))
+        return sorted(leaks, key=lambda leak: tuple(map(str, leak)))
+
+
+def _cross_tenant(rte, entry, tenants):
+    """
+    Internal-only function to yield a Leak for every importer of the RT
+    whose tenant differs from an exporter's tenant.
+    """
+    for importer in entry["import"]:
+        importer_tenant = tenants.get(importer[1], importer[1])
+        for exporter in entry["export"]:
+            if tenants.get(exporter[1], exporter[1]) != importer_tenant:
+                yield Leak("cross_tenant", rte, importer, exporter)
@@ -3,76 +3,559 @@
 """
 Author: Nick Russo
 Purpose: Demonstrate using NAPALM via SSH to interact with multiple
-platforms to collect structured data.
+platforms to collect structured data. Use "--max-age" to reuse VRF
+output collected within that many seconds instead of asking the device.
+Unchanged output is only parsed once, even across runs. Use "--purge" to
+also remove VRFs that are configured but not in the vars/ files. Only
+VRFs changed since the last applied run are diffed; "--full" diffs all.
+Hosts run concurrently ("--workers") with per-phase timeouts. Use
+"--waves" to stage candidates on every host first, then commit in canary
+and batch waves that roll back on failure. Use "--fast" to skip hosts
+whose vars file and template are unchanged and whose configuration-change
+marker still matches the last confirmed run; the check needs only a
+short SSH login and one show command, not a NAPALM session. The model
+ID comes from the facts cache unless "--refresh-facts" is set. Use
+"--local-diff" to diff the candidate against a freshly collected
+running config locally, so the device compare only verifies the minimal
+change set, or "--dry-run" to print those change sets without loading anything.
 """
 
+import argparse
+import os
+import time
+from collections import namedtuple
 from napalm import get_network_driver
-from jinja2 import Environment, FileSystemLoader
 from yaml import safe_load
-from parse_rt_m8 import get_rt_parser, rt_diff
+from fleet_diff_m8 import diff_host
+from cache_m8 import OutputCache
+from memo_m8 import ParseMemo
+from state_m8 import StateStore
+from runner_m8 import run_fleet, print_outcomes, Phases
+from waves_m8 import WaveActions, run_waves
+from fastpath_m8 import (
+    FastPath,
+    fetch_marker,
+    intended_fingerprint,
+    marker_from_cli,
+)
+from facts_m8 import FactsStore
+from render_m8 import Renderer
+from config_diff_m8 import diff_config
 
+# Shared services for one run, handed to every per-host task. fastpath is
+# None unless "--fast" is set
+RunContext = namedtuple(
+    "RunContext", "args cache memo state facts_store renderer fastpath"
+)
 
-def main():
+
+def fast_path_key(host, phases, args):
+    """
+    Returns (intended, marker) for the fast path: a fingerprint of the
+    host's vars file, template, and options, plus the device's current
+    configuration-change marker fetched over a single SSH exec.
+    """
+    name, platform = host["name"], host["platform"]
+    intended = intended_fingerprint(
+        [f"vars/{name}_vrfs.yml", f"templates/sett/{platform}_vpn.j2"],
+        extra=[args.purge],
+    )
+    marker = phases.run("marker", fetch_marker, name, platform, args.timeout)
+    return intended, marker
+
+
+def create_device(host, args):
+    """
+    Determines and creates the network driver object based on platform.
+    The connection is not opened yet.
+    """
+    driver = get_network_driver(host["platform"])
+    return driver(
+        hostname=host["name"],
+        username="pyuser",
+        password="pypass",
+        timeout=int(args.timeout),
+    )
+
+
+def collect_host(host, device, phases, ctx):
+    """
+    Looks up the model ID and collects the VRF running configuration from
+    an open device. Returns (vrf_output, vrf_data).
+    """
+    name, platform = host["name"], host["platform"]
+
+    # Get the model ID, reusing cached facts while they are fresh
+    facts = ctx.facts_store.get_or_fetch(
+        name,
+        lambda: phases.run("facts", device.get_facts),
+        refresh=ctx.args.refresh_facts,
+    )
+    print(f"{name}: model type {facts['model']}")
+
+    # Determine the parser, run the proper show command, and perform
+    # parsing. NAPALM has open issue to obviate need for parser:
+    # https://github.com/napalm-automation/napalm/issues/502
+    # Only ask the device if there is no cached output young enough.
+    # A local diff drops lines and may skip the device compare, and
+    # the fast path records the live marker as in sync, so both always
+    # work from freshly collected output.
+    vrf_cmd = host["vrf_cmd"]
+    vrf_output = None
+    if not ctx.args.local_diff and not ctx.args.fast:
+        vrf_output = ctx.cache.get(name, platform, vrf_cmd, ctx.args.max_age)
+    if vrf_output is None:
+        vrf_output = phases.run("cli", device.cli, [vrf_cmd])[vrf_cmd]
+        ctx.cache.put(name, platform, vrf_cmd, vrf_output)
+    return vrf_output, ctx.memo.parse(platform, vrf_output)
+
+
+def read_vrfs(name):
+    """
+    Reads the host's intended VRF list from its vars/ file. Returns
+    (vrf_list, names), may raise YAMLError.
+    """
+    with open(f"vars/{name}_vrfs.yml", "r") as handle:
+        vrfs = safe_load(handle)["vrfs"]
+    return vrfs, [str(vrf["name"]) for vrf in vrfs]
+
+
+def render_candidate(host, int_vrfs, vrf_data, names, ctx):
+    """
+    Finds the difference in RTs between the intended VRFs and the running
+    config, then templates the configuration changes based on them.
+    """
+    rt_updates = diff_host(
+        int_vrfs, vrf_data, purge=ctx.args.purge, managed=names
+    )
+    return ctx.renderer.render(
+        f"templates/sett/{host['platform']}_vpn.j2", data=rt_updates
+    )
+
+
+def stage_host(host, phases, ctx):
+    """
+    Opens the device, collects and diffs its VRFs, and loads the rendered
+    changes as a merge candidate. Returns (device, diff, dirty) with the
+    device still open; diff is None when no VRF changed since the last
+    applied run. The device is closed if staging fails.
+    """
+    name = host["name"]
+    device = create_device(host, ctx.args)
+
+    try:
+        phases.run("open", device.open)
+        vrf_output, vrf_data = collect_host(host, device, phases, ctx)
+        int_vrfs, names = read_vrfs(name)
+
+        # Only VRFs whose intended data or running section changed since
+        # the last applied run need diffing, plus unmanaged VRFs when
+        # purging
+        if ctx.args.full:
+            ctx.state.forget(name)
+        dirty = ctx.state.dirty_vrfs(name, int_vrfs, vrf_data, host["platform"])
+        unmanaged = set(vrf_data) - set(names) if ctx.args.purge else set()
+        print(f"{name}: {len(dirty)} of {len(names)} VRFs changed")
+        if not dirty and not unmanaged:
+            return device, None, dirty
+        new_vrf_config = render_candidate(host, dirty, vrf_data, names, ctx)
+
+        # Keep only the lines that still change the running config, so
+        # the device compare below merely verifies them
+        if ctx.args.local_diff:
+            changes = diff_config(new_vrf_config, vrf_output)
+            if not changes:
+                return device, "", dirty
+            new_vrf_config = "\n".join(changes) + "\n"
+
+        # Use NAPALM built-in merging to compare RT updates
+        phases.run("load", device.load_merge_candidate, config=new_vrf_config)
+        diff = phases.run("compare", device.compare_config)
+        return device, diff, dirty
+
+    except Exception:
+        close_device(device, phases)
+        raise
+
+
+def dry_run_host(host, phases, ctx):
+    """
+    Computes and prints the change set for one host locally, diffing
+    every intended VRF, without loading anything. The device is only
+    contacted when the cache has no VRF output younger than --max-age.
+    """
+    name, platform = host["name"], host["platform"]
+    vrf_cmd = host["vrf_cmd"]
+    vrf_output = ctx.cache.get(name, platform, vrf_cmd, ctx.args.max_age)
+    if vrf_output is None:
+        device = create_device(host, ctx.args)
+        try:
+            phases.run("open", device.open)
+            vrf_output = phases.run("cli", device.cli, [vrf_cmd])[vrf_cmd]
+        finally:
+            close_device(device, phases)
+        ctx.cache.put(name, platform, vrf_cmd, vrf_output)
+    vrf_data = ctx.memo.parse(platform, vrf_output)
+
+    # Render the RT updates and diff them against the running config
+    int_vrfs, names = read_vrfs(name)
+    new_vrf_config = render_candidate(host, int_vrfs, vrf_data, names, ctx)
+    changes = diff_config(new_vrf_config, vrf_output)
+    if not changes:
+        print(f"{name}: no diff; config up to date")
+        return "no diff"
+    print(f"{name}: {len(changes)} lines would change\n" + "\n".join(changes))
+    return f"{len(changes)} lines"
+
+
+def close_device(device, phases):
+    """
+    Closes the connection, without letting a failed close hide the
+    outcome of the earlier phases. If a timed-out call is still running
+    on the connection, it is left open, since closing it could cut off a
+    commit that is still being applied.
+    """
+    if phases.abandoned:
+        print(
+            f"{phases.host_name}: {', '.join(phases.abandoned)} still "
+            "running; leaving the connection open"
+        )
+        return
+    try:
+        phases.run("close", device.close)
+    except Exception:  # pylint: disable=broad-except
+        pass
+
+
+def check_fast_path(host, phases, ctx):
+    """
+    Returns (skip, intended, marker) for a host. Without a fastpath, or
+    with --full, the host is never skipped.
+    """
+    if ctx.fastpath is None:
+        return False, None, None
+    intended, marker = fast_path_key(host, phases, ctx.args)
+    skip = not ctx.args.full and ctx.fastpath.can_skip(
+        host["name"], intended, marker
+    )
+    return skip, intended, marker
+
+
+def commit_host(host, device, phases, ctx):
+    """
+    Commits the staged candidate. Returns the new configuration-change
+    marker when a fastpath is in use, or None.
+    """
+    try:
+        phases.run("commit", device.commit_config)
+
+    # Even a failed or timed-out commit may have changed the device, so
+    # never reuse the cached output afterwards. The VRFs stay dirty, so
+    # the next run diffs them again
+    finally:
+        ctx.cache.invalidate(host["name"], host["platform"], host["vrf_cmd"])
+
+    # The commit moved the marker; read it on this session right away to
+    # keep the window for unseen changes small
+    if ctx.fastpath is None:
+        return None
+    return phases.run("marker", marker_from_cli, device.cli, host["platform"])
+
+
+def manage_host(host, phases, ctx):
+    """
+    Runs the full collect, diff, render, and merge workflow for one host,
+    committing right away. Returns a short result string for the
+    end-of-run table. With a fastpath, hosts that cannot have drifted are
+    skipped before any NAPALM session is opened.
+    """
+    name = host["name"]
+    skip, intended, marker = check_fast_path(host, phases, ctx)
+    if skip:
+        print(f"{name}: unchanged since last confirmed run; skipped")
+        return "skipped"
+
+    device, diff, dirty = stage_host(host, phases, ctx)
+    try:
+        if diff is None:
+            result = "unchanged"
+        elif diff:
+            print(f"{name}: committing configuration changes\n{diff}")
+            marker = commit_host(host, device, phases, ctx)
+            result = "committed"
+        else:
+            print(f"{name}: no diff; config up to date")
+            result = "no diff"
+        if diff is not None:
+            ctx.state.record(name, dirty, host["platform"])
+    finally:
+        close_device(device, phases)
+
+    # The device is now in sync as of this marker
+    if ctx.fastpath is not None:
+        ctx.fastpath.record(name, intended, marker)
+    return result
+
+
+def stage_fleet(hosts, ctx):
+    """
+    Phase one of a wave rollout: stages candidates on every host at once
+    and prints the fleet plan. Returns a dict of host name to (host,
+    device, dirty) for hosts with a diff, whose devices are still open.
+    """
+    staged = {}
+
+    def _stage(host, phases):
+        skip, intended, marker = check_fast_path(host, phases, ctx)
+        if skip:
+            return "skipped"
+
+        device, diff, dirty = stage_host(host, phases, ctx)
+        if diff:
+            staged[host["name"]] = (host, device, dirty)
+            return "staged"
+        if diff is not None:
+            ctx.state.record(host["name"], dirty, host["platform"])
+        close_device(device, phases)
+        if ctx.fastpath is not None:
+            ctx.fastpath.record(host["name"], intended, marker)
+        return "unchanged" if diff is None else "no diff"
+
+    # PHASE 1: load and compare candidates across the fleet at once
+    start = time.monotonic()
+    outcomes = run_fleet(
+        _stage,
+        hosts,
+        workers=ctx.args.workers,
+        timeouts={"commit": ctx.args.commit_timeout},
+        default_timeout=ctx.args.timeout,
+    )
+    print_outcomes(outcomes, time.monotonic() - start)
+    return staged
+
+
+def commit_fleet(order, staged, ctx):
+    """
+    Phase two of a wave rollout: commits the staged hosts in "order" in
+    waves, checking health between waves and rolling back the current
+    wave on failure. Returns (report, abandoned), where abandoned is the
+    set of hosts with a timed-out call still running. Every staged device
+    is closed unless a call on it was abandoned.
+    """
+    args = ctx.args
+    abandoned = set()
+
+    # PHASE 2: commit in waves. Each device call gets the phase timeouts,
+    # and hosts with a timed-out call still running are remembered
+    def _call(name, phase, func):
+        phases = Phases(name, {"commit": args.commit_timeout}, args.timeout)
+        try:
+            return phases.run(phase, func)
+        finally:
+            if phases.abandoned:
+                abandoned.add(name)
+
+    def _healthy(name):
+        # A check that fails or times out counts as unhealthy
+        try:
+            return _call(name, "health", staged[name][1].is_alive)["is_alive"]
+        except Exception as exc:  # pylint: disable=broad-except
+            print(f"{name}: health check failed: {exc}")
+            return False
+
+    def _rollback(name):
+        # A timed-out health check may still be using the session
+        if name in abandoned:
+            raise RuntimeError("health check still running; rollback pending")
+        _call(name, "rollback", staged[name][1].rollback)
+
+    actions = WaveActions(
+        commit=lambda name: _call(
+            name, "commit", staged[name][1].commit_config
+        ),
+        rollback=_rollback,
+        discard=lambda name: _call(
+            name, "discard", staged[name][1].discard_config
+        ),
+        health_check=lambda wave: [n for n in wave if not _healthy(n)],
+    )
+    try:
+        report = run_waves(
+            order,
+            actions,
+            canary_percent=args.canary_percent,
+            batch_size=args.batch_size,
+            workers=args.workers,
+        )
+    finally:
+        for name, (_, device, _) in staged.items():
+            phases = Phases(name, default_timeout=args.timeout)
+            if name in abandoned:
+                phases.abandoned.append("commit or rollback")
+            close_device(device, phases)
+    return report, abandoned
+
+
+def run_two_phase(hosts, ctx):
+    """
+    Phase one stages candidates on every host concurrently and prints the
+    fleet plan. Phase two commits the hosts with diffs in waves, checking
+    health between waves and rolling back the current wave on failure.
+    """
+    staged = stage_fleet(hosts, ctx)
+    order = [host["name"] for host in hosts if host["name"] in staged]
+    print(f"\nFleet plan: {len(order)} hosts to commit: {', '.join(order)}")
+    report, abandoned = commit_fleet(order, staged, ctx)
+
+    # Any host that attempted a commit may have changed, even if it
+    # failed or timed out. Record applied state only where commits stuck
+    attempted = set(report.committed + report.failed + report.unknown)
+    attempted.update(report.rolled_back + report.rollback_failed)
+    for name in attempted:
+        host = staged[name][0]
+        ctx.cache.invalidate(name, host["platform"], host["vrf_cmd"])
+    for name in report.committed:
+        host, _, dirty = staged[name]
+        ctx.state.record(name, dirty, host["platform"])
+
+    # Committed hosts have new markers; check them fully on the next run
+    if ctx.fastpath is not None:
+        for name in staged:
+            ctx.fastpath.forget(name)
+
+    print(f"\nCommitted {len(report.committed)}/{len(order)} hosts")
+    for name, error in report.errors.items():
+        print(f"{name}: {error}")
+    for label in ("rolled_back", "rollback_failed", "failed", "skipped"):
+        if getattr(report, label):
+            print(f"{label}: {', '.join(getattr(report, label))}")
+    unknown = abandoned.union(report.unknown)
+    if unknown:
+        names = ", ".join(sorted(unknown))
+        print(f"outcome unknown, rollback pending: {names}")
+
+
+def main(args):
     """
     Execution starts here.
     """
 
+    # Collected command output is cached on disk between runs, and so are
+    # the parsed results, keyed by a hash of the output
+    cache = OutputCache()
+    memo = ParseMemo(root=cache.root)
+
+    # Last applied state per VRF decides which VRFs need diffing
+    state = StateStore(root=cache.root)
+
+    # Facts such as the model rarely change, so reuse them while fresh
+    facts_store = FactsStore(os.path.join(cache.root, "facts.sqlite3"))
+
+    # Compile every template once, reusing bytecode from earlier runs
+    renderer = Renderer(cache_dir=os.path.join(cache.root, "jinja"))
+
+    # Intended fingerprints and markers of hosts confirmed in sync
+    fastpath = None
+    if args.fast:
+        fastpath = FastPath(os.path.join(cache.root, "fastpath.json"))
+
     # Read the hosts file into structured data, may raise YAMLError
     with open("hosts.yml", "r") as handle:
         host_root = safe_load(handle)
 
-    # Iterate over the list of hosts from YAML file
-    for host in host_root["host_list"]:
-        # Determine and create the network driver object based on platform
-        print(f"Getting {host['platform']} driver")
-        driver = get_network_driver(host["platform"])
-        device = driver(
-            hostname=host["name"], username="pyuser", password="pypass"
+    ctx = RunContext(args, cache, memo, state, facts_store, renderer, fastpath)
+    if args.dry_run:
+        # Only collect (or reuse) running configs and diff them locally
+        start = time.monotonic()
+        outcomes = run_fleet(
+            dry_run_host,
+            host_root["host_list"],
+            workers=args.workers,
+            default_timeout=args.timeout,
+            ctx=ctx,
         )
-
-        # Open the connection and get the model ID
-        print("Opening device and fathering facts")
-        device.open()
-        facts = device.get_facts()
-        print(f"{host['name']} model type: {facts['model']}")
-
-        # Determine the parser, run the proper show command, and perform parsing
-        # NAPALM has open issue to obviate need for parser:
-        # https://github.com/napalm-automation/napalm/issues/502
-        output = device.cli([host["vrf_cmd"]])
-        parse_rt = get_rt_parser(host["platform"])
-        vrf_data = parse_rt(output[host["vrf_cmd"]])
-
-        # Read the YAML file into structured data, may raise YAMLError
-        with open(f"vars/{host['name']}_vrfs.yml", "r") as handle:
-            vrfs = safe_load(handle)
-
-        # Find the difference in RTs between intended and actual configs
-        rt_updates = rt_diff(vrfs["vrfs"], vrf_data)
-
-        # Template the configuration changes based on the RT updates
-        j2_env = Environment(
-            loader=FileSystemLoader("."), trim_blocks=True, autoescape=True
-        )
-        template = j2_env.get_template(
-            f"templates/sett/{host['platform']}_vpn.j2"
+        print_outcomes(outcomes, time.monotonic() - start)
+    elif args.waves:
+        run_two_phase(host_root["host_list"], ctx)
+    else:
+        # Run every host concurrently; commits get a longer timeout
+        start = time.monotonic()
+        outcomes = run_fleet(
+            manage_host,
+            host_root["host_list"],
+            workers=args.workers,
+            timeouts={"commit": args.commit_timeout},
+            default_timeout=args.timeout,
+            ctx=ctx,
         )
-        new_vrf_config = template.render(data=rt_updates)
-
-        # Use NAPALM built-in merging to compare and merge RT updates
-        device.load_merge_candidate(config=new_vrf_config)
-        diff = device.compare_config()
-        if diff:
-            print(diff)
-            print("Committing configuration changes")
-            device.commit_config()
-        else:
-            print("no diff; config up to date")
+        print_outcomes(outcomes, time.monotonic() - start)
 
-        # All done; close the connection
-        device.close()
-        print("OK!\n")
+    # Persist applied state and trim the cache back under its size limit
+    state.save()
+    if fastpath is not None:
+        fastpath.save()
+    facts_store.close()
+    cache.evict()
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--max-age",
+        type=float,
+        default=0,
+        help="reuse cached VRF output younger than this many seconds "
+        "(ignored with --fast or --local-diff)",
+    )
+    parser.add_argument(
+        "--purge",
+        action="store_true",
+        help="remove configured VRFs that are not in the vars/ files",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="ignore the last applied state and diff every VRF",
+    )
+    parser.add_argument("--workers", type=int, default=10)
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=60.0,
+        help="seconds allowed for each device phase, such as open or cli",
+    )
+    parser.add_argument(
+        "--commit-timeout",
+        type=float,
+        default=300.0,
+        help="seconds allowed for the commit phase",
+    )
+    parser.add_argument(
+        "--waves",
+        action="store_true",
+        help="stage all hosts first, then commit in canary/batch waves",
+    )
+    parser.add_argument(
+        "--refresh-facts",
+        action="store_true",
+        help="ignore cached facts and run get_facts on every device",
+    )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="skip hosts whose intended state and change marker are unchanged",
+    )
+    parser.add_argument(
+        "--local-diff",
+        action="store_true",
+        help="diff against freshly collected (never cached) output and "
+        "load only the lines that change the device",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="print locally computed change sets without loading anything",
+    )
+    parser.add_argument("--canary-percent", type=float, default=10.0)
+    parser.add_argument("--batch-size", type=int, default=10)
+    main(parser.parse_args())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: Persist the last applied intended state per (host, VRF) along
+with a fingerprint of the running section it should produce: the
+route-targets plus the rd and description the platform's template
+renders. On the next run, only VRFs whose intended data or running
+fingerprint changed are diffed and rendered; clean hosts are skipped
+entirely.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from parse_rt_m8 import SECTION_FIELDS
+
+
+class StateStore:
+    """
+    One JSON file per host under "root"/state, mapping each VRF name to
+    {"intended": fingerprint, "running": fingerprint}. Files are loaded
+    on first use and only hosts changed by record() are rewritten by
+    save(). Safe to share across threads.
+    """
+
+    def __init__(self, root=".cache"):
+        self.root = os.path.join(root, "state")
+        self._hosts = {}
+        self._dirty_hosts = set()
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def dirty_vrfs(self, host, int_vrf_list, run_vrf_dict, platform):
+        """
+        Returns the intended VRFs that need diffing: those never applied,
+        whose intended data changed, or whose running section no longer
+        matches what was last applied.
+        """
+        applied = self._load(host)
+        fields = SECTION_FIELDS[platform.lower()]
+        dirty = []
+        for vrf in int_vrf_list:
+            last = applied.get(str(vrf["name"]))
+            running = running_fingerprint(
+                run_vrf_dict.get(str(vrf["name"])), fields
+            )
+            if (
+                last is None
+                or last["intended"] != intended_fingerprint(vrf)
+                or last["running"] != running
+            ):
+                dirty.append(vrf)
+        return dirty
+
+    def record(self, host, int_vrf_list, platform):
+        """
+        Records VRFs as applied. The running fingerprint stored is the one
+        the device will have once the intended section is in place, so
+        the next run is clean unless someone changes the device.
+        """
+        applied = self._load(host)
+        fields = SECTION_FIELDS[platform.lower()]
+        with self._lock:
+            for vrf in int_vrf_list:
+                applied[str(vrf["name"])] = {
+                    "intended": intended_fingerprint(vrf),
+                    "running": running_fingerprint(vrf, fields),
+                }
+            self._dirty_hosts.add(host)
+
+    def forget(self, host):
+        """
+        Discards all state for a host, forcing a full diff next time.
+        """
+        with self._lock:
+            self._hosts[host] = {}
+            self._dirty_hosts.add(host)
+
+    def save(self):
+        """
+        Writes state for every host changed since the last save.
+        """
+        with self._lock:
+            for host in sorted(self._dirty_hosts):
+                data = json.dumps(self._hosts[host], sort_keys=True)
+                self._atomic_write(self._path(host), data.encode("utf-8"))
+            self._dirty_hosts.clear()
+
+    def _load(self, host):
+        """
+        Internal-only function to return a host's state, reading it from
+        disk on first use. Missing or unreadable files mean no state.
+        """
+        with self._lock:
+            if host not in self._hosts:
+                try:
+                    with open(self._path(host), "r") as handle:
+                        self._hosts[host] = json.load(handle)
+                except (FileNotFoundError, ValueError):
+                    self._hosts[host] = {}
+            return self._hosts[host]
+
+    def _path(self, host):
+        """
+        Internal-only function to map a host to its state file.
+        """
+        return os.path.join(self.root, f"{host}.json")
+
+    @staticmethod
+    def _atomic_write(path, data):
+        """
+        Internal-only function to write a file via rename so an interrupted
+        run never leaves a partially written state file.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp_path, path)
+
+
+def intended_fingerprint(vrf):
+    """
+    Returns a digest of an intended VRF dict, independent of key order.
+    """
+    data = json.dumps(vrf, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def running_fingerprint(rt_dict, fields=()):
+    """
+    Returns a digest of a VRF's route-targets, independent of their order,
+    and of the section fields named in "fields" (such as rd). Works on
+    parsed running data or an intended VRF dict; a missing VRF (None) has
+    its own fingerprint.
+    """
+    if rt_dict is None:
+        data = "absent"
+    else:
+        values = [rt_dict.get(field) for field in fields]
+        data = json.dumps(
+            [
+                sorted(set(rt_dict["route_import"])),
+                sorted(set(rt_dict["route_export"])),
+                [None if value is None else str(value) for value in values],
+            ]
+        )
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: Synthetic VRF data for scale testing. Generates intended VRF
+lists in the same shape as the vars/ files, and renders them as IOS or
+IOS-XR running configuration sections like the devices return.
+"""
+
+
+def synth_vrfs(count, drift=0):
+    """
+    Returns a list of "count" VRF dictionaries matching the vars/ files.
+    Each VRF has one import RT that depends on "drift", so two lists
+    built with different drift values differ in every VRF, which gives
+    rt_diff and the templates realistic work to do.
+    """
+    vrfs = []
+    for num in range(count):
+        vrfs.append(
+            {
+                "name": f"VPN{num:06d}",
+                "description": f"SYNTHETIC CUSTOMER {num} vrf",
+                "rd": f"65000:{num}",
+                "route_import": [f"65000:{num}", f"65001:{num + drift}"],
+                "route_export": [f"65000:{num}"],
+            }
+        )
+    return vrfs
+
+
+def render_config(vrfs, platform):
+    """
+    Renders a list of VRF dictionaries as the text the platform returns
+    for its VRF "show running-config" command.
+    """
+    lines = []
+    for vrf in vrfs:
+        if platform == "ios":
+            lines.append(f"vrf definition {vrf['name']}")
+            lines.append(f" description {vrf['description']}")
+            lines.append(f" rd {vrf['rd']}")
+            for rte in vrf["route_export"]:
+                lines.append(f" route-target export {rte}")
+            for rti in vrf["route_import"]:
+                lines.append(f" route-target import {rti}")
+            lines.append("!")
+        else:
+            lines.append(f"vrf {vrf['name']}")
+            lines.append(f" description {vrf['description']}")
+            lines.append(" address-family ipv4 unicast")
+            for key in ("import", "export"):
+                lines.append(f"  {key} route-target")
+                lines.extend(f"   {rt}" for rt in vrf[f"route_{key}"])
+                lines.append("  !")
+            lines.extend([" !", "!"])
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: The pytest functions for ensuring the synthetic configs parse
+correctly and baseline comparisons flag slowdowns. Run with "-s" to see
+outputs.
+"""
+
+from parse_rt_m8 import parse_rt_ios, parse_rt_iosxr, rt_diff
+from synth_m8 import synth_vrfs, render_config
+from bench_m8 import find_regressions, run_benchmarks
+
+
+def test_synth_roundtrip():
+    """
+    Synthetic configs parse back to the VRFs they were built from on both
+    platforms, and drifted configs produce updates for every VRF.
+    """
+    vrfs = synth_vrfs(50)
+    expected = {
+        vrf["name"]: {
+            "route_import": vrf["route_import"],
+            "route_export": vrf["route_export"],
+            "description": vrf["description"],
+        }
+        for vrf in vrfs
+    }
+    print(render_config(vrfs[:1], "iosxr"))
+    assert parse_rt_iosxr(render_config(vrfs, "iosxr")) == expected
+    for vrf in vrfs:
+        expected[vrf["name"]]["rd"] = vrf["rd"]
+    assert parse_rt_ios(render_config(vrfs, "ios")) == expected
+
+    running = parse_rt_ios(render_config(synth_vrfs(50, drift=1), "ios"))
+    updates = rt_diff(vrfs, running)
+    assert all(len(vrf["add_rti"]) == 1 for vrf in updates)
+    assert all(len(vrf["del_rti"]) == 1 for vrf in updates)
+
+
+def test_run_benchmarks():
+    """
+    Every parser and diff case is timed at each size.
+    """
+    results = run_benchmarks([10, 20], repeat=1)
+    print(results)
+    for case in ("parse_rt_ios", "parse_rt_iosxr", "rt_diff"):
+        assert results[f"{case}/10"] >= 0
+        assert results[f"{case}/20"] >= 0
+
+
+def test_find_regressions():
+    """
+    Only cases slower than the threshold, and above the noise floor in
+    the baseline, are reported.
+    """
+    baseline = {"a/10": 0.100, "b/10": 0.100, "c/10": 0.0001, "d/10": 0.1}
+    results = {"a/10": 0.110, "b/10": 0.200, "c/10": 0.01, "e/10": 9.0}
+    assert find_regressions(results, baseline) == [("b/10", 0.100, 0.200)]
+    assert find_regressions(results, baseline, threshold=0.05) == [
+        ("a/10", 0.100, 0.110),
+        ("b/10", 0.100, 0.200),
+    ]
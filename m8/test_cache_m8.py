@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: The pytest functions for ensuring the content-addressed output
+cache honors TTLs and size limits. Run with "-s" to see outputs.
+"""
+
+import os
+import time
+from cache_m8 import OutputCache
+from memo_m8 import ParseMemo
+
+
+def test_cache_get_put(tmp_path):
+    """
+    Stored output comes back while it is young enough, and identical
+    output from different hosts is stored once.
+    """
+    cache = OutputCache(root=str(tmp_path))
+    vrf_cmd = "show running-config vrf"
+    assert cache.get("R2", "iosxr", vrf_cmd, max_age=60) is None
+
+    digest = cache.put("R2", "iosxr", vrf_cmd, "vrf A\n")
+    assert cache.put("R3", "iosxr", vrf_cmd, "vrf A\n") == digest
+    assert cache.get("R2", "iosxr", vrf_cmd, max_age=60) == "vrf A\n"
+    assert cache.get("R2", "iosxr", vrf_cmd, max_age=0) is None
+    assert cache.get("R2", "ios", vrf_cmd, max_age=60) is None
+    assert len(os.listdir(tmp_path / "objects" / digest[:2])) == 1
+
+    # Expired entries and invalidated entries both miss
+    time.sleep(0.05)
+    assert cache.get("R2", "iosxr", vrf_cmd, max_age=0.01) is None
+    cache.invalidate("R3", "iosxr", vrf_cmd)
+    assert cache.get("R3", "iosxr", vrf_cmd, max_age=60) is None
+
+
+def test_cache_crlf(tmp_path):
+    """
+    Device output with CRLF line endings comes back byte for byte.
+    """
+    cache = OutputCache(root=str(tmp_path))
+    output = "vrf A\r\n description test\r\n"
+    digest = cache.put("R1", "ios", "show running-config", output)
+    cached = cache.get("R1", "ios", "show running-config", max_age=60)
+    assert cached == output
+    assert cache.put("R1", "ios", "show running-config", cached) == digest
+
+
+def test_cache_evict(tmp_path):
+    """
+    Eviction removes least recently used outputs first until the cache
+    fits within its size limit.
+    """
+    cache = OutputCache(root=str(tmp_path), max_bytes=250)
+    for num in range(3):
+        cache.put(f"R{num}", "ios", "show version", f"{num}" * 100)
+        time.sleep(0.01)
+
+    # Touch R0 so that R1 becomes the least recently used output
+    assert cache.get("R0", "ios", "show version", max_age=60)
+    assert cache.evict() == 100
+    assert cache.get("R0", "ios", "show version", max_age=60) == "0" * 100
+    assert cache.get("R1", "ios", "show version", max_age=60) is None
+    assert cache.get("R2", "ios", "show version", max_age=60) == "2" * 100
+
+
+def test_cache_evict_parsed(tmp_path):
+    """
+    Parsed results stored by the memo are evicted along with outputs.
+    """
+    cache = OutputCache(root=str(tmp_path), max_bytes=0)
+    ParseMemo(root=cache.root).parse("ios", "vrf definition A\n")
+    assert list((tmp_path / "parsed").rglob("*.json"))
+    assert cache.evict() > 0
+    assert not list((tmp_path / "parsed").rglob("*.json"))
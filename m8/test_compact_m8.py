@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: The pytest functions for ensuring the compact VRF model packs
+route-targets correctly and converts back to the dict shapes losslessly.
+Run with "-s" to see outputs.
+"""
+
+import pytest
+from compact_m8 import (
+    pack_rt,
+    unpack_rt,
+    VrfRecord,
+    compact_parsed,
+    expand_parsed,
+    compact_intended,
+    expand_intended,
+)
+
+
+def test_pack_rt():
+    """
+    Each RFC 4360 route-target form packs to the expected type and
+    unpacks to the same string.
+    """
+    assert pack_rt("65000:101") == 0x0002_FDE8_00000065
+    assert pack_rt("192.0.2.1:7") == 0x0102_C0000201_0007
+    assert pack_rt("4200000000:5") == 0x0202_FA56EA00_0005
+    assert pack_rt("1.10:5") == pack_rt("65546:5")
+    for rte in ("65000:101", "65000:4294967295", "192.0.2.1:7", "65536:1"):
+        print(rte, hex(pack_rt(rte)))
+        assert unpack_rt(pack_rt(rte)) == rte
+
+    # Malformed or out of range values are rejected
+    for bad in ("65000", "abc:1", "65536:65536", "1.2.3:4", "300.0.0.1:1"):
+        with pytest.raises(ValueError):
+            pack_rt(bad)
+
+
+def test_vrf_record_roundtrip():
+    """
+    Parser output and intended lists survive conversion, with RTs sorted
+    and de-duplicated.
+    """
+    vrf_data = {
+        "A": {"route_import": ["65000:2", "65000:1"], "route_export": []},
+        "B": {"route_import": [], "route_export": ["10.0.0.1:1"]},
+    }
+    records = compact_parsed(vrf_data)
+    print(records)
+    assert list(records["A"].route_import) == [
+        pack_rt("65000:1"),
+        pack_rt("65000:2"),
+    ]
+    expected = {
+        "A": {"route_import": ["65000:1", "65000:2"], "route_export": []},
+        "B": {"route_import": [], "route_export": ["10.0.0.1:1"]},
+    }
+    assert expand_parsed(records) == expected
+
+    vrf_list = [
+        {
+            "name": "POLICE",
+            "description": "POLICE DEPARTMENT",
+            "rd": "65000:1",
+            "route_import": ["65000:1", "65000:1"],
+            "route_export": ["65000:1"],
+        }
+    ]
+    records = compact_intended(vrf_list)
+    vrf_list[0]["route_import"] = ["65000:1"]
+    assert expand_intended(records) == vrf_list
+    assert records == compact_intended(vrf_list)
+
+    # Slotted records have no per-instance dict
+    assert not hasattr(VrfRecord("A"), "__dict__")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: The pytest functions for ensuring local config diffs return the
+minimal ordered change set for IOS and IOS-XR hierarchies. Run with "-s"
+to see outputs.
+"""
+
+from config_diff_m8 import diff_config
+
+IOS_RUNNING = """\
+vrf definition POLICE
+ rd 65000:1
+ description POLICE DEPARTMENT
+ route-target export 65000:1
+ route-target import 65000:1
+ !
+ address-family ipv4
+ exit-address-family
+!
+vrf definition OLD
+ rd 65000:9
+"""
+
+XR_RUNNING = """\
+vrf POLICE
+ description POLICE DEPARTMENT
+ address-family ipv4 unicast
+  import route-target
+   65000:1
+  !
+  export route-target
+   65000:1
+  !
+ !
+!
+"""
+
+
+def test_diff_config_ios():
+    """
+    Test that existing lines are dropped, new and negated lines keep
+    their parent as context, and new sections come with their subtree.
+    """
+    candidate = """\
+vrf definition POLICE
+ rd 65000:1
+ description POLICE DEPARTMENT
+ route-target export 65000:1
+ route-target import 65000:99
+ no route-target import 65000:1
+ no route-target import 65000:5
+vrf definition CHEMICAL
+ rd 65000:2
+ route-target import 65000:2
+ no route-target export 65000:2
+no vrf definition OLD
+no vrf definition MISSING
+"""
+    changes = diff_config(candidate, IOS_RUNNING)
+    print("\n".join(changes))
+    assert changes == [
+        "vrf definition POLICE",
+        " route-target import 65000:99",
+        " no route-target import 65000:1",
+        "vrf definition CHEMICAL",
+        " rd 65000:2",
+        " route-target import 65000:2",
+        "no vrf definition OLD",
+    ]
+
+    # A candidate that matches the running config needs no changes
+    assert not diff_config(IOS_RUNNING, IOS_RUNNING)
+
+
+def test_diff_config_negation_prefix():
+    """
+    Test that a negation matches configured lines by keywords, and that
+    an already negated line is left alone.
+    """
+    running = "interface Loopback1\n description old\n no ip redirects\n"
+    candidate = (
+        "interface Loopback1\n no description\n no ip redirects\n"
+        "no interface Loopback2\n"
+    )
+    assert diff_config(candidate, running) == [
+        "interface Loopback1",
+        " no description",
+    ]
+
+
+def test_diff_config_iosxr():
+    """
+    Test that deeply nested IOS-XR route-target lists diff level by level.
+    """
+    candidate = """\
+vrf POLICE
+ description POLICE DEPARTMENT
+ address-family ipv4 unicast
+  import route-target
+   65000:1
+   65000:3
+  export route-target
+   no 65000:1
+"""
+    changes = diff_config(candidate, XR_RUNNING)
+    print("\n".join(changes))
+    assert changes == [
+        "vrf POLICE",
+        " address-family ipv4 unicast",
+        "  import route-target",
+        "   65000:3",
+        "  export route-target",
+        "   no 65000:1",
+    ]
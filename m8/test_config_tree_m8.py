@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: The pytest functions for ensuring full running configurations
+are indexed into a navigable tree. Run with "-s" to see outputs.
+"""
+
+import os
+from config_tree_m8 import parse_config
+
+LAB_CONFIG = os.path.join(
+    os.path.dirname(__file__), "..", "lab", "configs", "R1.txt"
+)
+
+
+def test_config_tree_lookups():
+    """
+    Paths resolve by exact line or keyword prefix at any depth.
+    """
+    with open(LAB_CONFIG, "r") as handle:
+        tree = parse_config(handle.read())
+
+    assert tree.value("hostname") == "R1"
+    assert tree.value("vrf definition POLICE", "rd") == "65000:1"
+    assert tree.value("interface Loopback1", "vrf forwarding") == "POLICE"
+    assert tree.lookup("interface Loopback0", "vrf forwarding") is None
+    assert tree.lookup("interface Loopback9") is None
+
+    # Deeply nested routing config resolves the same way
+    bgp_path = ("router bgp", "scope vrf POLICE", "address-family ipv4")
+    print(tree.lookup(*bgp_path))
+    assert tree.value(*bgp_path, "redistribute") == "connected"
+
+    # Children iterate in config order
+    vrfs = [node.line for node in tree.find_all("vrf definition")]
+    assert vrfs == [
+        "vrf definition POLICE",
+        "vrf definition CHEMICAL",
+        "vrf definition CHEM_MGMT",
+    ]
+    route_targets = [
+        node.line
+        for node in tree.lookup("vrf definition CHEM_MGMT")
+        if node.line.startswith("route-target")
+    ]
+    assert route_targets == [
+        "route-target export 65000:3",
+        "route-target import 65000:4",
+    ]
+
+
+def test_config_tree_iosxr():
+    """
+    IOS XR closing "!" lines are skipped and nesting follows indentation.
+    """
+    text = """
+vrf A
+ address-family ipv4 unicast
+  import route-target
+   65000:101
+   65000:102
+  !
+ !
+!
+router bgp 65000
+ vrf A
+  rd auto
+"""
+    tree = parse_config(text)
+    rt_node = tree.lookup("vrf A", "address-family", "import route-target")
+    assert [node.line for node in rt_node] == ["65000:101", "65000:102"]
+    assert rt_node.parent.parent.line == "vrf A"
+    assert tree.value("router bgp 65000", "vrf A", "rd") == "auto"
+    assert len(tree) == 2
+
+
+def test_config_tree_repeated_lines():
+    """
+    Repeated sibling lines are kept as separate children, and prefix
+    lookups still see children added after the first lookup.
+    """
+    text = """
+vrf definition A
+ address-family ipv4
+ exit-address-family
+ address-family ipv6
+ exit-address-family
+"""
+    vrf = parse_config(text).lookup("vrf definition A")
+    assert [node.line for node in vrf] == [
+        "address-family ipv4",
+        "exit-address-family",
+        "address-family ipv6",
+        "exit-address-family",
+    ]
+    assert len(vrf.find_all("exit-address-family")) == 2
+    assert vrf.exact("exit-address-family") is vrf.children[1]
+
+    vrf.add("address-family ipv4 multicast")
+    assert len(vrf.find_all("address-family")) == 3
+    assert vrf.child("address-family ipv4").line == "address-family ipv4"
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: The pytest functions for ensuring the fast path only skips hosts
+whose intended state and configuration-change marker both match the last
+confirmed run. Run with "-s" to see outputs.
+"""
+
+from fastpath_m8 import (
+    FastPath,
+    intended_fingerprint,
+    marker_from_cli,
+    parse_marker,
+)
+
+
+def test_parse_marker():
+    """
+    Test that markers are found in IOS and IOS-XR output, and that
+    missing markers return None.
+    """
+    ios_output = (
+        "Configuration version : 14\n"
+        "Last change time      : 14:02:11 UTC Tue Mar 5 2019\n"
+    )
+    xr_output = (
+        "SNo. Label/ID    User      Line        Client      Time Stamp\n"
+        "~~~~ ~~~~~~~~    ~~~~      ~~~~        ~~~~~~      ~~~~~~~~~~\n"
+        "1    1000000042  pyuser    vty0        CLI         Tue Mar  5 2019\n"
+    )
+    marker = parse_marker("ios", ios_output)
+    print(marker)
+    assert marker == (
+        "Configuration version : 14 Last change time : "
+        "14:02:11 UTC Tue Mar 5 2019"
+    )
+    assert parse_marker("IOSXR", xr_output) == "1000000042"
+    assert parse_marker("ios", "") is None
+    assert parse_marker("iosxr", "No commits found\n") is None
+
+    # An open session's cli() method returns a dict keyed by command
+    def _cli(commands):
+        return {command: xr_output for command in commands}
+
+    assert marker_from_cli(_cli, "iosxr") == "1000000042"
+
+
+def test_intended_fingerprint(tmp_path):
+    """
+    Test that the fingerprint changes with file contents and extra
+    options, but not between identical calls.
+    """
+    vars_file = tmp_path / "R1_vrfs.yml"
+    vars_file.write_text("vrfs: []\n")
+    paths = [str(vars_file)]
+    first = intended_fingerprint(paths, extra=[False])
+    assert first == intended_fingerprint(paths, extra=[False])
+    assert first != intended_fingerprint(paths, extra=[True])
+    vars_file.write_text("vrfs: [{name: A}]\n")
+    assert first != intended_fingerprint(paths, extra=[False])
+
+
+def test_fastpath_skip(tmp_path):
+    """
+    Test that a host is skipped only when both the intended fingerprint
+    and the marker match, and that records survive a save and reload.
+    """
+    path = str(tmp_path / "fastpath.json")
+    fastpath = FastPath(path)
+    assert not fastpath.can_skip("R1", "abc", "1000000001")
+
+    fastpath.record("R1", "abc", "1000000001")
+    fastpath.record("R2", "def", "12:00:00")
+    assert fastpath.can_skip("R1", "abc", "1000000001")
+    assert not fastpath.can_skip("R1", "abc", "1000000002")
+    assert not fastpath.can_skip("R1", "xyz", "1000000001")
+    assert not fastpath.can_skip("R1", "abc", None)
+    fastpath.save()
+
+    # A new instance reads the saved records; forgetting a host or
+    # recording a None marker forces a full check next time
+    reloaded = FastPath(path)
+    assert reloaded.can_skip("R1", "abc", "1000000001")
+    assert reloaded.can_skip("R2", "def", "12:00:00")
+    reloaded.forget("R1")
+    reloaded.record("R2", "def", None)
+    assert not reloaded.can_skip("R1", "abc", "1000000001")
+    assert not reloaded.can_skip("R2", "def", "12:00:00")
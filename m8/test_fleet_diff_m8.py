@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: The pytest functions for ensuring the bulk fleet diff is
+deterministic, matches rt_diff, and purges unmanaged VRFs only when
+asked. Run with "-s" to see outputs.
+"""
+
+from fleet_diff_m8 import diff_fleet, diff_host
+from parse_rt_m8 import rt_diff
+from synth_m8 import synth_vrfs
+
+
+def test_diff_host_matches_rt_diff():
+    """
+    Without purge, results hold the same RTs as rt_diff, sorted.
+    """
+    intended = synth_vrfs(30)
+    running = {
+        vrf["name"]: {
+            "route_import": vrf["route_import"],
+            "route_export": [],
+        }
+        for vrf in synth_vrfs(20, drift=5)
+    }
+    expected = rt_diff(intended, running)
+    actual = diff_host(intended, running)
+    assert [vrf["name"] for vrf in actual] == sorted(
+        vrf["name"] for vrf in expected
+    )
+    for old, new in zip(sorted(expected, key=lambda v: v["name"]), actual):
+        for key in ("add_rti", "del_rti", "add_rte", "del_rte"):
+            assert sorted(old[key]) == sorted(new[key])
+        assert not new["purge"]
+
+
+def test_diff_fleet():
+    """
+    Fleet diffs are sorted by host, VRF and numeric RT, skip hosts with
+    no running data, and purge unmanaged VRFs only when asked.
+    """
+    group_vrfs = [
+        {
+            "name": "B",
+            "rd": "65000:2",
+            "description": "second",
+            "route_import": ["65000:10", "65000:9", "65000:100"],
+            "route_export": ["65000:2"],
+        },
+        {
+            "name": "A",
+            "rd": "65000:1",
+            "description": "first",
+            "route_import": ["65000:1"],
+            "route_export": ["65000:1"],
+        },
+    ]
+    intended = {"R2": group_vrfs, "R1": group_vrfs, "R3": group_vrfs}
+    running = {
+        "R1": {"A": {"route_import": ["65000:1"], "route_export": []}},
+        "R2": {"OLD": {"route_import": [], "route_export": ["65000:5"]}},
+    }
+
+    updates = diff_fleet(intended, running)
+    print(updates)
+    assert list(updates) == ["R1", "R2"]
+    assert [vrf["name"] for vrf in updates["R2"]] == ["A", "B"]
+    assert updates["R1"][0]["add_rte"] == ["65000:1"]
+    assert updates["R1"][1]["add_rti"] == ["65000:9", "65000:10", "65000:100"]
+
+    purged = diff_fleet(intended, running, purge=True)
+    assert [vrf["name"] for vrf in purged["R1"]] == ["A", "B"]
+    assert purged["R2"][-1]["name"] == "OLD"
+    assert purged["R2"][-1]["purge"]
+    assert diff_fleet(intended, running, purge=True) == purged
+
+    # VRFs named as managed are never purged, even if not diffed
+    partial = diff_host(group_vrfs[1:], running["R2"], True, managed=["OLD"])
+    assert [vrf["name"] for vrf in partial] == ["A"]
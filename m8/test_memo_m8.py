@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: The pytest functions for ensuring parse memoization skips
+repeated parses and stays within its size limit. Run with "-s" to see
+outputs.
+"""
+
+import memo_m8
+import parse_rt_m8
+from memo_m8 import ParseMemo
+from parse_rt_m8 import get_rt_parser
+
+IOS_OUTPUT = """
+vrf definition A
+ route-target export 65000:111
+ route-target import 65000:101
+!
+"""
+
+
+def _count_parses(monkeypatch):
+    """
+    Wrap the parser dispatch so the test can count real parses.
+    """
+    calls = []
+
+    def _counting_parser(platform):
+        parser = get_rt_parser(platform)
+        return lambda text: calls.append(platform) or parser(text)
+
+    monkeypatch.setattr(memo_m8, "get_rt_parser", _counting_parser)
+    return calls
+
+
+def test_memo_hits(monkeypatch):
+    """
+    Identical output is parsed once; a change in output or platform
+    parses again.
+    """
+    calls = _count_parses(monkeypatch)
+    memo = ParseMemo()
+    first = memo.parse("ios", IOS_OUTPUT)
+    assert memo.parse("IOS", IOS_OUTPUT) is first
+    assert first["A"]["route_import"] == ["65000:101"]
+    assert calls == ["ios"]
+
+    memo.parse("ios", IOS_OUTPUT.replace("111", "112"))
+    memo.parse("iosxr", "vrf A\n")
+    print(memo.hits, memo.misses)
+    assert len(calls) == 3
+    assert (memo.hits, memo.misses) == (1, 3)
+
+
+def test_memo_eviction(monkeypatch):
+    """
+    The memory tier evicts least recently used results past max_bytes.
+    """
+    calls = _count_parses(monkeypatch)
+    memo = ParseMemo(max_bytes=250)
+    outputs = [IOS_OUTPUT.replace("A", name) for name in "XYZ"]
+    memo.parse("ios", outputs[0])
+    memo.parse("ios", outputs[1])
+    memo.parse("ios", outputs[0])
+    memo.parse("ios", outputs[2])
+
+    # Y was least recently used, so it must be parsed again
+    memo.parse("ios", outputs[0])
+    memo.parse("ios", outputs[1])
+    assert len(calls) == 4
+
+
+def test_memo_disk_tier(monkeypatch, tmp_path):
+    """
+    Results persist on disk and are reused by a fresh memo.
+    """
+    calls = _count_parses(monkeypatch)
+    ParseMemo(root=str(tmp_path)).parse("ios", IOS_OUTPUT)
+    memo = ParseMemo(root=str(tmp_path))
+    vrf_data = memo.parse("ios", IOS_OUTPUT)
+    assert vrf_data["A"]["route_export"] == ["65000:111"]
+    assert calls == ["ios"]
+    assert memo.hits == 1
+
+
+def test_memo_parser_version(monkeypatch, tmp_path):
+    """
+    Results saved by an older parser version are not reused.
+    """
+    calls = _count_parses(monkeypatch)
+    ParseMemo(root=str(tmp_path)).parse("ios", IOS_OUTPUT)
+    monkeypatch.setattr(
+        parse_rt_m8, "PARSER_VERSION", parse_rt_m8.PARSER_VERSION + 1
+    )
+    ParseMemo(root=str(tmp_path)).parse("ios", IOS_OUTPUT)
+    assert calls == ["ios", "ios"]
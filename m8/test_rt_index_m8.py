@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: The pytest functions for ensuring the fleet route-target index
+answers topology queries and flags leaks as snapshots change. Run with
+"-s" to see outputs.
+"""
+
+from rt_index_m8 import RtIndex, Leak
+
+# Parsed data matching the lab routers
+R1_VRFS = {
+    "POLICE": {"route_import": ["65000:1"], "route_export": ["65000:1"]},
+    "CHEMICAL": {"route_import": ["65000:2"], "route_export": ["65000:2"]},
+    "CHEM_MGMT": {"route_import": ["65000:4"], "route_export": ["65000:3"]},
+}
+R2_VRFS = {
+    "POLICE": {"route_import": ["65000:1"], "route_export": ["65000:1"]},
+    "CHEMICAL": {
+        "route_import": ["65000:2", "65000:3"],
+        "route_export": ["65000:2", "65000:4"],
+    },
+}
+TENANTS = {"POLICE": "police", "CHEMICAL": "chem", "CHEM_MGMT": "chem"}
+
+
+def test_rt_index_queries():
+    """
+    Lookups and the import graph reflect every device's snapshot.
+    """
+    index = RtIndex()
+    index.update_device("R1", R1_VRFS)
+    index.update_device("R2", R2_VRFS)
+    assert len(index) == 4
+    assert index.importers("65000:1") == {("R1", "POLICE"), ("R2", "POLICE")}
+    assert index.exporters("65000:3") == {("R1", "CHEM_MGMT")}
+    assert not index.importers("65000:99")
+
+    graph = index.import_graph()
+    print(graph)
+    assert graph[("R1", "CHEM_MGMT")] == {("R2", "CHEMICAL")}
+    assert graph[("R2", "CHEMICAL")] == {
+        ("R1", "CHEMICAL"),
+        ("R1", "CHEM_MGMT"),
+    }
+    assert graph[("R1", "POLICE")] == {("R2", "POLICE")}
+    assert not index.find_leaks(TENANTS)
+
+
+def test_rt_index_leaks():
+    """
+    Incremental updates surface orphan imports and cross-tenant imports,
+    and removing a device cleans up its entries.
+    """
+    index = RtIndex()
+    index.update_device("R1", R1_VRFS)
+    index.update_device("R2", R2_VRFS)
+
+    # R2 starts leaking CHEMICAL routes into POLICE and stops exporting 4
+    leaky = {
+        "POLICE": {
+            "route_import": ["65000:1", "65000:2"],
+            "route_export": ["65000:1"],
+        },
+        "CHEMICAL": {
+            "route_import": ["65000:2", "65000:3"],
+            "route_export": ["65000:2"],
+        },
+    }
+    affected = index.update_device("R2", leaky)
+    leaks = index.find_leaks(TENANTS, rts=affected)
+    print(leaks)
+    assert Leak("orphan_import", "65000:4", ("R1", "CHEM_MGMT"), None) in leaks
+    assert Leak(
+        "cross_tenant", "65000:2", ("R2", "POLICE"), ("R1", "CHEMICAL")
+    ) in leaks
+    assert len(leaks) == 3
+    assert index.find_leaks(TENANTS) == leaks
+
+    index.remove_device("R2")
+    index.remove_device("R1")
+    assert len(index) == 0
@@ -7,7 +7,16 @@ for IOS-XE and IOS-XR are functional. Run with "-s" to see outputs.
 File renamed to "test_rt_pd" for "parse" and "diff" together.
 """
 
-from parse_rt_m8 import parse_rt_ios, parse_rt_iosxr, rt_diff
+import gzip
+import io
+import pytest
+from parse_rt_m8 import (
+    parse_rt_ios,
+    parse_rt_iosxr,
+    rt_diff,
+    iter_parse_rt,
+    parse_many,
+)
 
 
 def test_parse_rt_ios():
@@ -213,3 +222,119 @@ def _check_vrf_data(vrf_data):
     assert vrf_data["123"]["route_export"] == []
     assert len(vrf_data["123"]["route_import"]) == 1
     assert vrf_data["123"]["route_import"][0] == "65000:303"
+
+
+def test_parse_rt_vrf_substring():
+    """
+    Names and descriptions containing "vrf" must not split VRF blocks,
+    and nested "vrf" lines outside the definitions must be ignored.
+    """
+    ios_output = """
+vrf definition vrfA
+ description vrf for the shared services vrf
+ rd 65000:1
+ route-target export 65000:111
+ address-family ipv4
+  route-target import 65000:101
+ exit-address-family
+!
+interface GigabitEthernet2
+ vrf forwarding vrfA
+!
+"""
+    ios_data = parse_rt_ios(ios_output)
+    print(ios_data)
+    assert ios_data == {
+        "vrfA": {
+            "route_import": ["65000:101"],
+            "route_export": ["65000:111"],
+            "rd": "65000:1",
+            "description": "vrf for the shared services vrf",
+        }
+    }
+
+    iosxr_output = """
+vrf vrfA
+ description vrf for the shared services vrf
+ address-family ipv4 unicast
+  import route-target
+   65000:101
+  !
+  export route-target
+   65000:111
+  !
+ !
+!
+router bgp 65000
+ vrf vrfA
+  rd auto
+ !
+!
+"""
+    iosxr_data = parse_rt_iosxr(iosxr_output)
+    print(iosxr_data)
+    del ios_data["vrfA"]["rd"]
+    assert iosxr_data == ios_data
+
+
+def test_iter_parse_rt():
+    """
+    The streaming parser yields each VRF once its block closes, works on
+    byte streams, and matches the whole-text parser.
+    """
+    lines = [
+        "vrf definition A",
+        " route-target import 65000:101",
+        "!",
+        "vrf definition B",
+        " route-target export 65000:222",
+        "!",
+    ]
+
+    # The first VRF must be available before the second one is read
+    consumed = []
+    vrf_iter = iter_parse_rt(
+        (consumed.append(line) or line for line in lines), "ios"
+    )
+    name, rt_dict = next(vrf_iter)
+    assert name == "A" and rt_dict["route_import"] == ["65000:101"]
+    assert consumed == lines[:3]
+    assert dict(vrf_iter)["B"]["route_export"] == ["65000:222"]
+
+    # Gzip byte streams parse the same as text
+    text = "\n".join(lines) + "\n"
+    stream = io.BytesIO(gzip.compress(text.encode("utf-8")))
+    with gzip.open(stream, "rb") as handle:
+        assert dict(iter_parse_rt(handle, "IOS")) == parse_rt_ios(text)
+
+    with pytest.raises(ValueError):
+        iter_parse_rt(lines, "junos")
+
+
+def test_parse_many():
+    """
+    Batch parsing returns the same results keyed by host whether it runs
+    serially or across a process pool.
+    """
+    outputs, platforms = {}, {}
+    for num in range(20):
+        host = f"R{num}"
+        if num % 2:
+            outputs[host] = f"vrf V{num}\n import route-target\n  1:{num}\n"
+            platforms[host] = "iosxr"
+        else:
+            outputs[host] = f"vrf definition V{num}\n"
+            outputs[host] += f" route-target import 1:{num}\n"
+            platforms[host] = "ios"
+
+    serial = parse_many(outputs, platforms)
+    parallel = parse_many(outputs, platforms, workers=2, min_bytes=0)
+    print(parallel["R3"])
+    assert list(parallel) == list(outputs)
+    assert parallel == serial
+    assert parallel["R3"] == {
+        "V3": {"route_import": ["1:3"], "route_export": [], "description": None}
+    }
+
+    with pytest.raises(ValueError, match="junos"):
+        parse_many({"R9": "vrf A"}, {"R9": "junos"})
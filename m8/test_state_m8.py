@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: The pytest functions for ensuring the state store only flags
+VRFs whose intended or running state changed. Run with "-s" to see
+outputs.
+"""
+
+import copy
+from state_m8 import StateStore
+
+
+def _vrfs():
+    """
+    Returns a fresh intended VRF list for each test step.
+    """
+    return [
+        {
+            "name": "A",
+            "rd": "65000:1",
+            "description": "first",
+            "route_import": ["65000:1"],
+            "route_export": ["65000:1"],
+        },
+        {
+            "name": "B",
+            "rd": "65000:2",
+            "description": "second",
+            "route_import": ["65000:2", "65000:3"],
+            "route_export": ["65000:2"],
+        },
+    ]
+
+
+def test_state_dirty_tracking(tmp_path):
+    """
+    Everything is dirty at first, nothing after recording, and a change
+    on either side flags only the affected VRF.
+    """
+    store = StateStore(root=str(tmp_path))
+    intended = _vrfs()
+    running = {"A": {"route_import": [], "route_export": []}}
+    assert store.dirty_vrfs("R1", intended, running, "ios") == intended
+    store.record("R1", intended, "ios")
+
+    # Device now matches intent, with RTs in a different order
+    running = {
+        "A": {
+            "route_import": ["65000:1"],
+            "route_export": ["65000:1"],
+            "rd": "65000:1",
+            "description": "first",
+        },
+        "B": {
+            "route_import": ["65000:3", "65000:2"],
+            "route_export": ["65000:2"],
+            "rd": "65000:2",
+            "description": "second",
+        },
+    }
+    assert not store.dirty_vrfs("R1", intended, running, "ios")
+
+    # Intended change for A and an out-of-band device change for B
+    changed = copy.deepcopy(intended)
+    changed[0]["description"] = "renamed"
+    assert store.dirty_vrfs("R1", changed, running, "ios") == [changed[0]]
+    running["B"]["route_export"] = []
+    assert store.dirty_vrfs("R1", intended, running, "ios") == [intended[1]]
+    del running["B"]
+    assert store.dirty_vrfs("R1", intended, running, "ios") == [intended[1]]
+
+
+def test_state_persistence(tmp_path):
+    """
+    Only recorded hosts are saved, and state survives a new store.
+    """
+    store = StateStore(root=str(tmp_path))
+    store.record("R1", _vrfs(), "ios")
+    store.dirty_vrfs("R2", _vrfs(), {}, "ios")
+    store.save()
+    print(sorted(p.name for p in (tmp_path / "state").iterdir()))
+    assert [p.name for p in (tmp_path / "state").iterdir()] == ["R1.json"]
+
+    store = StateStore(root=str(tmp_path))
+    running = {
+        vrf["name"]: {
+            "route_import": vrf["route_import"],
+            "route_export": vrf["route_export"],
+            "rd": vrf["rd"],
+            "description": vrf["description"],
+        }
+        for vrf in _vrfs()
+    }
+    assert not store.dirty_vrfs("R1", _vrfs(), running, "ios")
+    store.forget("R1")
+    assert len(store.dirty_vrfs("R1", _vrfs(), running, "ios")) == 2
+
+
+def test_state_section_fields(tmp_path):
+    """
+    Drift in a section field the template renders flags the VRF, while
+    fields the platform does not render, like the IOS XR rd, are ignored.
+    """
+    store = StateStore(root=str(tmp_path))
+    intended = _vrfs()[:1]
+    store.record("R1", intended, "ios")
+    store.record("R2", intended, "iosxr")
+    running = {
+        "A": {
+            "route_import": ["65000:1"],
+            "route_export": ["65000:1"],
+            "rd": "65000:1",
+            "description": "first",
+        }
+    }
+    assert not store.dirty_vrfs("R1", intended, running, "ios")
+
+    running["A"]["description"] = "changed on the device"
+    assert store.dirty_vrfs("R1", intended, running, "ios") == intended
+    running["A"]["description"] = "first"
+    running["A"]["rd"] = None
+    assert store.dirty_vrfs("R1", intended, running, "ios") == intended
+
+    del running["A"]["rd"]
+    assert not store.dirty_vrfs("R2", intended, running, "IOSXR")
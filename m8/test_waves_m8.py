@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: The pytest functions for ensuring wave rollouts commit in the
+planned order and roll back only the failing wave. Run with "-s" to see
+outputs.
+"""
+
+from waves_m8 import WaveActions, plan_waves, run_waves
+
+
+class _FakeFleet:
+    """
+    Records commit, rollback, and discard calls for each host.
+    """
+
+    def __init__(self, bad_commit=(), unhealthy=(), slow=(), bad_rollback=()):
+        self.bad_commit = set(bad_commit)
+        self.unhealthy = set(unhealthy)
+        self.slow = set(slow)
+        self.bad_rollback = set(bad_rollback)
+        self.broken_check = False
+        self.calls = {"commit": [], "rollback": [], "discard": []}
+
+    def commit(self, host):
+        """
+        Commit a host, failing for hosts listed in bad_commit and timing
+        out for hosts listed in slow.
+        """
+        self.calls["commit"].append(host)
+        if host in self.bad_commit:
+            raise RuntimeError("commit rejected")
+        if host in self.slow:
+            raise TimeoutError("commit exceeded 300s")
+
+    def rollback(self, host):
+        """
+        Record a rollback, failing for hosts listed in bad_rollback.
+        """
+        self.calls["rollback"].append(host)
+        if host in self.bad_rollback:
+            raise RuntimeError("rollback rejected")
+
+    def discard(self, host):
+        """
+        Record a discarded candidate.
+        """
+        self.calls["discard"].append(host)
+
+    def health_check(self, wave):
+        """
+        Return the hosts in the wave that are unhealthy, or raise if the
+        check is broken.
+        """
+        if self.broken_check:
+            raise TimeoutError("health exceeded 60s")
+        return [host for host in wave if host in self.unhealthy]
+
+    def run(self, hosts):
+        """
+        Roll out to the hosts with a 10% canary and batches of 3.
+        """
+        actions = WaveActions(
+            self.commit, self.rollback, self.discard, self.health_check
+        )
+        return run_waves(hosts, actions, canary_percent=10, batch_size=3)
+
+
+HOSTS = [f"R{num}" for num in range(1, 11)]
+
+
+def test_plan_waves():
+    """
+    The canary is at least one host and later waves respect batch size.
+    """
+    assert plan_waves(HOSTS, 10, 3) == [
+        ["R1"],
+        ["R2", "R3", "R4"],
+        ["R5", "R6", "R7"],
+        ["R8", "R9", "R10"],
+    ]
+    assert plan_waves(HOSTS[:3], 50, 10) == [["R1", "R2"], ["R3"]]
+    assert plan_waves(HOSTS[:2], 0, 5) == [["R1"], ["R2"]]
+    assert not plan_waves([], 10, 3)
+
+
+def test_run_waves_success():
+    """
+    A healthy rollout commits every host and rolls back nothing.
+    """
+    fleet = _FakeFleet()
+    report = fleet.run(HOSTS)
+    assert report.committed == HOSTS
+    assert not report.rolled_back and not report.skipped
+    assert not fleet.calls["rollback"] and not fleet.calls["discard"]
+
+
+def test_run_waves_commit_failure():
+    """
+    A failed commit rolls back its wave and discards later waves, while
+    earlier waves stay committed.
+    """
+    fleet = _FakeFleet(bad_commit=["R6"])
+    report = fleet.run(HOSTS)
+    print(report)
+    assert report.committed == ["R1", "R2", "R3", "R4"]
+    assert report.rolled_back == ["R5", "R7"]
+    assert report.failed == ["R6"]
+    assert report.skipped == ["R8", "R9", "R10"]
+    assert sorted(fleet.calls["discard"]) == ["R10", "R6", "R8", "R9"]
+    assert isinstance(report.errors["R6"], RuntimeError)
+
+
+def test_run_waves_unhealthy_canary():
+    """
+    An unhealthy canary stops the rollout before any batch commits.
+    """
+    fleet = _FakeFleet(unhealthy=["R1"])
+    report = fleet.run(HOSTS)
+    assert not report.committed
+    assert report.rolled_back == ["R1"]
+    assert report.failed == ["R1"]
+    assert fleet.calls["commit"] == ["R1"]
+    assert report.errors["R1"] == "health check failed"
+
+
+def test_run_waves_timeout_and_bad_rollback():
+    """
+    A timed-out commit may have landed and may still be running, so it is
+    reported as unknown with no rollback or discard issued, and a host
+    whose rollback fails is reported separately.
+    """
+    fleet = _FakeFleet(slow=["R3"], bad_rollback=["R4"])
+    report = fleet.run(HOSTS)
+    print(report)
+    assert report.committed == ["R1"]
+    assert report.rolled_back == ["R2"]
+    assert report.rollback_failed == ["R4"]
+    assert report.unknown == ["R3"]
+    assert report.failed == ["R3"]
+    assert "R3" not in fleet.calls["rollback"]
+    assert "R3" not in fleet.calls["discard"]
+    assert isinstance(report.errors["R4"], RuntimeError)
+
+
+def test_run_waves_health_check_raises():
+    """
+    A health check that raises fails its wave, which is rolled back, and
+    later waves are discarded.
+    """
+    fleet = _FakeFleet()
+    fleet.broken_check = True
+    report = fleet.run(HOSTS[:4])
+    print(report)
+    assert not report.committed
+    assert report.rolled_back == ["R1"]
+    assert report.failed == ["R1"]
+    assert report.skipped == ["R2", "R3", "R4"]
+    assert sorted(fleet.calls["discard"]) == ["R2", "R3", "R4"]
+    assert isinstance(report.errors["R1"], TimeoutError)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+
+"""
+Author: Nick Russo
+Purpose: Commit staged configuration changes across the fleet in waves.
+A small canary wave goes first, then fixed-size batches. After each wave
+a health check runs, and if any host in the wave fails to commit or is
+unhealthy, that wave is rolled back and every later wave is discarded.
+A commit that timed out may still land on the device, and its call may
+still be using the session, so it is neither rolled back nor discarded;
+it is reported as unknown and needs a rollback once the call finishes.
+"""
+
+import math
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# Final state of a wave rollout. Host lists are in rollout order; errors
+# maps host names to the exception or message explaining their failure.
+# Hosts in rollback_failed may still be committed on the device, and so
+# may hosts in unknown, whose commits timed out and were left running.
+WaveReport = namedtuple(
+    "WaveReport",
+    "waves committed rolled_back rollback_failed unknown failed skipped "
+    "errors",
+)
+
+# The device calls a wave rollout makes. health_check may be None to skip
+# the check between waves
+WaveActions = namedtuple("WaveActions", "commit rollback discard health_check")
+
+
+def plan_waves(hosts, canary_percent=10, batch_size=10):
+    """
+    Splits hosts into waves: a canary wave of canary_percent of the hosts
+    (at least one), followed by waves of at most batch_size hosts.
+    """
+    hosts = list(hosts)
+    if not hosts:
+        return []
+    canary = max(1, math.ceil(len(hosts) * canary_percent / 100))
+    waves = [hosts[:canary]]
+    batch_size = max(1, batch_size)
+    for index in range(canary, len(hosts), batch_size):
+        waves.append(hosts[index : index + batch_size])
+    return waves
+
+
+def run_waves(hosts, actions, canary_percent=10, batch_size=10, workers=10):
+    """
+    Commits staged hosts wave by wave using the callables in a WaveActions.
+    commit(), rollback(), and discard() take a host name: commit() applies
+    its staged candidate, rollback() reverts a commit, and discard() drops
+    a staged candidate that will not be committed. health_check(wave), if
+    given, returns the hosts in the wave that are unhealthy; if it raises,
+    the whole wave counts as unhealthy. A commit that raises TimeoutError
+    is reported as unknown and left alone, since the call may still be
+    running. Returns a WaveReport.
+    """
+    waves = plan_waves(hosts, canary_percent, batch_size)
+    committed, errors = [], {}
+    for num, wave in enumerate(waves):
+        # Commit every host in the wave concurrently
+        commit_errors = _run_all(actions.commit, wave, workers)
+        errors.update(commit_errors)
+
+        # Only a fully committed wave is worth a health check
+        unhealthy = []
+        if not commit_errors and actions.health_check:
+            unhealthy = _check_wave(wave, actions.health_check, errors)
+        if not commit_errors and not unhealthy:
+            print(f"Wave {num + 1}/{len(waves)}: committed {len(wave)} hosts")
+            committed.extend(wave)
+            continue
+
+        # Revert the failed wave, then abandon the rest of the rollout;
+        # candidates that were never committed are simply dropped
+        print(f"Wave {num + 1}/{len(waves)}: failed; rolling back")
+        reverted = _revert_wave(wave, commit_errors, actions, workers, errors)
+        skipped = [host for later in waves[num + 1 :] for host in later]
+        _run_all(actions.discard, skipped, workers)
+        return WaveReport(
+            waves,
+            committed,
+            *reverted,
+            sorted(commit_errors) + unhealthy,
+            skipped,
+            errors,
+        )
+
+    return WaveReport(waves, committed, [], [], [], [], [], errors)
+
+
+def _check_wave(wave, health_check, errors):
+    """
+    Internal-only function to run the health check on a committed wave.
+    Returns the unhealthy hosts and adds an error for each to errors. A
+    check that cannot finish is no evidence of health, so it fails the
+    whole wave.
+    """
+    try:
+        unhealthy = list(health_check(wave))
+        message = "health check failed"
+    except Exception as exc:  # pylint: disable=broad-except
+        unhealthy, message = list(wave), exc
+    errors.update({host: message for host in unhealthy})
+    return unhealthy
+
+
+def _revert_wave(wave, commit_errors, actions, workers, errors):
+    """
+    Internal-only function to roll back the finished commits of a failed
+    wave and discard its candidates that never applied, adding rollback
+    failures to errors. Timed-out commits may have landed, but their calls
+    may still hold the session, so no other call is made on them. Returns
+    (rolled_back, rollback_failed, unknown).
+    """
+    done = [host for host in wave if host not in commit_errors]
+    unknown = [
+        host
+        for host in wave
+        if isinstance(commit_errors.get(host), TimeoutError)
+    ]
+    rollback_errors = _run_all(actions.rollback, done, workers)
+    errors.update(rollback_errors)
+    rolled_back = [host for host in done if host not in rollback_errors]
+    rollback_failed = [host for host in done if host in rollback_errors]
+    not_applied = sorted(set(commit_errors) - set(unknown))
+    _run_all(actions.discard, not_applied, workers)
+    return rolled_back, rollback_failed, unknown
+
+
+def _run_all(func, hosts, workers):
+    """
+    Internal-only function to call func(host) for each host concurrently.
+    Returns a dict of host name to exception for the calls that raised.
+    """
+
+    def _call(host):
+        try:
+            func(host)
+        # Isolate failures; the caller decides how to react
+        except Exception as exc:  # pylint: disable=broad-except
+            return host, exc
+        return host, None
+
+    if not hosts:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        results = executor.map(_call, hosts)
+        return {host: exc for host, exc in results if exc is not None}